@@ -12,13 +12,11 @@ import streamlit.components.v1 as components
 import altair as alt
 from streamlit_option_menu import option_menu
 from datetime import datetime
-import community as community_louvain
 import json
 import sys
 from pathlib import Path
 from wordcloud import WordCloud
 import matplotlib.pyplot as plt
-from collections import Counter
 from geopy.geocoders import Nominatim
 import time
 import tempfile
@@ -29,6 +27,9 @@ import seaborn as sns
 # Configuration du chemin
 sys.path.append(str(Path(__file__).parent.parent))
 from utils.supabase_config import get_supabase_manager
+from config.neo4j_analytique import lire_scores
+from utils.modele_relations import ModeleRelations
+from utils.service_donnees import ServiceDonnees, DonneesIndisponibles
 
 # ======== Initialisation Supabase ========
 @st.cache_resource
@@ -80,117 +81,54 @@ with st.sidebar:
                         format_func=lambda x: {"en": "Anglais", "fr": "Français", "ar": "Arabe"}[x])
 
 # ======== Chargement des Données ========
-@st.cache_data(ttl=3600)
+@st.cache_resource
+def get_data_service():
+    """Service unique par processus : mêmes données (sans copie) pour toutes les sessions,
+    rafraîchies en arrière-plan et remplacées atomiquement."""
+    return ServiceDonnees(manager)
+
 def load_data(lang):
     try:
-        table_name = f'relations_{lang}'
-        relations = manager.get_table(table_name)
-        
-        if relations.empty:
-            st.warning(f"Aucune donnée dans la table {table_name}")
-            return None
-            
-        #st.success(f"✅ Données chargées : {len(relations)} relations")
-        #st.write(f"🔹 Aperçu des données :")
-        #st.dataframe(relations.head(3))
-
-        # Vérification des colonnes requises
-        required_columns = {
-            'fr': ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation'],
-            'en': ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation'],
-            'ar': ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation']
-        }
-        
-        missing_cols = [col for col in required_columns[lang] if col not in relations.columns]
-        if missing_cols:
-            st.error(f"Colonnes manquantes dans {table_name}: {missing_cols}")
-            return None
-
-        # Normalisation des noms de colonnes spécifique au français
-        if lang == 'fr':
-            relations = relations.rename(columns={
-                'type_source': 'type_entite_source',
-                'type_cible': 'type_entite_cible'
-            })
-
-        # Traitement des entités avec vérification des colonnes
-        source_cols = ['nom_source', 'type_source'] if 'type_source' in relations.columns else ['nom_source', 'type_entite_source']
-        target_cols = ['nom_cible', 'type_cible'] if 'type_cible' in relations.columns else ['nom_cible', 'type_entite_cible']
-        
-        sources = relations[source_cols].rename(
-            columns={source_cols[0]: 'Nom', source_cols[1]: 'Type'})
-        targets = relations[target_cols].rename(
-            columns={target_cols[0]: 'Nom', target_cols[1]: 'Type'})
-        
-        entities = pd.concat([sources, targets]).drop_duplicates()
-
-        # Comptage des occurrences avec vérification
-        if 'nom_source' in relations.columns and 'nom_cible' in relations.columns:
-            source_counts = relations['nom_source'].value_counts()
-            target_counts = relations['nom_cible'].value_counts()
-            entities = entities.set_index('Nom')
-            entities['Occurrences'] = source_counts.add(target_counts, fill_value=0)
-            entities = entities.reset_index()
-        else:
-            st.warning("Impossible de calculer les occurrences - colonnes manquantes")
-            entities['Occurrences'] = 0
-
-        return {
-            'entities': entities,
-            'relations': list(zip(relations['nom_source'], 
-                                relations['nom_cible'], 
-                                relations['relation'])),
-            'relations_full': relations
-        }
-
+        return get_data_service().obtenir(lang)
+    except DonneesIndisponibles as e:
+        st.warning(str(e))
+        return None
     except Exception as e:
         st.error(f"Erreur critique ({lang}) : {str(e)}", icon="🚨")
         st.exception(e)
         return None
 
+@st.cache_data(ttl=600)
+def load_graph_scores(lang):
+    """Scores du graphe précalculés par config/neo4j_analytique.py après chaque synchronisation."""
+    return lire_scores(lang)
+
+@st.cache_data(max_entries=64)
+def filter_graph_edges(lang, version, entities, _model):
+    """Arêtes entre les entités sélectionnées, mises en cache par version et état des filtres."""
+    return _model.aretes(entities)
+
 # Chargement des données
 data = load_data(lang)
 
 
 # ======== Traitement des Données ========
 if data:
-    # Extraction des données avec vérifications sécurisées
-    entities_data = data.get('entities', pd.DataFrame())
-    entity_relations = data.get('relations', [])
-    relations_full = data.get('relations_full', pd.DataFrame())
-    
-    # Gestion robuste des dates
-    if not relations_full.empty and 'date' in relations_full.columns:
-        try:
-            # Essai de conversion ISO8601 avec gestion des fractions de seconde
-            relations_full['date'] = pd.to_datetime(
-                relations_full['date'],
-                format='ISO8601',
-                errors='raise'
-            )
-        except ValueError as e:
-            st.warning(f"Conversion des dates partiellement échouée : {str(e)}")
-            try:
-                # Fallback 1 : Essaye le format mixte
-                relations_full['date'] = pd.to_datetime(
-                    relations_full['date'],
-                    format='mixed',
-                    errors='coerce'
-                )
-            except Exception:
-                # Fallback 2 : Conversion en string si tout échoue
-                relations_full['date'] = relations_full['date'].astype(str)
-                st.error("Certaines dates n'ont pu être converties et ont été conservées en texte")
-            
-            # Affiche les lignes problématiques pour débogage
-            if relations_full['date'].isna().any():
-                problematic_dates = relations_full[relations_full['date'].isna()]
-                st.write("Lignes avec dates non converties :", problematic_dates.head())
+    # Données partagées en lecture seule (version courante du service)
+    entities_data = data.entities
+    relation_model = data.relations
+    data_version = data.version
+    for message in data.avertissements:
+        st.warning(message)
+
+    # Agrégats des pages calculés en SQL par DuckDB (seules les lignes agrégées reviennent en Python)
+    engine = data.engine
 else:
     # Valeurs par défaut si data est None ou vide
     entities_data = pd.DataFrame()
-    entity_relations = []
-    relations_full = pd.DataFrame()
+    relation_model = ModeleRelations.vide()
+    data_version = 0
+    engine = None
 
 # ======== Navigation ========
 st.title("Dashboard Entités Relationnelles")
@@ -302,15 +240,12 @@ if page == "Tableau de bord":
     
     
     # Calcul du nombre d'articles uniques (en supposant que 'article_id' existe)
-    if not relations_full.empty and 'article_id' in relations_full.columns:
-        nb_articles = relations_full['article_id'].nunique()
-    else:
-        nb_articles = relations_full['url'].nunique() if 'url' in relations_full.columns else 0
+    nb_articles = engine.nb_articles() if engine is not None else 0
 
     # Icônes et couleurs unifiées avec le nombre d'articles
     metrics = [
         {"icon": "🔎", "title": "Entités uniques", "value": len(entities_data), "color": "#4285F4"},
-        {"icon": "⛓️", "title": "Relations", "value": len(entity_relations), "color": "#34A853"}, 
+        {"icon": "⛓️", "title": "Relations", "value": len(relation_model), "color": "#34A853"}, 
         {"icon": "📄", "title": "Articles analysés", "value": nb_articles, "color": "#EA4335"},
         {"icon": "🏷️", "title": "Types d'entités", "value": entities_data['Type'].nunique(), "color": "#FBBC05"}
     ]
@@ -349,18 +284,20 @@ if page == "Tableau de bord":
     # 1. Filtres globaux (à placer avant les visualisations)
     with st.expander("🔎 Filtres globaux", expanded=True):
         cols = st.columns(3)
+        date_min, date_max = engine.bornes_dates()
+        source_options = engine.sources()
         with cols[0]:
             date_range = st.date_input(
                 "Période",
-                value=[relations_full['date'].min(), relations_full['date'].max()],
-                min_value=relations_full['date'].min(),
-                max_value=relations_full['date'].max()
+                value=[date_min, date_max],
+                min_value=date_min,
+                max_value=date_max
             )
         with cols[1]:
             selected_sources = st.multiselect(
                 "Sources médias",
-                options=sorted(relations_full['source'].unique()),
-                default=relations_full['source'].unique()[:3],
+                options=source_options,
+                default=source_options[:3],
                 key='global_source_filter'
             )
         with cols[2]:
@@ -371,16 +308,7 @@ if page == "Tableau de bord":
             )
 
     # Appliquer les filtres globaux
-    filtered_relations = relations_full[
-        (relations_full['date'].between(pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]))) &
-        (relations_full['source'].isin(selected_sources))
-    ]
-
     filtered_entities = entities_data[entities_data['Type'].isin(selected_types)]
-    filtered_entity_relations = [
-        (s, t, r) for s, t, r in entity_relations 
-        if s in filtered_entities['Nom'].values and t in filtered_entities['Nom'].values
-    ]
 
     # 1. Évolution temporelle (avec données filtrées)
     st.subheader("📅 Activité temporelle")
@@ -394,8 +322,10 @@ if page == "Tableau de bord":
         )
         freq = {'Journalière': 'D', 'Hebdomadaire': 'W', 'Mensuelle': 'ME'}[aggregation]
 
-    if not filtered_relations.empty:
-        timeline_agg = filtered_relations.groupby([pd.Grouper(key='date', freq=freq), 'source']).size().reset_index(name='count')
+    timeline_agg = engine.chronologie(
+        pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1]), selected_sources, freq
+    )
+    if not timeline_agg.empty:
 
         fig = px.area(
             timeline_agg,
@@ -418,22 +348,20 @@ if page == "Tableau de bord":
         st.warning("Aucune donnée disponible pour les filtres sélectionnés.")
 
     # 2. Matrice des relations (avec données filtrées)
-    if filtered_entity_relations and not filtered_entities.empty:
+    max_cooccurrences = engine.cooccurrence_max(selected_types)
+    if max_cooccurrences and not filtered_entities.empty:
         st.subheader("🧩 Matrice de cooccurrence")
         
-        relations_df = pd.DataFrame(filtered_entity_relations, columns=["Source", "Target", "Type"])
-        matrix_data = relations_df.groupby(['Source', 'Target']).size().reset_index(name='count')
-        
         threshold = st.slider(
             "Seuil minimal de cooccurrences", 
             min_value=1, 
-            max_value=matrix_data['count'].max() if not matrix_data.empty else 1, 
+            max_value=max_cooccurrences, 
             value=2,
             help="Filtrer pour ne montrer que les relations fréquentes",
             key='matrix_threshold'
         )
         
-        matrix_data = matrix_data[matrix_data['count'] >= threshold]
+        matrix_data = engine.cooccurrences(selected_types, threshold)
         
         if not matrix_data.empty:
             scatter = alt.Chart(matrix_data).mark_circle(size=60).encode(
@@ -452,13 +380,10 @@ if page == "Tableau de bord":
             st.info("Aucune relation ne correspond au seuil sélectionné.")     
 
     # 3. Types de relation (avec données filtrées)
-    if filtered_entity_relations:
+    freq_df = engine.types_relations(selected_types, limite=20)
+    if not freq_df.empty:
         st.subheader("🔗 Types de relations")
             
-        relation_types = [rel[2] for rel in filtered_entity_relations]
-        freq_df = pd.DataFrame(Counter(relation_types).items(), columns=['Relation', 'Fréquence'])
-        freq_df = freq_df.sort_values(by='Fréquence', ascending=False).head(20)
-            
         fig = px.bar(
             freq_df,
             x='Fréquence',
@@ -601,8 +526,8 @@ elif page == "Entités":
 
         if selected_entity:
             st.markdown(f"### 🧩 Analyse de : `{selected_entity}`")
-            source_relations = relations_full[relations_full['nom_source'] == selected_entity]
-            target_relations = relations_full[relations_full['nom_cible'] == selected_entity]
+            source_relations = engine.relations_entite(selected_entity, sortantes=True)
+            target_relations = engine.relations_entite(selected_entity, sortantes=False)
 
             col1, col2 = st.columns(2)
             with col1:
@@ -637,25 +562,14 @@ elif page == "Entités":
 elif page == "Articles":
     st.title("📰 Analyse des Articles Sources")
     
-    if not relations_full.empty and 'source' in relations_full.columns:
+    if engine is not None and 'source' in engine.colonnes:
         import warnings
         warnings.filterwarnings('ignore', message='.*pyplot.*')
         
         # ========== 1. STATISTIQUES GLOBALES ==========
         st.header("📊 Statistiques globales des sources")
         with st.spinner('Calcul des statistiques...'):
-            if 'article_id' in relations_full.columns:
-                article_stats = relations_full.groupby('source')['article_id'].nunique().reset_index()
-                article_stats.columns = ['Source', "Nombre d'articles"]
-            else:
-                article_stats = relations_full['source'].value_counts().reset_index()
-                article_stats.columns = ['Source', "Nombre d'articles"]
-            
-            source_stats = relations_full['source'].value_counts().reset_index()
-            source_stats.columns = ['Source', 'Nombre de relations']
-            
-            stats_df = pd.merge(article_stats, source_stats, on='Source')
-            stats_df['Relations/article'] = stats_df['Nombre de relations'] / stats_df["Nombre d'articles"]
+            stats_df = engine.statistiques_sources()
 
         # Onglets : Tableau + Visualisations
         tab1, tab2 = st.tabs(["📋 Données tabulaires", "📈 Visualisations"])
@@ -705,30 +619,24 @@ elif page == "Articles":
         st.header("🔍 Analyse détaillée d'une source")
         selected_source = st.selectbox("Sélectionnez une source", options=stats_df['Source'].unique())
 
-        source_data = relations_full[relations_full['source'] == selected_source].copy()
+        articles_to_show = engine.articles_source(selected_source)
 
-        if not source_data.empty:
+        if not articles_to_show.empty:
             # Chronologie des publications
-            if 'date' in source_data.columns:
+            if 'date' in engine.colonnes:
                 st.subheader("📅 Chronologie des publications")   
-                source_data['date'] = pd.to_datetime(source_data['date'])
-                timeline = source_data.set_index('date').resample('ME').size()
+                timeline = engine.publications_mensuelles(selected_source)
                 fig = px.area(
-                    timeline.reset_index(),
-                    x='date', y=0,
+                    timeline,
+                    x='date', y='count',
                     title=f"Publications mensuelles – {selected_source}",
-                    labels={'0': "Nombre d'articles"}
+                    labels={'count': "Nombre d'articles"}
                 )
                 st.plotly_chart(fig, use_container_width=True)
 
             # Entités mentionnées
             st.subheader("🏷 Entités les plus citées")
-            sources = source_data['nom_source'].value_counts()
-            targets = source_data['nom_cible'].value_counts()
-            top_entities = (sources + targets).fillna(0).astype(int).sort_values(ascending=False).head(20)
-
-            entities_df = top_entities.reset_index()
-            entities_df.columns = ['Entité', 'Nombre']
+            entities_df = engine.entites_source(selected_source, limite=20)
 
             fig = px.treemap(
                 entities_df,
@@ -744,23 +652,18 @@ elif page == "Articles":
 
             # Types de relations
             st.subheader("🔗 Répartition des types de relations")
-            rel_counts = source_data['relation'].value_counts()
+            rel_counts = engine.relations_source(selected_source)
 
             fig = px.pie(
                 rel_counts,
-                names=rel_counts.index,
-                values=rel_counts.values,
+                names='relation',
+                values='count',
                 title="Types de relations dans les articles"
             )
             st.plotly_chart(fig, use_container_width=True)
 
             # Détails des articles
             st.subheader("📝 Détails des articles")
-            if 'article_id' in source_data.columns:
-                articles_to_show = source_data.drop_duplicates('article_id')
-            else:
-                articles_to_show = source_data
-
             st.dataframe(
                 articles_to_show,
                 column_config={
@@ -780,7 +683,7 @@ elif page == "Articles":
 elif page == "Graphe":
     st.title("🌍 Réseau Relationnel Intelligent")
     
-    if not entities_data.empty and entity_relations:
+    if not entities_data.empty and len(relation_model):
         # ========== CONFIGURATION ==========
         # Constantes pour les styles
         TYPE_ICONS = {
@@ -852,6 +755,12 @@ elif page == "Graphe":
             st.warning("Veuillez sélectionner au moins une entité")
             st.stop()
 
+        # Degré, PageRank et communautés précalculés (aucun calcul de graphe à chaque rerun)
+        graph_scores, graph_meta = load_graph_scores(lang)
+        if graph_scores is None:
+            st.info("Scores du graphe non disponibles : exécuter `python config/neo4j_analytique.py "
+                    f"{lang}` (lancé automatiquement après chaque synchronisation Neo4j).")
+
         # ========== CONSTRUCTION DU GRAPHE ==========
         G = nx.Graph()
         
@@ -865,11 +774,14 @@ elif page == "Graphe":
         for entity in node_data.index:
             entity_type = node_data.at[entity, 'Type']
             occurrences = int(node_data.at[entity, 'Occurrences'])
+            title = f"{entity} ({entity_type}) - {occurrences} connexions"  # Tooltip simplifié
+            if graph_scores is not None and entity in graph_scores.index:
+                title += f" - PageRank {graph_scores.at[entity, 'pagerank']:.4f}"
             
             G.add_node(
                 entity,
                 label=entity if show_labels else "",
-                title=f"{entity} ({entity_type}) - {occurrences} connexions",  # Tooltip simplifié
+                title=title,
                 group=entity_type,
                 size=node_size + occurrences**0.5,
                 color=NODE_COLORS.get(entity_type, '#999999'),  # Couleur par type
@@ -882,13 +794,13 @@ elif page == "Graphe":
                 }
             )
         
-        # Ajout des relations avec comptage
-        relation_counts = Counter()
-        for source, target, rel_type in entity_relations:
-            if source in G.nodes and target in G.nodes:
-                relation_counts[(source, target, rel_type)] += 1
+        # Ajout des relations avec comptage (filtre vectorisé sur les codes d'entités)
+        graph_edges = filter_graph_edges(
+            lang, data_version, tuple(sorted(node_data.index)),
+            relation_model
+        )
                 
-        for (source, target, rel_type), count in relation_counts.items():
+        for source, target, rel_type, count in graph_edges.itertuples(index=False):
             G.add_edge(
                 source, target,
                 # Remplacer le HTML par du texte simple
@@ -905,9 +817,9 @@ elif page == "Graphe":
                 }
             )
 
-        # Détection de communautés
-        if community_detection and len(G.nodes) > 0:
-            partition = community_louvain.best_partition(G)
+        # Communautés Louvain précalculées sur le graphe complet
+        if community_detection and graph_scores is not None and len(G.nodes) > 0:
+            partition = graph_scores['communaute'].reindex(list(G.nodes)).dropna().astype(int).to_dict()
             nx.set_node_attributes(G, partition, 'group')
 
         # ========== VISUALISATION ==========
@@ -992,28 +904,39 @@ elif page == "Graphe":
         st.divider()
         st.header("📊 Analyse du Réseau")
         
-        # Métriques clés
+        # Métriques du graphe affiché (sous-graphe filtré), calculées sur G
         col1, col2, col3 = st.columns(3)
-        degrees = dict(G.degree())
-        col1.metric("Nœuds", len(G.nodes))
-        col2.metric("Arêtes", len(G.edges))
-        col3.metric("Densité", f"{nx.density(G):.3f}")
+        col1.metric("Nœuds affichés", len(G.nodes))
+        col2.metric("Arêtes affichées", len(G.edges))
+        col3.metric("Densité (graphe affiché)", f"{nx.density(G):.3f}")
+
+        # Graphe complet : métriques et degrés précalculés, à défaut ceux du graphe affiché
+        if graph_meta is not None:
+            degrees = graph_scores['degre']
+            portee_degres = "graphe complet"
+            st.caption(
+                f"Graphe complet : {graph_meta['noeuds']} nœuds, {graph_meta['aretes']} arêtes, "
+                f"densité {graph_meta['densite']:.3f} (scores calculés le {graph_meta['calcule_le']})"
+            )
+        else:
+            degrees = pd.Series(dict(G.degree()))
+            portee_degres = "graphe affiché"
         
         # Visualisations complémentaires
-        tab1, tab2 = st.tabs(["🔗 Distribution des connexions", "📌 Top relations"])
+        tab1, tab2, tab3 = st.tabs(["🔗 Distribution des connexions", "📌 Top relations", "⭐ Entités centrales"])
         
         with tab1:
             fig = px.histogram(
-                x=list(degrees.values()),
+                x=degrees.values,
                 nbins=20,
-                title="Nombre de connexions par entité",
+                title=f"Nombre de connexions par entité ({portee_degres})",
                 labels={'x': 'Connexions', 'y': 'Nombre d\'entités'},
                 color_discrete_sequence=['#4ECDC4'] if dark_mode else ['#45B7D1']
             )
             st.plotly_chart(fig, use_container_width=True)
         
         with tab2:
-            top_relations = pd.Series([rel[2] for rel in entity_relations]).value_counts().head(10)
+            top_relations = relation_model.comptes_types().head(10)
             fig = px.bar(
                 top_relations,
                 orientation='h',
@@ -1023,6 +946,15 @@ elif page == "Graphe":
             )
             st.plotly_chart(fig, use_container_width=True)
 
+        with tab3:
+            if graph_scores is not None:
+                st.dataframe(
+                    graph_scores.sort_values('pagerank', ascending=False).head(20),
+                    use_container_width=True
+                )
+            else:
+                st.info("Aucun score précalculé pour cette langue.")
+
     else:
         st.warning("Aucune donnée disponible pour générer le graphe")
         st.image("https://via.placeholder.com/800x400?text=No+Data+Available", use_column_width=True)
@@ -1030,7 +962,7 @@ elif page == "Graphe":
 elif page == "Statistiques":
     st.title("📈 Statistiques avancées")
     
-    if not entities_data.empty or entity_relations:
+    if not entities_data.empty or len(relation_model):
         tab1, tab2, tab3 = st.tabs(["📌 Entités", "🔗 Relations", "🗝️ Mots-clés"])
 
         # ================================
@@ -1085,9 +1017,8 @@ elif page == "Statistiques":
         with tab2:
             st.subheader("Exploration des relations")
 
-            if entity_relations:
-                relations_df = pd.DataFrame(entity_relations, columns=["Source", "Target", "Type"])
-                top_relation_types = relations_df['Type'].value_counts().head(10).reset_index()
+            if len(relation_model):
+                top_relation_types = engine.types_relations(limite=10)
                 top_relation_types.columns = ['Type', 'Nombre']
 
                 col1, col2 = st.columns(2)
@@ -1107,14 +1038,7 @@ elif page == "Statistiques":
 
                 with col2:
                     try:
-                        rel_with_types = relations_df.merge(
-                            entities_data[['Nom', 'Type']].rename(columns={'Nom': 'Source', 'Type': 'SourceType'}),
-                            on='Source'
-                        ).merge(
-                            entities_data[['Nom', 'Type']].rename(columns={'Nom': 'Target', 'Type': 'TargetType'}),
-                            on='Target'
-                        )
-                        type_pairs = rel_with_types.groupby(['SourceType', 'TargetType']).size().reset_index(name='count')
+                        type_pairs = engine.paires_types()
                         fig = px.sunburst(
                             type_pairs,
                             path=['SourceType', 'TargetType'],
@@ -1125,19 +1049,15 @@ elif page == "Statistiques":
                     except Exception as e:
                         st.error("Erreur lors de la jointure avec les types d'entités.")
 
-                if not relations_full.empty and 'date' in relations_full.columns:
+                if 'date' in engine.colonnes:
                     st.markdown("#### ⏳ Évolution temporelle des types de relations")
                     try:
-                        rel_temp = relations_full.copy()
-                        rel_temp['date'] = pd.to_datetime(rel_temp['date'])
-                        rel_temp['mois'] = rel_temp['date'].dt.to_period('M').astype(str)
-
+                        relation_options = engine.liste_relations()
                         selected_types = st.multiselect("Filtrer les types de relation :", 
-                                                        sorted(rel_temp['relation'].unique()), 
-                                                        default=rel_temp['relation'].unique())
+                                                        relation_options, 
+                                                        default=relation_options)
 
-                        filtered_temp = rel_temp[rel_temp['relation'].isin(selected_types)]
-                        monthly_rel = filtered_temp.groupby(['mois', 'relation']).size().reset_index(name='count')
+                        monthly_rel = engine.relations_mensuelles(selected_types)
 
                         fig = px.line(
                             monthly_rel, 
@@ -1156,17 +1076,17 @@ elif page == "Statistiques":
         with tab3:
             st.subheader("🧠 Analyse des mots-clés dans les relations")
 
-            if not relations_full.empty and 'relation' in relations_full.columns:
-                all_words = ' '.join(relations_full['relation'].astype(str)).split()
-                word_freq = Counter(all_words).most_common(40)
+            if engine is not None and 'relation' in engine.colonnes:
+                # Comptage des mots en SQL (DuckDB) : seuls les 40 premiers reviennent en Python
+                word_freq = engine.mots_relations(limite=40)
 
                 col1, col2 = st.columns([2, 1])
 
                 with col1:
                     fig = px.bar(
-                        x=[w[0] for w in word_freq],
-                        y=[w[1] for w in word_freq],
-                        labels={'x': 'Mot', 'y': 'Fréquence'},
+                        word_freq,
+                        x='Mot',
+                        y='Fréquence',
                         title="📌 Fréquence des mots les plus utilisés"
                     )
                     st.plotly_chart(fig, use_container_width=True)
@@ -1415,10 +1335,10 @@ elif page == "Export":
         )
     
     # Export des relations
-    if entity_relations:
+    if len(relation_model):
         st.subheader("Export des relations")
         
-        relations_df = pd.DataFrame(entity_relations, columns=["Source", "Cible", "Type"])
+        relations_df = relation_model.tableau()
         csv = relations_df.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="💾 Télécharger en CSV",
@@ -1427,11 +1347,12 @@ elif page == "Export":
             mime="text/csv"
         )
     
-    # Export complet
-    if not relations_full.empty:
+    # Export complet : relations décodées par DuckDB seulement à la demande
+    if engine is not None and st.button("📦 Préparer l'export complet"):
         st.subheader("Export complet")
         
-        csv = relations_full.to_csv(index=False).encode('utf-8')
+        relations_completes = engine.export()
+        csv = relations_completes.to_csv(index=False).encode('utf-8')
         st.download_button(
             label="💾 Télécharger toutes les données (CSV)",
             data=csv,
@@ -1443,8 +1364,8 @@ elif page == "Export":
         excel_buffer = BytesIO()
         with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
             entities_data.to_excel(writer, sheet_name='Entités', index=False)
-            pd.DataFrame(entity_relations, columns=["Source", "Cible", "Type"]).to_excel(writer, sheet_name='Relations', index=False)
-            relations_full.to_excel(writer, sheet_name='Données complètes', index=False)
+            relation_model.tableau().to_excel(writer, sheet_name='Relations', index=False)
+            relations_completes.to_excel(writer, sheet_name='Données complètes', index=False)
         
         st.download_button(
             label="💾 Télécharger en Excel",
@@ -0,0 +1,172 @@
+# config/connections.py
+"""Clients MongoDB, Supabase et Neo4j partagés à l'échelle du processus.
+
+Chaque client est créé une seule fois par processus (avec son pool de
+connexions) puis réutilisé par tous les modules. Les clients sont indexés par
+PID : après un fork (pool de processus), l'enfant crée ses propres clients au
+lieu de réutiliser des sockets hérités du parent.
+
+Réglages (variables d'environnement) :
+- MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_TIMEOUT_MS
+- SUPABASE_TIMEOUT (secondes)
+- NEO4J_MAX_POOL_SIZE, NEO4J_ACQUISITION_TIMEOUT, NEO4J_MAX_RETRY_TIME (secondes)
+- CONNEXION_TENTATIVES, CONNEXION_DELAI : politique de réessai de executer()
+"""
+import os
+import time
+import atexit
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", "10000"))
+
+SUPABASE_TIMEOUT = int(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "60"))
+NEO4J_MAX_RETRY_TIME = float(os.getenv("NEO4J_MAX_RETRY_TIME", "30"))
+
+CONNEXION_TENTATIVES = int(os.getenv("CONNEXION_TENTATIVES", "3"))
+CONNEXION_DELAI = float(os.getenv("CONNEXION_DELAI", "0.5"))
+
+_clients = {}
+_pid = os.getpid()
+_verrou = threading.Lock()
+
+def _reinitialiser_apres_fork():
+    """Oublie les clients hérités du parent (sans les fermer : leurs sockets appartiennent au parent)."""
+    global _pid, _verrou
+    _clients.clear()
+    _pid = os.getpid()
+    _verrou = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinitialiser_apres_fork)
+
+def _client(cle, fabrique):
+    if os.getpid() != _pid:
+        _reinitialiser_apres_fork()
+    client = _clients.get(cle)
+    if client is None:
+        with _verrou:
+            client = _clients.get(cle)
+            if client is None:
+                client = _clients[cle] = fabrique()
+    return client
+
+def _retirer(cle):
+    return _clients.pop(cle, None)
+
+# ----- MongoDB -----
+
+def get_mongo_client(uri):
+    def fabrique():
+        from pymongo import MongoClient
+        return MongoClient(
+            uri,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            serverSelectionTimeoutMS=MONGO_TIMEOUT_MS,
+            connectTimeoutMS=MONGO_TIMEOUT_MS,
+            retryReads=True,
+            retryWrites=True,
+        )
+    return _client(("mongo", uri), fabrique)
+
+def get_mongo_collection(uri, database, collection_name):
+    return get_mongo_client(uri)[database][collection_name]
+
+# ----- Supabase -----
+
+def get_supabase_client(url=None, key=None):
+    url = url or os.getenv("SUPABASE_URL")
+    key = key or os.getenv("SUPABASE_KEY")
+    if not url or not key:
+        raise ValueError("Les variables d'environnement SUPABASE_URL et SUPABASE_KEY ne sont pas définies.")
+
+    def fabrique():
+        from supabase import create_client
+        from supabase.client import ClientOptions
+        return create_client(
+            url,
+            key,
+            options=ClientOptions(
+                postgrest_client_timeout=SUPABASE_TIMEOUT,
+                storage_client_timeout=SUPABASE_TIMEOUT,
+                schema="public",
+            )
+        )
+    return _client(("supabase", url, key), fabrique)
+
+class SupabaseParProcessus:
+    """Remplaçant du client Supabase global : délègue au client du processus courant.
+
+    Permet de garder `from config.supabasedb import supabase` tout en restant
+    sûr après un fork."""
+
+    def __init__(self, url=None, key=None):
+        self._url = url
+        self._key = key
+
+    def __getattr__(self, nom):
+        return getattr(get_supabase_client(self._url, self._key), nom)
+
+# ----- Neo4j -----
+
+def get_neo4j_driver(uri, user, password):
+    def fabrique():
+        from neo4j import GraphDatabase
+        return GraphDatabase.driver(
+            uri,
+            auth=(user, password),
+            max_connection_pool_size=NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=NEO4J_ACQUISITION_TIMEOUT,
+            max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
+        )
+    return _client(("neo4j", uri, user), fabrique)
+
+def fermer_neo4j_driver(uri, user):
+    """Ferme le driver partagé (il sera recréé au prochain get_neo4j_driver).
+
+    À réserver au propriétaire du processus : tous les autres détenteurs du driver
+    se retrouvent avec un driver fermé. Les clients restants sont fermés à la sortie."""
+    driver = _retirer(("neo4j", uri, user))
+    if driver is not None:
+        driver.close()
+
+def _fermer_clients():
+    """Ferme à la sortie du processus les clients qu'il a créés."""
+    if os.getpid() != _pid:
+        return
+    for cle in list(_clients):
+        client = _retirer(cle)
+        if hasattr(client, "close"):
+            try:
+                client.close()
+            except Exception:
+                pass
+
+atexit.register(_fermer_clients)
+
+# ----- Réessais -----
+
+def executer(requete, tentatives=None, delai=None, exceptions=(Exception,)):
+    """Exécute une requête (objet avec .execute() ou fonction) avec réessais et attente exponentielle.
+
+    Seules les `exceptions` indiquées sont réessayées ; les autres sont relancées aussitôt."""
+    tentatives = tentatives or CONNEXION_TENTATIVES
+    delai = CONNEXION_DELAI if delai is None else delai
+    appel = requete.execute if hasattr(requete, "execute") else requete
+    for tentative in range(1, tentatives + 1):
+        try:
+            return appel()
+        except exceptions as e:
+            if tentative == tentatives:
+                raise
+            attente = delai * 2 ** (tentative - 1)
+            print(f"⚠️ Tentative {tentative}/{tentatives} échouée ({e}), nouvel essai dans {attente:.1f}s")
+            time.sleep(attente)
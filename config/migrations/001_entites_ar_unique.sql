@@ -0,0 +1,25 @@
+-- Contrainte d'unicité (nom, article_id) sur les tables d'entités arabes,
+-- utilisée par les upserts groupés de nlp_processing/data/ar/main.py
+-- (on_conflict="nom,article_id", doublons ignorés).
+-- Les doublons existants sont supprimés d'abord (la ligne d'id le plus petit est conservée).
+-- Une fois la migration appliquée, activer l'upsert avec ENTITES_AR_UNIQUES=1.
+
+DELETE FROM entite_ar_pers a USING entite_ar_pers b
+WHERE a.id > b.id AND a.nom = b.nom AND a.article_id = b.article_id;
+ALTER TABLE entite_ar_pers
+    ADD CONSTRAINT entite_ar_pers_nom_article_id_key UNIQUE (nom, article_id);
+
+DELETE FROM entite_ar_loc a USING entite_ar_loc b
+WHERE a.id > b.id AND a.nom = b.nom AND a.article_id = b.article_id;
+ALTER TABLE entite_ar_loc
+    ADD CONSTRAINT entite_ar_loc_nom_article_id_key UNIQUE (nom, article_id);
+
+DELETE FROM entite_ar_org a USING entite_ar_org b
+WHERE a.id > b.id AND a.nom = b.nom AND a.article_id = b.article_id;
+ALTER TABLE entite_ar_org
+    ADD CONSTRAINT entite_ar_org_nom_article_id_key UNIQUE (nom, article_id);
+
+DELETE FROM entite_ar_event a USING entite_ar_event b
+WHERE a.id > b.id AND a.nom = b.nom AND a.article_id = b.article_id;
+ALTER TABLE entite_ar_event
+    ADD CONSTRAINT entite_ar_event_nom_article_id_key UNIQUE (nom, article_id);
@@ -0,0 +1,45 @@
+-- Clé déterministe relation_key sur relations_fr / relations_en / relations_ar,
+-- utilisée par utils/relation_sink.py (upsert on_conflict="relation_key").
+-- Une fois la migration appliquée, activer l'envoi de relation_key et l'upsert
+-- avec RELATIONS_CLE_UNIQUE=1.
+-- relation_key = sha1(article_id|nom_source|nom_cible|relation), chaque valeur
+-- débarrassée de ses espaces en bord et aux espaces internes réduits à un seul,
+-- comme utils.relation_sink.cle_relation. Les espaces sont la même classe
+-- explicite des deux côtés ([ \t\n\r\f\v\u00a0]) : \s n'a pas la même étendue
+-- Unicode en Python et en PostgreSQL.
+
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE OR REPLACE FUNCTION normaliser_cle(valeur text) RETURNS text AS $$
+    SELECT btrim(regexp_replace(coalesce(valeur, ''), '[ \t\n\r\f\v\u00a0]+', ' ', 'g'), ' ')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION cle_relation(article_id text, source text, cible text, relation text) RETURNS text AS $$
+    SELECT encode(digest(
+        normaliser_cle(article_id) || '|' || normaliser_cle(source) || '|' ||
+        normaliser_cle(cible) || '|' || normaliser_cle(relation), 'sha1'), 'hex')
+$$ LANGUAGE sql IMMUTABLE;
+
+-- relations_fr
+ALTER TABLE relations_fr ADD COLUMN IF NOT EXISTS relation_key text;
+UPDATE relations_fr SET relation_key = cle_relation(article_id::text, nom_source, nom_cible, relation)
+WHERE relation_key IS NULL;
+DELETE FROM relations_fr a USING relations_fr b
+WHERE a.id > b.id AND a.relation_key = b.relation_key;
+ALTER TABLE relations_fr ADD CONSTRAINT relations_fr_relation_key_key UNIQUE (relation_key);
+
+-- relations_en
+ALTER TABLE relations_en ADD COLUMN IF NOT EXISTS relation_key text;
+UPDATE relations_en SET relation_key = cle_relation(article_id::text, nom_source, nom_cible, relation)
+WHERE relation_key IS NULL;
+DELETE FROM relations_en a USING relations_en b
+WHERE a.id > b.id AND a.relation_key = b.relation_key;
+ALTER TABLE relations_en ADD CONSTRAINT relations_en_relation_key_key UNIQUE (relation_key);
+
+-- relations_ar
+ALTER TABLE relations_ar ADD COLUMN IF NOT EXISTS relation_key text;
+UPDATE relations_ar SET relation_key = cle_relation(article_id::text, nom_source, nom_cible, relation)
+WHERE relation_key IS NULL;
+DELETE FROM relations_ar a USING relations_ar b
+WHERE a.id > b.id AND a.relation_key = b.relation_key;
+ALTER TABLE relations_ar ADD CONSTRAINT relations_ar_relation_key_key UNIQUE (relation_key);
@@ -0,0 +1,20 @@
+-- Contrainte d'unicité (nom, article_id) sur les tables d'entités FR et EN,
+-- utilisée par enregistrer_entites (upsert groupé ou COPY + ON CONFLICT DO NOTHING,
+-- utils/postgres_copy.py) à la place de la vérification select-puis-insert.
+-- Les doublons existants sont supprimés d'abord (la ligne d'id le plus petit est conservée).
+-- Une fois la migration appliquée, activer l'upsert avec ENTITES_FR_EN_UNIQUES=1.
+
+DO $$
+DECLARE
+    t text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'entite_fr_pers', 'entite_fr_loc', 'entite_fr_org', 'entite_fr_event',
+        'entite_en_pers', 'entite_en_loc', 'entite_en_org', 'entite_en_event'
+    ] LOOP
+        EXECUTE format(
+            'DELETE FROM %1$I a USING %1$I b WHERE a.id > b.id AND a.nom = b.nom AND a.article_id = b.article_id', t);
+        EXECUTE format(
+            'ALTER TABLE %1$I ADD CONSTRAINT %2$I UNIQUE (nom, article_id)', t, t || '_nom_article_id_key');
+    END LOOP;
+END $$;
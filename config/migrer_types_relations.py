@@ -0,0 +1,107 @@
+# config/migrer_types_relations.py
+"""Migration des graphes existants vers les types de relation canoniques.
+
+Chaque type de relation non canonique (ex. `a_rencontré`, `works_for`) est
+réécrit, par lots, en son type canonique (config.types_relations) : la
+relation est recréée avec les mêmes propriétés, la clé de MERGE `cle_phrase`
+est calculée depuis le nom de l'ancien type (cle_phrase donne la même clé
+que depuis la phrase brute), un libellé lisible ("_" → espace) est gardé dans
+`phrase` s'il n'y en a pas déjà un, puis l'ancienne est supprimée.
+
+Les relations déjà canoniques mais sans `cle_phrase` (chargées avant que les
+MERGE ne portent sur cette clé) la reçoivent, calculée depuis leur `phrase`.
+
+Usage :
+    python config/migrer_types_relations.py fr|en|ar
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.types_relations import TYPES_CANONIQUES, type_canonique, cle_phrase
+
+TAILLE_LOT_MIGRATION = 10000
+
+def types_existants(driver, database=None):
+    with driver.session(database=database) as session:
+        return [record["relationshipType"] for record in session.run("CALL db.relationshipTypes()")]
+
+def _migrer_lot(tx, ancien, nouveau, cle, phrase, lot):
+    return tx.run(
+        f"MATCH (a)-[r:`{ancien}`]->(b) "
+        "WITH a, r, b LIMIT $lot "
+        f"CREATE (a)-[n:`{nouveau}`]->(b) "
+        "SET n = properties(r), n.cle_phrase = $cle, n.phrase = coalesce(r.phrase, $phrase) "
+        "DELETE r "
+        "RETURN count(*) AS migrees",
+        lot=lot, cle=cle, phrase=phrase,
+    ).single()["migrees"]
+
+def _phrases_sans_cle(tx, type_relation):
+    return [record["phrase"] for record in tx.run(
+        f"MATCH ()-[r:`{type_relation}`]->() WHERE r.cle_phrase IS NULL AND r.phrase IS NOT NULL "
+        "RETURN DISTINCT r.phrase AS phrase"
+    )]
+
+def _poser_cles(tx, type_relation, lignes):
+    return tx.run(
+        "UNWIND $rows AS p "
+        f"MATCH ()-[r:`{type_relation}`]->() WHERE r.cle_phrase IS NULL AND r.phrase = p.phrase "
+        "SET r.cle_phrase = p.cle "
+        "RETURN count(r) AS posees",
+        rows=lignes,
+    ).single()["posees"]
+
+def completer_cles(driver, taille_lot=TAILLE_LOT_MIGRATION, database=None):
+    """Pose `cle_phrase` sur les relations de type canonique qui n'en ont pas ; renvoie {type: nombre}."""
+    bilan = {}
+    for type_relation in types_existants(driver, database):
+        if type_relation not in TYPES_CANONIQUES:
+            continue
+        with driver.session(database=database) as session:
+            phrases = session.execute_read(_phrases_sans_cle, type_relation)
+            lignes = [{"phrase": p, "cle": cle_phrase(p)} for p in phrases]
+            total = 0
+            for i in range(0, len(lignes), taille_lot):
+                total += session.execute_write(_poser_cles, type_relation, lignes[i:i + taille_lot])
+        if total:
+            bilan[type_relation] = total
+            print(f"✅ {type_relation} : cle_phrase posée sur {total} relations.")
+    return bilan
+
+def migrer(driver, taille_lot=TAILLE_LOT_MIGRATION, database=None):
+    """Réécrit toutes les relations de type non canonique ; renvoie {ancien type: nombre migré}."""
+    bilan = {}
+    for ancien in types_existants(driver, database):
+        if ancien in TYPES_CANONIQUES:
+            continue
+        # `phrase` n'est qu'un libellé : la clé vient de cle_phrase, reproductible depuis l'ancien type
+        phrase = ancien.replace("_", " ")
+        nouveau = type_canonique(phrase)
+        total = 0
+        with driver.session(database=database) as session:
+            while True:
+                migrees = session.execute_write(_migrer_lot, ancien, nouveau, cle_phrase(ancien), phrase, taille_lot)
+                total += migrees
+                if migrees < taille_lot:
+                    break
+        bilan[ancien] = total
+        print(f"✅ {ancien} → {nouveau} : {total} relations migrées.")
+    print(f"🎉 Migration terminée : {len(bilan)} types non canoniques réécrits.")
+    completer_cles(driver, taille_lot, database)
+    return bilan
+
+if __name__ == "__main__":
+    langue = sys.argv[1] if len(sys.argv) > 1 else "fr"
+    if langue == "en":
+        from config.neo4j_en import Neo4jConnection
+    elif langue == "ar":
+        from config.neoj4 import Neo4jConnection
+    else:
+        from config.neo4j_fr import Neo4jConnection
+    connexion = Neo4jConnection()
+    try:
+        migrer(connexion._driver)
+    finally:
+        connexion.close()
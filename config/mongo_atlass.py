@@ -1,7 +1,7 @@
 # config/mongodb_atlass.py
-from pymongo import MongoClient
 import os
 from dotenv import load_dotenv
+from config.connections import get_mongo_collection
 
 # Charger les variables d'environnement à partir du fichier .env
 load_dotenv()  
@@ -12,14 +12,14 @@ MONGO_URI = os.getenv("MONGO_URI")
 DATABASE_NAME = "medias_maroc"
 
 def get_mongo_atlass_collection(collection_name):
-    """Établit une connexion à MongoDB et retourne une collection spécifique.
+    """Retourne une collection spécifique de MongoDB Atlas.
+
+    Le MongoClient (et son pool de connexions) est partagé par tout le processus.
     
     :param collection_name: Nom de la collection à récupérer.
     :return: Instance de la collection MongoDB."""
     
-    client = MongoClient(MONGO_URI)
-    db = client[DATABASE_NAME]
-    return db[collection_name]
+    return get_mongo_collection(MONGO_URI, DATABASE_NAME, collection_name)
 
 
 
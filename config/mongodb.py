@@ -1,11 +1,9 @@
 # config/mongodb.py
-from pymongo import MongoClient
+from config.connections import get_mongo_collection as get_collection_partagee
 
 MONGO_URI = "mongodb://localhost:27017/"
 DATABASE_NAME = "medias_maroc"
 
 def get_mongo_collection(collection_name):
-    """Retourne la collection MongoDB demandée."""
-    client = MongoClient(MONGO_URI)
-    db = client[DATABASE_NAME]
-    return db[collection_name]
+    """Retourne la collection MongoDB demandée (client partagé par le processus)."""
+    return get_collection_partagee(MONGO_URI, DATABASE_NAME, collection_name)
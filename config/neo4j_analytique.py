@@ -0,0 +1,149 @@
+# config/neo4j_analytique.py
+"""Analyse du graphe Neo4j calculée hors ligne, après chaque synchronisation.
+
+Pour chaque entité : degré, degré pondéré (nombre de relations), PageRank et
+communauté Louvain, calculés avec NetworkX sur les arêtes lues dans Neo4j.
+Les scores sont réécrits comme propriétés des nœuds (degre, degre_pondere,
+pagerank, communaute) et exportés dans un fichier compact lu par la page
+"Graphe" du tableau de bord, qui n'a plus rien à recalculer :
+    <ANALYTICS_DIR>/graphe_<langue>.csv.gz   (Nom, degre, degre_pondere, pagerank, communaute)
+    <ANALYTICS_DIR>/graphe_<langue>.json     (noeuds, aretes, densite, calcule_le)
+
+Usage :
+    python config/neo4j_analytique.py fr|en|ar
+"""
+import os
+import sys
+import json
+from collections import defaultdict
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config.neo4j_loader import TAILLE_LOT_NEO4J, _lots, _executer
+
+DOSSIER_ANALYTIQUE = os.getenv("ANALYTICS_DIR", os.path.join(os.path.dirname(__file__), "..", "analytics"))
+COLONNES_SCORES = ["Nom", "degre", "degre_pondere", "pagerank", "communaute"]
+
+# FR / EN : nœuds :Entity ; AR : labels dynamiques (type d'entité) dans la même base que FR
+FILTRES_LANGUE = {
+    "fr": "MATCH (a:Entity)-[r]->(b:Entity)",
+    "en": "MATCH (a:Entity)-[r]->(b:Entity)",
+    "ar": "MATCH (a)-[r]->(b) WHERE NOT a:Entity AND NOT b:Entity AND NOT a:SyncState AND NOT b:SyncState",
+}
+
+def chemins(langue, dossier=None):
+    dossier = dossier or DOSSIER_ANALYTIQUE
+    return (os.path.join(dossier, f"graphe_{langue}.csv.gz"),
+            os.path.join(dossier, f"graphe_{langue}.json"))
+
+def lire_aretes(driver, langue, database=None):
+    """Arêtes agrégées (source, cible, nombre de relations) et label de chaque nœud."""
+    requete = (FILTRES_LANGUE[langue] +
+               " RETURN a.name AS source, labels(a)[0] AS label_source, "
+               "b.name AS cible, labels(b)[0] AS label_cible, count(r) AS poids")
+    aretes, labels = [], defaultdict(set)
+    with driver.session(database=database) as session:
+        for record in session.run(requete):
+            if record["source"] is None or record["cible"] is None:
+                continue
+            aretes.append((record["source"], record["cible"], record["poids"]))
+            labels[record["label_source"]].add(record["source"])
+            labels[record["label_cible"]].add(record["cible"])
+    return aretes, labels
+
+def calculer_scores(aretes):
+    """DataFrame des scores par entité et métriques globales du graphe (non orienté, pondéré)."""
+    import networkx as nx
+    import community as community_louvain
+
+    G = nx.Graph()
+    for source, cible, poids in aretes:
+        if G.has_edge(source, cible):
+            G[source][cible]["weight"] += poids
+        else:
+            G.add_edge(source, cible, weight=poids)
+
+    if len(G) == 0:
+        return pd.DataFrame(columns=COLONNES_SCORES), {"noeuds": 0, "aretes": 0, "densite": 0.0}
+
+    degres = dict(G.degree())
+    degres_ponderes = dict(G.degree(weight="weight"))
+    pagerank = nx.pagerank(G, weight="weight")
+    communautes = community_louvain.best_partition(G, weight="weight", random_state=42)
+
+    scores = pd.DataFrame({
+        "Nom": list(G.nodes),
+        "degre": [degres[n] for n in G.nodes],
+        "degre_pondere": [degres_ponderes[n] for n in G.nodes],
+        "pagerank": [pagerank[n] for n in G.nodes],
+        "communaute": [communautes[n] for n in G.nodes],
+    })
+    scores = scores.astype({"degre": "int32", "degre_pondere": "int32",
+                            "pagerank": "float32", "communaute": "int32"})
+    meta = {"noeuds": G.number_of_nodes(), "aretes": G.number_of_edges(), "densite": nx.density(G)}
+    return scores, meta
+
+def ecrire_proprietes(driver, scores, labels, taille_lot=TAILLE_LOT_NEO4J, database=None):
+    """Réécrit les scores comme propriétés des nœuds, par label et par lots UNWIND."""
+    lignes_par_nom = scores.set_index("Nom").to_dict("index")
+    with driver.session(database=database) as session:
+        for label, noms in labels.items():
+            lignes = [{"name": nom, **{k: v.item() if hasattr(v, "item") else v
+                                        for k, v in lignes_par_nom[nom].items()}}
+                      for nom in noms if nom in lignes_par_nom]
+            requete = (
+                "UNWIND $rows AS r "
+                f"MATCH (n:`{label}` {{name: r.name}}) "
+                "SET n.degre = r.degre, n.degre_pondere = r.degre_pondere, "
+                "n.pagerank = r.pagerank, n.communaute = r.communaute"
+            )
+            for lot in _lots(lignes, taille_lot):
+                session.execute_write(_executer, requete, lot)
+
+def exporter(langue, scores, meta, dossier=None):
+    """Écrit le fichier de scores et ses métadonnées (remplacement atomique)."""
+    fichier_scores, fichier_meta = chemins(langue, dossier)
+    os.makedirs(os.path.dirname(fichier_scores), exist_ok=True)
+    scores.to_csv(fichier_scores + ".tmp", index=False, compression="gzip")
+    os.replace(fichier_scores + ".tmp", fichier_scores)
+    with open(fichier_meta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({**meta, "calcule_le": datetime.now().isoformat(timespec="seconds")}, f)
+    os.replace(fichier_meta + ".tmp", fichier_meta)
+
+def lire_scores(langue, dossier=None):
+    """Scores précalculés (DataFrame indexé par Nom) et métadonnées ; (None, None) si absents."""
+    fichier_scores, fichier_meta = chemins(langue, dossier)
+    if not (os.path.exists(fichier_scores) and os.path.exists(fichier_meta)):
+        return None, None
+    scores = pd.read_csv(fichier_scores).set_index("Nom")
+    with open(fichier_meta, encoding="utf-8") as f:
+        meta = json.load(f)
+    return scores, meta
+
+def analyser_graphe(driver, langue, dossier=None, database=None):
+    """Calcule les scores du graphe `langue`, les réécrit dans Neo4j et les exporte."""
+    print(f"🔍 Analyse du graphe {langue}...")
+    aretes, labels = lire_aretes(driver, langue, database)
+    scores, meta = calculer_scores(aretes)
+    ecrire_proprietes(driver, scores, labels, database=database)
+    exporter(langue, scores, meta, dossier)
+    print(f"✅ Graphe {langue} : {meta['noeuds']} nœuds, {meta['aretes']} arêtes, "
+          f"{scores['communaute'].nunique() if len(scores) else 0} communautés.")
+    return scores, meta
+
+if __name__ == "__main__":
+    langue = sys.argv[1] if len(sys.argv) > 1 else "fr"
+    if langue == "en":
+        from config.neo4j_en import Neo4jConnection
+    elif langue == "ar":
+        from config.neoj4 import Neo4jConnection
+    else:
+        from config.neo4j_fr import Neo4jConnection
+    connexion = Neo4jConnection()
+    try:
+        analyser_graphe(connexion._driver, langue)
+    finally:
+        connexion.close()
@@ -1,7 +1,9 @@
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 import os
-import re
+from neo4j.exceptions import SessionExpired, ServiceUnavailable
+from config.connections import get_neo4j_driver, executer
+from config.neo4j_loader import ChargeurGraphe, initialiser_schema
+from config.types_relations import type_canonique, cle_phrase
 # Charger les variables d'environnement
 load_dotenv()
 
@@ -19,17 +21,54 @@ class Neo4jConnection:
         if not uri or not user or not password:
             raise ValueError("Les variables d'environnement Neo4j ne sont pas correctement chargées.")
 
-        self._driver = GraphDatabase.driver(uri, auth=(user, password))
+        # Driver (pool de connexions) partagé par le processus
+        self._uri, self._user = uri, user
+        self._driver = get_neo4j_driver(uri, user, password)
+        # Session réutilisée par create_entity / create_relation (une session n'est pas thread-safe)
+        self._session = None
 
     def close(self):
-        """Ferme la connexion."""
-        if self._driver:
-            self._driver.close()
+        """Ferme la session de cette connexion. Le driver partagé reste ouvert pour ses
+        autres détenteurs : sa durée de vie est gérée par config.connections."""
+        self._fermer_session()
+        self._driver = None
 
     def session(self):
         """Retourne une session Neo4j."""
         return self._driver.session()
 
+    def initialiser_schema(self):
+        """Crée la contrainte d'unicité sur Entity.name et l'index sur Entity.type (idempotent)."""
+        initialiser_schema(self._driver, ["Entity"])
+
+    def chargeur(self, **options):
+        """Chargeur par lots UNWIND utilisant le driver de cette connexion."""
+        return ChargeurGraphe(self._driver, **options)
+
+    def _session_courante(self):
+        if self._session is None:
+            self._session = self._driver.session()
+        return self._session
+
+    def _fermer_session(self):
+        if self._session is not None:
+            try:
+                self._session.close()
+            except Exception:
+                pass  # session déjà expirée
+            self._session = None
+
+    def _executer(self, query, **parametres):
+        """Exécute une requête sur la session réutilisée ; si la session a expiré ou si le
+        serveur est indisponible, elle est recréée et la requête réessayée."""
+        def appel():
+            try:
+                return self._session_courante().run(query, **parametres).consume()
+            except (SessionExpired, ServiceUnavailable):
+                self._fermer_session()
+                raise
+        return executer(appel, exceptions=(SessionExpired, ServiceUnavailable))
+
     def test_connection(self):
         """Teste la connexion en exécutant une requête simple."""
         with self.session() as session:
@@ -37,37 +76,41 @@ class Neo4jConnection:
             return result.single()["message"]
     def create_entity(self, name, type_):
         """Crée un noeud Entity avec nom et type."""
-        with self._driver.session() as session:
-            session.run(
-                """
-                MERGE (e:Entity {name: $name})
-                SET e.type = $type
-                """,
-                name=name,
-                type=type_
-            )
+        self._executer(
+            """
+            MERGE (e:Entity {name: $name})
+            SET e.type = $type
+            """,
+            name=name,
+            type=type_
+        )
 
     def create_relation(self, source_name, source_type, target_name, target_type, relation_type, article_id):
         """Crée une relation dynamique entre deux entités."""
-        # Nettoyer le nom de la relation pour Neo4j (pas d'espace, caractères spéciaux)
-        relation_type = re.sub(r'\W+', '_', relation_type)  # Remplacer tout caractère non-alphanumérique par "_"
+        # Type canonique borné (config.types_relations) ; la phrase brute est gardée en propriété
+        phrase = relation_type
+        relation_type = type_canonique(relation_type)
 
-        with self._driver.session() as session:
-            query = f"""
-            MATCH (a:Entity {{name: $source_name}}), (b:Entity {{name: $target_name}})
-            MERGE (a)-[r:`{relation_type}` {{article_id: $article_id}}]->(b)
-            """
-            session.run(
-                query,
-                source_name=source_name,
-                target_name=target_name,
-                article_id=article_id
-            )
+        query = f"""
+        MATCH (a:Entity {{name: $source_name}}), (b:Entity {{name: $target_name}})
+        MERGE (a)-[r:`{relation_type}` {{article_id: $article_id, cle_phrase: $cle}}]->(b)
+        SET r.phrase = $phrase
+        """
+        self._executer(
+            query,
+            source_name=source_name,
+            target_name=target_name,
+            article_id=article_id,
+            cle=cle_phrase(phrase),
+            phrase=phrase
+        )
 
 # ✅ Tester la connexion avec gestion des erreurs
-try:
-    neo4j_conn = Neo4jConnection()
-    print(neo4j_conn.test_connection())  # Doit afficher "Connexion réussie"
-    neo4j_conn.close()
-except Exception as e:
-    print("❌ Erreur de connexion à Neo4j:", e)
+if __name__ == "__main__":
+    try:
+        neo4j_conn = Neo4jConnection()
+        print(neo4j_conn.test_connection())  # Doit afficher "Connexion réussie"
+        neo4j_conn.initialiser_schema()
+        neo4j_conn.close()
+    except Exception as e:
+        print("❌ Erreur de connexion à Neo4j:", e)
@@ -0,0 +1,168 @@
+# config/neo4j_loader.py
+"""Chargement en masse du graphe Neo4j par lots UNWIND.
+
+Au lieu d'une session et d'une transaction par entité et par relation, les
+lignes sont regroupées par type de relation (le type ne peut pas être passé
+en paramètre Cypher) et envoyées par lots de plusieurs milliers de lignes,
+une transaction par lot.
+
+Le chargeur refuse d'écrire tant que la contrainte d'unicité sur `name` de
+chaque label concerné n'existe pas (sans index, chaque MERGE parcourt tout le
+label) : exécuter initialiser_schema() au préalable.
+
+Les types de relation sont ramenés à un ensemble borné de types canoniques
+(config.types_relations) ; la phrase extraite est gardée dans `phrase`. Les
+MERGE portent sur `cle_phrase` (config.types_relations.cle_phrase), que la
+migration des anciens types (config/migrer_types_relations.py) sait reproduire ;
+`phrase` est posée par SET, hors de la clé.
+"""
+import re
+from collections import defaultdict
+
+from config.types_relations import type_canonique, cle_phrase
+
+# Nombre de lignes par transaction UNWIND
+TAILLE_LOT_NEO4J = 5000
+
+def nettoyer_identifiant(texte):
+    """Nom de type/label utilisable entre backticks (caractères non alphanumériques → "_")."""
+    return re.sub(r'\W+', '_', str(texte or "").strip()) or "RELATED_TO"
+
+class SchemaNeo4jManquant(RuntimeError):
+    """Contraintes d'unicité absentes : le chargement en masse serait un parcours de label par ligne."""
+
+def requetes_schema(label):
+    """Contrainte d'unicité sur name (qui crée aussi l'index) et index sur type pour un label."""
+    label = nettoyer_identifiant(label)
+    return [
+        f"CREATE CONSTRAINT `{label}_name_unique` IF NOT EXISTS FOR (n:`{label}`) REQUIRE n.name IS UNIQUE",
+        f"CREATE INDEX `{label}_type` IF NOT EXISTS FOR (n:`{label}`) ON (n.type)",
+    ]
+
+def initialiser_schema(driver, labels=("Entity",), database=None):
+    """Crée (si besoin) les contraintes et index des labels donnés."""
+    with driver.session(database=database) as session:
+        for label in labels:
+            for requete in requetes_schema(label):
+                session.run(requete).consume()
+    print(f"✅ Schéma Neo4j prêt pour : {', '.join(nettoyer_identifiant(l) for l in labels)}")
+
+def labels_indexes(driver, database=None):
+    """Labels disposant d'une contrainte d'unicité (ou clé de nœud) sur la seule propriété name."""
+    with driver.session(database=database) as session:
+        resultat = session.run(
+            "SHOW CONSTRAINTS YIELD type, entityType, labelsOrTypes, properties "
+            "WHERE entityType = 'NODE' AND type IN ['UNIQUENESS', 'NODE_KEY'] AND properties = ['name'] "
+            "RETURN labelsOrTypes"
+        )
+        return {label for record in resultat for label in record["labelsOrTypes"]}
+
+def _lots(lignes, taille):
+    for i in range(0, len(lignes), taille):
+        yield lignes[i:i + taille]
+
+def _executer(tx, requete, lignes):
+    tx.run(requete, rows=lignes).consume()
+
+class ChargeurGraphe:
+    """Écrit entités et relations dans Neo4j par lots UNWIND."""
+
+    def __init__(self, driver, taille_lot=TAILLE_LOT_NEO4J, database=None, verifier_schema=True):
+        self.driver = driver
+        self.taille_lot = taille_lot
+        self.database = database
+        self.verifier_schema = verifier_schema
+        self._labels_indexes = None
+
+    def verifier(self, labels):
+        """Lève SchemaNeo4jManquant si un des labels n'a pas sa contrainte d'unicité sur name."""
+        if not self.verifier_schema:
+            return
+        if self._labels_indexes is None or not set(labels) <= self._labels_indexes:
+            self._labels_indexes = labels_indexes(self.driver, self.database)
+        manquants = sorted(set(labels) - self._labels_indexes)
+        if manquants:
+            raise SchemaNeo4jManquant(
+                f"Contrainte d'unicité sur name absente pour {manquants} : "
+                f"exécuter initialiser_schema() avant le chargement."
+            )
+
+    def _ecrire(self, requete, lignes):
+        total = 0
+        with self.driver.session(database=self.database) as session:
+            for lot in _lots(lignes, self.taille_lot):
+                session.execute_write(_executer, requete, lot)
+                total += len(lot)
+        return total
+
+    # ----- Modèle FR / EN : (:Entity {name, type})-[:TYPE {article_id, cle_phrase, phrase}]->(:Entity) -----
+
+    def charger_entites(self, entites):
+        """:param entites: dict nom → type (ou itérable de (nom, type))."""
+        self.verifier(["Entity"])
+        entites = dict(entites)
+        lignes = [{"name": nom, "type": type_} for nom, type_ in entites.items() if nom]
+        return self._ecrire(
+            "UNWIND $rows AS r "
+            "MERGE (e:Entity {name: r.name}) "
+            "SET e.type = r.type",
+            lignes,
+        )
+
+    def charger_relations(self, relations):
+        """:param relations: dicts {source, cible, relation, article_id} ; les entités doivent exister."""
+        self.verifier(["Entity"])
+        par_type = defaultdict(list)
+        for rel in relations:
+            par_type[type_canonique(rel["relation"])].append(
+                {"source": rel["source"], "cible": rel["cible"], "article_id": rel.get("article_id"),
+                 "cle": cle_phrase(rel["relation"]), "phrase": rel["relation"]}
+            )
+        total = 0
+        for type_relation, lignes in par_type.items():
+            total += self._ecrire(
+                "UNWIND $rows AS r "
+                "MATCH (a:Entity {name: r.source}) "
+                "MATCH (b:Entity {name: r.cible}) "
+                f"MERGE (a)-[rel:`{type_relation}` {{article_id: r.article_id, cle_phrase: r.cle}}]->(b) "
+                "SET rel.phrase = r.phrase",
+                lignes,
+            )
+        return total
+
+    def charger_relations_entites(self, relations):
+        """Lignes Supabase (nom_source, type_source, nom_cible, type_cible, relation, article_id) :
+        entités puis relations, chacune par lots."""
+        entites = {}
+        lignes = []
+        for rel in relations:
+            entites[rel["nom_source"]] = rel["type_source"]
+            entites[rel["nom_cible"]] = rel["type_cible"]
+            lignes.append({"source": rel["nom_source"], "cible": rel["nom_cible"],
+                           "relation": rel["relation"], "article_id": rel["article_id"]})
+        self.charger_entites(entites)
+        return self.charger_relations(lignes)
+
+    # ----- Modèle AR : (:TypeSource {name})-[:TYPE {cle_phrase, phrase}]->(:TypeCible {name}) -----
+
+    def charger_relations_labels(self, relations):
+        """Lignes (nom_source, type_source, nom_cible, type_cible, relation) avec labels dynamiques :
+        regroupées par (label source, label cible, type de relation)."""
+        groupes = defaultdict(list)
+        for rel in relations:
+            cle = (nettoyer_identifiant(rel["type_source"]), nettoyer_identifiant(rel["type_cible"]),
+                   type_canonique(rel["relation"]))
+            groupes[cle].append({"source": rel["nom_source"], "cible": rel["nom_cible"],
+                                 "cle": cle_phrase(rel["relation"]), "phrase": rel["relation"]})
+        self.verifier({label for cle in groupes for label in cle[:2]})
+        total = 0
+        for (label_source, label_cible, type_relation), lignes in groupes.items():
+            total += self._ecrire(
+                "UNWIND $rows AS r "
+                f"MERGE (a:`{label_source}` {{name: r.source}}) "
+                f"MERGE (b:`{label_cible}` {{name: r.cible}}) "
+                f"MERGE (a)-[rel:`{type_relation}` {{cle_phrase: r.cle}}]->(b) "
+                "SET rel.phrase = r.phrase",
+                lignes,
+            )
+        return total
@@ -0,0 +1,107 @@
+# config/neo4j_sync.py
+"""Synchronisation incrémentale Supabase → Neo4j par marque de niveau (id).
+
+Le dernier id de relation synchronisé est mémorisé par langue, dans Neo4j
+(nœud :SyncState, par défaut) ou dans un fichier d'état local
+(NEO4J_SYNC_STATE=chemin.json). Chaque exécution ne lit que les lignes
+`id > marque`, page par page, et avance la marque après chaque page écrite :
+le coût d'un rafraîchissement dépend du volume de nouvelles relations, pas
+de la taille de la table.
+
+Les ids sont attribués à l'INSERT mais visibles au COMMIT : une transaction
+concurrente plus lente peut rendre visible un id inférieur à la marque après
+son passage. Chaque exécution relit donc aussi les NEO4J_SYNC_MARGE_IDS ids
+sous la marque ; le chargement (MERGE) étant idempotent, les lignes déjà
+synchronisées ne créent rien de nouveau.
+"""
+import os
+import json
+
+TAILLE_PAGE_SYNC = 1000
+# Fenêtre d'ids relue sous la marque à chaque exécution (commits concurrents en retard)
+MARGE_IDS = int(os.getenv("NEO4J_SYNC_MARGE_IDS", "1000"))
+FICHIER_ETAT = os.getenv("NEO4J_SYNC_STATE", "")
+
+class EtatFichier:
+    """Marques de niveau stockées dans un fichier JSON {langue: dernier_id}."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+
+    def _lire(self):
+        if not os.path.exists(self.chemin):
+            return {}
+        with open(self.chemin, encoding="utf-8") as f:
+            return json.load(f)
+
+    def lire(self, langue):
+        return self._lire().get(langue, 0)
+
+    def ecrire(self, langue, dernier_id):
+        etat = self._lire()
+        etat[langue] = dernier_id
+        temporaire = self.chemin + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            json.dump(etat, f)
+        os.replace(temporaire, self.chemin)
+
+class EtatNeo4j:
+    """Marques de niveau stockées dans le graphe : (:SyncState {langue, dernier_id})."""
+
+    def __init__(self, driver, database=None):
+        self.driver = driver
+        self.database = database
+
+    def lire(self, langue):
+        with self.driver.session(database=self.database) as session:
+            record = session.run(
+                "MATCH (s:SyncState {langue: $langue}) RETURN s.dernier_id AS dernier_id", langue=langue
+            ).single()
+        return record["dernier_id"] if record and record["dernier_id"] is not None else 0
+
+    def ecrire(self, langue, dernier_id):
+        with self.driver.session(database=self.database) as session:
+            session.run(
+                "MERGE (s:SyncState {langue: $langue}) "
+                "SET s.dernier_id = $dernier_id, s.mis_a_jour = datetime()",
+                langue=langue, dernier_id=dernier_id,
+            ).consume()
+
+def etat_par_defaut(driver):
+    return EtatFichier(FICHIER_ETAT) if FICHIER_ETAT else EtatNeo4j(driver)
+
+def synchroniser(langue, table, client, charger, etat, colonnes="*", taille_page=TAILLE_PAGE_SYNC,
+                 marge=MARGE_IDS):
+    """Pousse dans Neo4j les lignes de `table` dont l'id dépasse la marque de `langue` moins `marge`.
+
+    :param charger: fonction recevant une page de lignes (ex. ChargeurGraphe.charger_relations_entites).
+    :param etat: EtatNeo4j ou EtatFichier.
+    :param marge: nombre d'ids relus sous la marque (lignes commitées en retard).
+    :return: nombre de lignes d'id supérieur à la marque initiale (la marge relue n'est pas comptée)."""
+    marque = etat.lire(langue)
+    depart = marque
+    curseur = max(0, marque - marge)
+    print(f"🔍 Synchronisation {table} à partir de l'id {curseur} (marque {marque})...")
+    total, relues = 0, 0
+    while True:
+        page = (client.table(table)
+                .select(colonnes)
+                .gt("id", curseur)
+                .order("id")
+                .limit(taille_page)
+                .execute()).data
+        if not page:
+            break
+        charger(page)
+        curseur = page[-1]["id"]
+        # La marque ne recule jamais pendant la relecture de la marge
+        if curseur > marque:
+            marque = curseur
+            etat.ecrire(langue, marque)
+        relues += len(page)
+        total += sum(1 for ligne in page if ligne["id"] > depart)
+        print(f"✅ {relues} relations synchronisées (id ≤ {curseur}).")
+        if len(page) < taille_page:
+            break
+    print(f"🎉 Synchronisation {langue} terminée : {total} nouvelles relations ({relues} relues, marque {marque}).")
+    return total
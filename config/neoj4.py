@@ -1,6 +1,6 @@
-from neo4j import GraphDatabase
 from dotenv import load_dotenv
 import os
+from config.connections import get_neo4j_driver
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -19,12 +19,14 @@ class Neo4jConnection:
         if not uri or not user or not password:
             raise ValueError("Les variables d'environnement Neo4j ne sont pas correctement chargées.")
 
-        self._driver = GraphDatabase.driver(uri, auth=(user, password))
+        # Driver (pool de connexions) partagé par le processus
+        self._uri, self._user = uri, user
+        self._driver = get_neo4j_driver(uri, user, password)
 
     def close(self):
-        """Ferme la connexion."""
-        if self._driver:
-            self._driver.close()
+        """Libère cette connexion. Le driver partagé reste ouvert pour ses autres
+        détenteurs : sa durée de vie est gérée par config.connections."""
+        self._driver = None
 
     def session(self):
         """Retourne une session Neo4j."""
@@ -37,9 +39,10 @@ class Neo4jConnection:
             return result.single()["message"]
 
 # ✅ Tester la connexion avec gestion des erreurs
-try:
-    neo4j_conn = Neo4jConnection()
-    print(neo4j_conn.test_connection())  # Doit afficher "Connexion réussie"
-    neo4j_conn.close()
-except Exception as e:
-    print("❌ Erreur de connexion à Neo4j:", e)
+if __name__ == "__main__":
+    try:
+        neo4j_conn = Neo4jConnection()
+        print(neo4j_conn.test_connection())  # Doit afficher "Connexion réussie"
+        neo4j_conn.close()
+    except Exception as e:
+        print("❌ Erreur de connexion à Neo4j:", e)
@@ -1,7 +1,6 @@
 import os
-from supabase import create_client, Client
-from supabase.client import ClientOptions
 from dotenv import load_dotenv
+from config.connections import SupabaseParProcessus
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -14,15 +13,7 @@ print("URL récupérée:", url)
 if not url or not key:
     raise ValueError("Les variables d'environnement SUPABASE_URL et SUPABASE_KEY ne sont pas définies.")
 
-# Création du client Supabase
-supabase = create_client(
-    url, 
-    key,
-    options=ClientOptions(
-        postgrest_client_timeout=10,
-        storage_client_timeout=10,
-        schema="public",
-    )
-)
+# Client Supabase partagé par le processus (créé au premier appel, recréé après un fork)
+supabase = SupabaseParProcessus(url, key)
 
 print("Connexion réussie à Supabase !") 
\ No newline at end of file
@@ -0,0 +1,90 @@
+# config/types_relations.py
+"""Normalisation des relations en un ensemble borné de types Neo4j canoniques.
+
+Les relations extraites sont des phrases libres (verbes spaCy en français,
+labels zero-shot en anglais, labels arabes) : en faire directement des types
+de relation Neo4j crée des milliers de types. Chaque phrase est ici ramenée à
+un type canonique ; la phrase d'origine est conservée dans la propriété
+`phrase` de la relation ; sa forme normalisée `cle_phrase` sert de clé aux MERGE.
+"""
+import re
+from functools import lru_cache
+
+TYPE_PAR_DEFAUT = "RELATED_TO"
+
+TYPES_CANONIQUES = [
+    "LOCATED_IN", "WORKS_FOR", "PART_OF", "OWNED_BY", "AFFILIATED_WITH",
+    "ORGANIZED_BY", "PARTICIPATED_IN", "COLLABORATES_WITH", "MET_WITH", "VISITED",
+    "DECLARED", "LEADS", "SIGNED", "SUPPORTS", "OPPOSES", "CONCERNS", TYPE_PAR_DEFAUT,
+]
+
+# Phrases connues (labels des modèles et prépositions du pipeline FR), comparées en minuscules
+CORRESPONDANCES = {
+    # EN : labels du moteur de relations
+    "related to": "RELATED_TO",
+    "works for": "WORKS_FOR",
+    "located at": "LOCATED_IN",
+    "part of": "PART_OF",
+    "owned by": "OWNED_BY",
+    # AR : labels ACE et leurs traductions
+    "org-aff": "AFFILIATED_WITH",
+    "part-whole": "PART_OF",
+    "gen-aff": "AFFILIATED_WITH",
+    "phys": "LOCATED_IN",
+    "ينتمي إلى": "AFFILIATED_WITH",
+    "جزء من": "PART_OF",
+    "علاقة جغرافية": "LOCATED_IN",
+    "مادي": "LOCATED_IN",
+    # FR : prépositions (fix.PREP_MAPPING) et défaut
+    "a lieu à": "LOCATED_IN",
+    "se déroule dans": "LOCATED_IN",
+    "organisé par": "ORGANIZED_BY",
+    "associé à": "RELATED_TO",
+    "en collaboration avec": "COLLABORATES_WITH",
+    "destiné à": "CONCERNS",
+    "concernant": "CONCERNS",
+    "en relation avec": "RELATED_TO",
+}
+
+# Règles sur les phrases libres (verbes FR / EN / AR), dans l'ordre de priorité.
+# « قال » n'est reconnu qu'en début de mot ou après و / ف : pas dans استقال (démissionner) ni مقال (article)
+REGLES = [
+    ("MET_WITH", r"rencontr|re[çc]u|recevoir|entretien|entretenu|\bmeet|\bmet\b|received|استقبل|التقى|اجتمع"),
+    ("VISITED", r"visit|زار|زيارة"),
+    ("SIGNED", r"\bsign(?:e[dsr]?|ing|é|ée|és|ées|ent|ature|ataires?)?\b|وقع|توقيع"),
+    ("LEADS", r"pr[ée]sid|dirig|\blead|\bled\b|chair|\bhead|ترأس|يقود"),
+    ("ORGANIZED_BY", r"organis|organiz|نظم"),
+    ("PARTICIPATED_IN", r"particip|assist|attend|take part|took part|شارك"),
+    ("COLLABORATES_WITH", r"collabor|coop[ée]r|partenari|partner|تعاون|شراكة"),
+    ("SUPPORTS", r"soutien|soutenu|soutenir|support|appuy|\bback|دعم|يدعم"),
+    ("OPPOSES", r"oppos|condamn|critiqu|rejet|reject|condemn|critici|رفض|أدان|انتقد"),
+    ("DECLARED", r"\bdire\b|\bdit\b|d[ée]clar|annon[cç]|affirm|said|\bsay|announc|\bstat(?:ed?|ing|ement)\b|صرح|أعلن|(?<![^\sوف])قال|أكد"),
+    ("WORKS_FOR", r"travaill|employ|\bwork|يعمل"),
+    ("OWNED_BY", r"poss[èe]d|propri[ée]t|\bown|acqui|يملك"),
+    ("PART_OF", r"membre|member|appartien|belong|فرع"),
+    ("LOCATED_IN", r"situ[ée]|\blieu\b|located|based|held|d[ée]roul|يقع|تقع"),
+]
+_REGLES = [(type_, re.compile(motif, re.IGNORECASE)) for type_, motif in REGLES]
+
+def cle_phrase(phrase):
+    """Clé de relation reproductible depuis la phrase brute comme depuis un ancien nom de type.
+
+    Toute suite de caractères non alphanumériques ou de "_" devient un seul "_", sans "_" en
+    bord : la phrase « a  rencontré » et les anciens types `a_rencontré` (re.sub(r'\W+', '_'))
+    ou `a__rencontré` (espaces → "_") donnent la même clé."""
+    return re.sub(r"[\W_]+", "_", str(phrase or "")).strip("_")
+
+@lru_cache(maxsize=100000)
+def type_canonique(phrase):
+    """Type Neo4j canonique d'une phrase de relation (RELATED_TO si rien ne correspond)."""
+    texte = re.sub(r"[\s_]+", " ", str(phrase or "")).strip().lower()
+    if not texte:
+        return TYPE_PAR_DEFAUT
+    if texte.upper().replace(" ", "_") in TYPES_CANONIQUES:
+        return texte.upper().replace(" ", "_")
+    if texte in CORRESPONDANCES:
+        return CORRESPONDANCES[texte]
+    for type_, motif in _REGLES:
+        if motif.search(texte):
+            return type_
+    return TYPE_PAR_DEFAUT
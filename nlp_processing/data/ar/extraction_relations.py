@@ -1,11 +1,14 @@
+import os
 import time 
 import logging
-from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline, AutoModelForSequenceClassification
 from .connect_supabase import supabase 
 from config.mongo_atlass import get_mongo_atlass_collection 
 from bson import ObjectId  # Import nécessaire pour la conversion en ObjectId
 from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
+from utils.candidats import paires_marquees, FENETRE_TOKENS
+from utils.model_registry import transformers_pipeline
+from utils.pool_processus import executer_en_processus
+from utils.relation_sink import RelationSink
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,19 +17,24 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 collection = get_mongo_atlass_collection("articles_ar")
 
 
-@lru_cache(maxsize=1)
 def load_models():
-    ner_model = AutoModelForTokenClassification.from_pretrained("ychenNLP/arabic-ner-ace")
-    ner_tokenizer = AutoTokenizer.from_pretrained("ychenNLP/arabic-ner-ace")
-    ner_pip = pipeline("ner", model=ner_model, tokenizer=ner_tokenizer, grouped_entities=True)
+    """Modèles NER et relations, chargés au premier appel via le registre partagé
+    (PyTorch FP32 ou ONNX int8 selon NLP_BACKEND)."""
+    ner_pip = transformers_pipeline("ner", "ychenNLP/arabic-ner-ace", grouped_entities=True)
+    re_pip = transformers_pipeline("text-classification", "ychenNLP/arabic-relation-extraction")
 
-    re_model = AutoModelForSequenceClassification.from_pretrained("ychenNLP/arabic-relation-extraction")
-    re_tokenizer = AutoTokenizer.from_pretrained("ychenNLP/arabic-relation-extraction")
-    re_pip = pipeline("text-classification", model=re_model, tokenizer=re_tokenizer)
+    return ner_pip, re_pip, re_pip.tokenizer
 
-    return ner_pip, re_pip, re_tokenizer
+# Nombre de paires classées par passe avant du modèle de relations
+RE_BATCH_SIZE = 32
+# Nombre d'articles dont les paires sont regroupées dans les mêmes lots
+ARTICLES_PAR_GROUPE = 8
+# Mode d'exécution : "threads" (historique) ou "processus" (un jeu de modèles par worker)
+MODE_EXECUTION = os.getenv("AR_EXECUTION_MODE", "threads")
+NB_WORKERS = int(os.getenv("AR_NB_WORKERS", "4"))
+# Écart maximal (en tokens, dans une même phrase) entre les deux entités d'une paire candidate
+FENETRE_PAIRES = int(os.getenv("AR_FENETRE_TOKENS", str(FENETRE_TOKENS)))
 
-ner_pip, re_pip , re_tokenizer= load_models()
 # Dictionnaire de traduction des relations
 relation_translation = {
     "ORG-AFF": "ينتمي إلى",
@@ -36,31 +44,30 @@ relation_translation = {
 }
 
 def process_ner_output(entity_mention, inputs):
-    """Prépare les paires d'entités pour la détection des relations."""
-    re_input = []
-    for idx1 in range(len(entity_mention) - 1):
-        for idx2 in range(idx1 + 1, len(entity_mention)):
-            ent_1 = entity_mention[idx1]
-            ent_2 = entity_mention[idx2]
-            ent_1_type = ent_1['entity_group']
-            ent_2_type = ent_2['entity_group']
-            ent_1_s = ent_1['start']
-            ent_1_e = ent_1['end']
-            ent_2_s = ent_2['start']
-            ent_2_e = ent_2['end']
-            new_re_input = ""
-            for c_idx, c in enumerate(inputs):
-                if c_idx == ent_1_s:
-                    new_re_input += "<{}>".format(ent_1_type)
-                elif c_idx == ent_1_e:
-                    new_re_input += "</{}>".format(ent_1_type)
-                elif c_idx == ent_2_s:
-                    new_re_input += "<{}>".format(ent_2_type)
-                elif c_idx == ent_2_e:
-                    new_re_input += "</{}>".format(ent_2_type)
-                new_re_input += c
-            re_input.append({"re_input": new_re_input, "arg1": ent_1, "arg2": ent_2, "input": inputs})
-    return re_input
+    """Prépare les paires d'entités pour la détection des relations : seules les entités
+    d'une même phrase, à au plus FENETRE_PAIRES tokens d'écart, forment une paire
+    (une fois par couple d'entités), balisée aux positions données par le NER."""
+    positions = [
+        (ent['start'], ent['end'], ent['word'], ent['entity_group'], ent)
+        for ent in entity_mention if ent.get('start') is not None and ent.get('end') is not None
+    ]
+    return [
+        {"re_input": re_input, "arg1": ent_1, "arg2": ent_2, "input": inputs}
+        for ent_1, ent_2, re_input in paires_marquees(inputs, positions, fenetre=FENETRE_PAIRES)
+    ]
+
+def classer_relations(textes):
+    """Classe les entrées marquées par lots rembourrés (quelques passes avant au lieu d'une par paire)."""
+    if not textes:
+        return []
+    # Tri par longueur pour limiter le rembourrage dans chaque lot
+    ordre = sorted(range(len(textes)), key=lambda i: len(textes[i]))
+    _, re_pip, _ = load_models()
+    sorties = re_pip([textes[i] for i in ordre], batch_size=RE_BATCH_SIZE, truncation=True)
+    resultats = [None] * len(textes)
+    for i, sortie in zip(ordre, sorties):
+        resultats[i] = sortie[0] if isinstance(sortie, list) else sortie
+    return resultats
 
 def post_process_re_output(re_output, text_input, ner_output, re_input):
     """Post-traitement des résultats d'extraction des relations."""
@@ -77,61 +84,6 @@ def post_process_re_output(re_output, text_input, ner_output, re_input):
                 "relation": final_output}
     return template
 
-def prepare_relation_inputs(entites, text):
-    """Prépare les paires d'entités pour la détection des relations."""
-    relation_inputs = []
-    
-    seen_pairs = set()
-    
-    # Filtrage des entités : Personnes, Lieux, Organisations, et GPE
-    relevant_entities = { "personnes": entites["personnes"], "lieux": entites["lieux"], "organisations": entites["organisations"], "gpe": entites["gpe"] }
-    
-    for key1, entity_list1 in relevant_entities.items():
-        for key2, entity_list2 in relevant_entities.items():
-            for entity_1 in entity_list1:
-                for entity_2 in entity_list2:
-                    if entity_1 != entity_2 and (entity_1, entity_2) not in seen_pairs:
-                        seen_pairs.add((entity_1, entity_2))
-                        seen_pairs.add((entity_2, entity_1))
-                        marked_text = text.replace(entity_1, f"<{key1.upper()}>{entity_1}</{key1.upper()}>")
-                        marked_text = marked_text.replace(entity_2, f"<{key2.upper()}>{entity_2}</{key2.upper()}>")
-                        
-                        # Troncature des textes si nécessaire
-                        tokens = re_tokenizer.tokenize(marked_text)
-                        if len(tokens) > 510:  # Limite de longueur du modèle
-                            tokens = tokens[:510]
-                        truncated_text = re_tokenizer.convert_tokens_to_string(tokens)
-                        
-                        relation_inputs.append({
-                            "text": truncated_text,
-                            "entity_1": entity_1,
-                            "entity_2": entity_2,
-                            "type_1": key1,
-                            "type_2": key2
-                        })
-    
-    return relation_inputs
-
-def extract_relations_with_entities(text, entites):
-    """Utilise le modèle de Relation Extraction pour détecter les relations entre les entités."""
-    relation_inputs = prepare_relation_inputs(entites, text)
-    relations = []
-    
-    for input_data in relation_inputs:
-        try:
-            prediction = re_pip(input_data["text"])[0]
-            if prediction["label"] != "O":
-                relations.append({
-                    "entity_1": input_data["entity_1"],
-                    "entity_2": input_data["entity_2"],
-                    "relation_type": prediction["label"],
-                    "score": prediction["score"]
-                })
-        except Exception as e:
-            logging.error(f"Erreur lors de la prédiction pour {input_data['entity_1']} et {input_data['entity_2']}: {e}")
-    
-    return relations
-
 def insert_relations_in_supabase(article_id, relations, source_title):
     """Insère les relations extraites dans Supabase en batch."""
     batch_data = []
@@ -151,58 +103,114 @@ def insert_relations_in_supabase(article_id, relations, source_title):
             logging.error(f"❌ Erreur lors de la préparation de la relation : {e}")
 
     if batch_data:
-        try:
-            response = supabase.table("relations_ar").insert(batch_data).execute()
-            if response.error:
-                logging.error(f"❌ Erreur d'insertion dans Supabase : {response.error}")
-            else:
-                logging.info(f"✅ {len(batch_data)} relations insérées avec succès.")
-        except Exception as e:
-            logging.error(f"❌ Erreur lors de l'insertion en batch : {e}")
+        # Upsert groupé : les doublons sont écartés par l'index unique relation_key
+        with RelationSink(supabase, "relations_ar") as sink:
+            sink.ajouter_tout(batch_data)
+        if sink.erreurs:
+            logging.error(f"❌ {sink.erreurs} relations non insérées dans Supabase.")
+        else:
+            logging.info(f"✅ {sink.ecrites} relations insérées avec succès.")
 
 def process_article(doc):
     """Traite chaque article pour extraire les relations et les insérer dans Supabase."""
-    try:
-        titre = doc.get("titre", "").strip()
-        contenu = doc.get("contenu", "").strip()
-        article_id = str(doc.get("_id"))
-        full_text = f"{titre}. {contenu}"
+    process_articles([doc])
 
-        logging.info(f"🔍 Traitement de l'article {article_id}...")
+def process_articles(docs):
+    """Traite un groupe d'articles : NER article par article, puis classification
+    des relations de toutes les paires du groupe en lots, et insertion dans Supabase."""
+    enregistrer_relations_articles(extraire_relations_articles(docs))
 
-        # Extraction des entités nommées
-        ner_output = ner_pip(full_text)
-        entites = {"personnes": [], "lieux": [], "organisations": [], "gpe": []}
+def precharger_modeles():
+    """Charge les modèles NER et relations (appelé au démarrage de chaque worker)."""
+    load_models()
 
-        for entity in ner_output:
-            entity_type = entity['entity_group']
-            if entity_type == "PER":
-                entites["personnes"].append(entity['word'])
-            elif entity_type == "LOC" or entity_type == "FAC" or entity_type == "GPE":
-                entites["lieux"].append(entity['word'])
-            elif entity_type == "ORG":
-                entites["organisations"].append(entity['word'])
-            elif entity_type == "GPE":
-                entites["gpe"].append(entity['word'])
+def enregistrer_relations_articles(resultats):
+    """Insère dans Supabase les relations extraites d'un groupe d'articles."""
+    for article_id, relations, titre in resultats:
+        try:
+            insert_relations_in_supabase(article_id, relations, titre)
+            logging.info(f"✅ Traitement terminé pour l'article {article_id}.")
+        except Exception as e:
+            logging.error(f"Erreur lors du traitement de l'article {article_id}: {e}")
 
-        logging.info(f"🔍 Entités extraites: {entites}")
+def extraire_relations_articles(docs):
+    """NER et classification des relations d'un groupe d'articles, sans écriture.
 
-        # Traitement des relations
-        re_input = process_ner_output(ner_output, full_text)
-        re_output = [re_pip(input_data["re_input"])[0] for input_data in re_input]
-        re_ner_output = post_process_re_output(re_output, full_text, ner_output, re_input)
+    :return: liste de (article_id, relations, titre)."""
+    preparations = []
+    for doc in docs:
+        article_id = str(doc.get("_id"))
+        try:
+            titre = doc.get("titre", "").strip()
+            contenu = doc.get("contenu", "").strip()
+            full_text = f"{titre}. {contenu}"
 
-        logging.info(f"🔍 Relations extraites: {re_ner_output['relation']}")
+            logging.info(f"🔍 Traitement de l'article {article_id}...")
 
-        # Insérer dans Supabase
-        insert_relations_in_supabase(article_id, re_ner_output['relation'], titre)
+            # Extraction des entités nommées
+            ner_output = load_models()[0](full_text)
+            entites = {"personnes": [], "lieux": [], "organisations": [], "gpe": []}
 
-        logging.info(f"✅ Traitement terminé pour l'article {article_id}.")
+            for entity in ner_output:
+                entity_type = entity['entity_group']
+                if entity_type == "PER":
+                    entites["personnes"].append(entity['word'])
+                elif entity_type == "LOC" or entity_type == "FAC" or entity_type == "GPE":
+                    entites["lieux"].append(entity['word'])
+                elif entity_type == "ORG":
+                    entites["organisations"].append(entity['word'])
+                elif entity_type == "GPE":
+                    entites["gpe"].append(entity['word'])
+
+            logging.info(f"🔍 Entités extraites: {entites}")
+
+            re_input = process_ner_output(ner_output, full_text)
+            preparations.append((article_id, titre, full_text, ner_output, re_input))
+        except Exception as e:
+            logging.error(f"Erreur lors du traitement de l'article {article_id}: {e}")
+
+    # Classification des relations de tous les articles du groupe en une série de lots
+    try:
+        re_output_groupe = classer_relations([x["re_input"] for p in preparations for x in p[4]])
     except Exception as e:
-        logging.error(f"Erreur lors du traitement de l'article {article_id}: {e}")
+        # Repli article par article : seul l'article en échec est perdu
+        logging.error(f"Erreur lors de la classification groupée des relations, reprise par article : {e}")
+        re_output_groupe = None
+
+    resultats = []
+    position = 0
+    for article_id, titre, full_text, ner_output, re_input in preparations:
+        try:
+            if re_output_groupe is None:
+                re_output = classer_relations([x["re_input"] for x in re_input])
+            else:
+                re_output = re_output_groupe[position:position + len(re_input)]
+                position += len(re_input)
+            re_ner_output = post_process_re_output(re_output, full_text, ner_output, re_input)
+
+            logging.info(f"🔍 Relations extraites: {re_ner_output['relation']}")
+            resultats.append((article_id, re_ner_output['relation'], titre))
+        except Exception as e:
+            logging.error(f"Erreur lors du traitement de l'article {article_id}: {e}")
+    return resultats
 
-def traiter_relations():
-    """Traite les relations pour tous les articles extraits de MongoDB par lots de 300, en commençant à partir de l'article spécifié."""
+def groupes_articles(skip, batch_size):
+    """Parcourt MongoDB par lots à partir de la position `skip` et produit des groupes d'articles."""
+    while True:
+        batch = list(collection.find().skip(skip).limit(batch_size))
+        if not batch:
+            logging.warning("⚠️ Aucun article trouvé dans la base MongoDB.")
+            break
+        for i in range(0, len(batch), ARTICLES_PAR_GROUPE):
+            yield batch[i:i + ARTICLES_PAR_GROUPE]
+        skip += batch_size
+
+def traiter_relations(mode=None):
+    """Traite les relations pour tous les articles extraits de MongoDB par lots de 300, en commençant à partir de l'article spécifié.
+
+    En mode "processus", les groupes d'articles sont distribués à NB_WORKERS processus
+    (file bornée) et les relations sont insérées par le seul processus principal."""
+    mode = mode or MODE_EXECUTION
     batch_size = 300
     start_article_id = "67b5d3b49211c9a78d8912b4"  # ID de l'article de départ
     
@@ -218,6 +226,14 @@ def traiter_relations():
         logging.warning(f"L'article {start_article_id} n'a pas été trouvé.")
         return  # Si l'article n'est pas trouvé, sortir de la fonction
 
+    if mode == "processus":
+        ecrits, erreurs = executer_en_processus(
+            extraire_relations_articles, groupes_articles(skip, batch_size), enregistrer_relations_articles,
+            nb_workers=NB_WORKERS, initialiser=precharger_modeles
+        )
+        logging.info(f"✅ {ecrits} groupes d'articles traités ({erreurs} erreurs).")
+        return
+
     while True:
         # Récupérer un lot d'articles
         batch = list(collection.find().skip(skip).limit(batch_size))
@@ -225,8 +241,10 @@ def traiter_relations():
             logging.warning("⚠️ Aucun article trouvé dans la base MongoDB.")
             break
 
+        # Groupes d'articles dont les paires sont classées ensemble
+        groupes = [batch[i:i + ARTICLES_PAR_GROUPE] for i in range(0, len(batch), ARTICLES_PAR_GROUPE)]
         with ThreadPoolExecutor(max_workers=4) as executor:
-            executor.map(process_article, batch)
+            executor.map(process_articles, groupes)
 
         # Pause et mise à jour du compteur skip
         delay = 0.01
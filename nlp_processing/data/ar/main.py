@@ -1,12 +1,13 @@
+import os
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from .connect_mongo import connect_mongo
 from .connect_supabase import supabase  # Import de la connexion Supabase
 from .clean_text import clean_text  
-from .tokenize_and_lemmatize_text import tokenize_and_lemmatize_text
-from .ner_extraction import extract_entities_bert
-import stanza
-from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+from .tokenize_and_lemmatize_text import get_stanza, extraire_tokens_lemmes
+from .ner_extraction import extract_entities_bert, get_ner
+from utils.pool_processus import executer_en_processus
+from utils.tampon_supabase import TamponUpsert, ENTITES_AR_UNIQUES
 import time
 
 # Dictionnaire des mois en arabe et leur traduction en numérique (format sur deux chiffres)
@@ -44,41 +45,53 @@ def convertir_date_arabe(date_arabe):
 # Connexion à MongoDB
 mongo_collection = connect_mongo("articles_ar")
 
-# Télécharger les ressources pour Stanza (arabe)
-stanza.download('ar')
-nlp_stanza = stanza.Pipeline('ar', processors='tokenize,mwt,pos,lemma,ner')
-
-# Charger le modèle BERT pour la NER arabe
-model_name = "hatmimoha/arabic-ner"
-model = AutoModelForTokenClassification.from_pretrained(model_name)
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-nlp_ner = pipeline("ner", model=model, tokenizer=tokenizer)
-
-def chunk_text_smart(text, max_length=507):
-    """ Divise le texte en segments de max 512 tokens en respectant les phrases. """
-    doc = nlp_stanza(text)
-    sentences = [" ".join([word.text for word in sent.words]) for sent in doc.sentences]
-
-    chunks, current_chunk, current_length = [], [], 0
-    for sentence in sentences:
-        tokens = tokenizer.tokenize(sentence)
-        token_count = len(tokens)
-
-        while token_count > max_length:
-            chunks.append(tokenizer.convert_tokens_to_string(tokens[:max_length]))
-            tokens = tokens[max_length:]
-            token_count = len(tokens)
-        
-        if current_length + token_count > max_length:
-            if current_chunk:
-                chunks.append(tokenizer.convert_tokens_to_string(current_chunk))
-            current_chunk, current_length = tokens, token_count
-        else:
-            current_chunk.extend(tokens)
+# Mode d'exécution du traitement par lots : "threads" (historique) ou "processus"
+MODE_EXECUTION = os.getenv("AR_EXECUTION_MODE", "threads")
+
+def segments_phrase(text, sentence, tokenizer, max_length):
+    """ Bornes (début, fin, nb tokens BERT) d'une phrase, redécoupée sur les tokens Stanza si elle est trop longue. """
+    debut, fin = sentence.tokens[0].start_char, sentence.tokens[-1].end_char
+    token_count = len(tokenizer.tokenize(text[debut:fin]))
+    if token_count <= max_length:
+        return [(debut, fin, token_count)]
+
+    segments, seg_debut, seg_fin, seg_length = [], None, None, 0
+    for token in sentence.tokens:
+        n = len(tokenizer.tokenize(token.text))
+        if seg_debut is not None and seg_length + n > max_length:
+            segments.append((seg_debut, seg_fin, seg_length))
+            seg_debut, seg_length = None, 0
+        if seg_debut is None:
+            seg_debut = token.start_char
+        seg_fin = token.end_char
+        seg_length += n
+    if seg_debut is not None:
+        segments.append((seg_debut, seg_fin, seg_length))
+    return segments
+
+def chunk_text_smart(text, max_length=507, doc=None):
+    """ Divise le texte en segments de max 512 tokens en respectant les phrases.
+
+    Les segments sont découpés dans le texte d'origine à partir des positions des
+    tokens de l'analyse Stanza `doc` (recalculée seulement si elle n'est pas fournie). """
+    tokenizer = get_ner().tokenizer
+    doc = doc if doc is not None else get_stanza()(text)
+
+    chunks, chunk_debut, chunk_fin, current_length = [], None, None, 0
+    for sentence in doc.sentences:
+        if not sentence.tokens:
+            continue
+        for debut, fin, token_count in segments_phrase(text, sentence, tokenizer, max_length):
+            if chunk_debut is not None and current_length + token_count > max_length:
+                chunks.append(text[chunk_debut:chunk_fin])
+                chunk_debut, current_length = None, 0
+            if chunk_debut is None:
+                chunk_debut = debut
+            chunk_fin = fin
             current_length += token_count
 
-    if current_chunk:
-        chunks.append(tokenizer.convert_tokens_to_string(current_chunk))
+    if chunk_debut is not None:
+        chunks.append(text[chunk_debut:chunk_fin])
 
     return chunks
 
@@ -107,15 +120,15 @@ def merge_entities(entities):
 def process_text(text):
     """ Pipeline NLP complet : nettoyage, segmentation, tokenisation, lemmatisation, NER. """
     cleaned_text = clean_text(text)
-    chunked_texts = chunk_text_smart(cleaned_text)
 
-    all_tokens, all_lemmatized_tokens, all_entities = [], [], []
-    for chunk in chunked_texts:
-        tokens, lemmatized_tokens = tokenize_and_lemmatize_text(chunk)
-        entities = extract_entities_bert(chunk)
-        all_tokens.extend(tokens)
-        all_lemmatized_tokens.extend(lemmatized_tokens)
-        all_entities.extend(entities)
+    # Une seule passe Stanza : phrases, tokens et lemmes
+    doc = get_stanza()(cleaned_text)
+    all_tokens, all_lemmatized_tokens = extraire_tokens_lemmes(doc)
+
+    # Segments pour BERT construits à partir des positions des tokens de cette même analyse
+    all_entities = []
+    for chunk in chunk_text_smart(cleaned_text, doc=doc):
+        all_entities.extend(extract_entities_bert(chunk))
 
     # Correction des tokens fragmentés (ex: ##phosphates) et fusion des entités
     corrected_entities = []
@@ -143,14 +156,33 @@ def process_text(text):
         'entities': unique_entities
     }
 
-def process_and_store_article(article):
-    """ Traite un article individuel et insère les entités dans Supabase """
+# Table Supabase de chaque type d'entité
+TABLES_ENTITES = {
+    'PERSON': "entite_ar_pers",
+    'LOCATION': "entite_ar_loc",
+    'ORGANIZATION': "entite_ar_org",
+    'EVENT': "entite_ar_event",
+}
+
+# Entités accumulées par table et écrites par upserts groupés ; upsert on_conflict seulement
+# avec ENTITES_AR_UNIQUES=1 (contrainte unique (nom, article_id) :
+# config/migrations/001_entites_ar_unique.sql), sinon insertions groupées
+tampon_entites = TamponUpsert(supabase, on_conflict="nom,article_id", contrainte_unique=ENTITES_AR_UNIQUES)
+
+def precharger_modeles():
+    """ Charge les modèles Stanza et BERT (appelé au démarrage de chaque worker). """
+    get_stanza()
+    get_ner()
+
+def extraire_entites_article(article):
+    """ Applique le pipeline NLP à un article et retourne les lignes à insérer : [(table, data)]. """
     titre = article.get("titre", "").strip()
     contenu = article.get("contenu", "").strip()
     article_id = str(article.get("_id"))
     date_article = article.get("date")  # Date au format arabe stockée dans MongoDB
     full_text = f"{titre}. {contenu}"
-    
+
+    lignes = []
     if full_text:
         # Traitement du texte
         result = process_text(full_text)
@@ -161,35 +193,52 @@ def process_and_store_article(article):
         if date_article:
             timestamp = convertir_date_arabe(date_article)
 
-        # Insertion des entités dans Supabase (PostgreSQL)
         for entity, label in entities:
             data = {
                 "nom": entity,
                 "article_id": article_id
             }
-            if label == 'PERSON':
-                response = supabase.table("entite_ar_pers").insert(data).execute()
-            elif label == 'LOCATION':
-                response = supabase.table("entite_ar_loc").insert(data).execute()
-            elif label == 'ORGANIZATION':
-                response = supabase.table("entite_ar_org").insert(data).execute()
-            elif label == 'EVENT':
+            if label == 'EVENT':
                 data["date"] = timestamp  # Date convertie ou None si la conversion a échoué
-                response = supabase.table("entite_ar_event").insert(data).execute()
+            lignes.append((TABLES_ENTITES[label], data))
+    return lignes
 
-            # Vérification de l'insertion
-            if response.data:
-                print(f"✅ Entité enregistrée : {data}")
-            else:
-                print(f"❌ Erreur d'insertion : {response.error_message}")
+def enregistrer_entites(lignes):
+    """ Ajoute au tampon les entités extraites d'un article (écrites par lots dans Supabase). """
+    for table, data in lignes:
+        tampon_entites.ajouter(table, data)
 
-def process_and_store_articles_in_batches(batch_size=300, max_workers=8):
-    """ Récupère les articles par lots, applique le pipeline NLP et insère les entités dans Supabase en parallèle. """
+def enregistrer_entites_article(article):
+    """ Traite un article et ajoute ses entités au tampon du lot en cours. """
+    enregistrer_entites(extraire_entites_article(article))
+
+def process_and_store_article(article):
+    """ Traite un article individuel et insère les entités dans Supabase """
+    enregistrer_entites(extraire_entites_article(article))
+    tampon_entites.vider()
+
+def process_and_store_articles_in_batches(batch_size=300, max_workers=8, mode=None):
+    """ Récupère les articles par lots, applique le pipeline NLP et insère les entités dans Supabase en parallèle.
+
+    mode "threads" : pool de threads partageant les modèles du processus ;
+    mode "processus" : chaque worker est un processus avec ses propres modèles,
+    les entités sont renvoyées au processus principal qui est le seul à écrire. """
+    mode = mode or MODE_EXECUTION
     cursor = mongo_collection.find().limit(batch_size)  # Récupérer les articles par lots
+
+    if mode == "processus":
+        ecrits, erreurs = executer_en_processus(
+            extraire_entites_article, cursor, enregistrer_entites,
+            nb_workers=max_workers, initialiser=precharger_modeles
+        )
+        tampon_entites.vider()
+        print(f"✅ Batch traité ({ecrits} articles, {erreurs} erreurs).")
+        return
+
     articles = list(cursor)
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_article = {executor.submit(process_and_store_article, article): article for article in articles}
+        future_to_article = {executor.submit(enregistrer_entites_article, article): article for article in articles}
 
         for future in as_completed(future_to_article):
             article = future_to_article[future]
@@ -197,7 +246,10 @@ def process_and_store_articles_in_batches(batch_size=300, max_workers=8):
                 future.result()
             except Exception as e:
                 print(f"❌ Erreur dans un thread pour l'article {article.get('_id')}: {e}")
-    print(f"✅ Batch traité.")
+
+    # Écriture groupée des entités de tout le lot
+    ecrites, erreurs = tampon_entites.vider()
+    print(f"✅ Batch traité ({ecrites} entités écrites, {erreurs} en erreur).")
 
 if __name__ == "__main__":
     print("🔍 Traitement des articles en cours...")
@@ -1,8 +1,11 @@
 
-from neo4j import GraphDatabase
 import os
 from dotenv import load_dotenv
 from .connect_supabase import supabase  # Assurez-vous que la connexion Supabase est correcte
+from config.connections import get_neo4j_driver
+from config.neo4j_loader import ChargeurGraphe, initialiser_schema
+from config.neo4j_sync import synchroniser, etat_par_defaut
+from config.neo4j_analytique import analyser_graphe, chemins
 
 # Charger les variables d'environnement depuis le fichier .env
 load_dotenv(override=True)
@@ -39,31 +42,41 @@ def create_relation(tx, nom_source, type_source, nom_cible, type_cible, relation
 
 
 def insert_relations_into_neo4j():
-    driver = GraphDatabase.driver(URI, auth=AUTH)
+    driver = get_neo4j_driver(URI, *AUTH)
     
     try:
-        # Récupérer les relations depuis Supabase
-        response = supabase.table("relations_ar").select("nom_source, type_source, nom_cible, type_cible, relation").execute()
-        
-        # Vérifier si la réponse est valide
-        if response.data is None:
-            print("Aucune donnée trouvée dans Supabase.")
-            return
+        chargeur = ChargeurGraphe(driver)
+        labels_prets = set()  # labels dont le schéma a déjà été créé pendant cette synchronisation
+        required_fields = ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation']
 
-        relations = response.data
-        
-        # Insérer les relations dans Neo4j
-        with driver.session() as session:
-            for rel in relations:
-                rel["relation"] = normalize_relation(rel["relation"])  # Normaliser avant insertion
-                session.execute_write(
-                    create_relation, rel["nom_source"], rel["type_source"], rel["nom_cible"], rel["type_cible"], rel["relation"]
-                )
+        def charger_page(page):
+            # Une valeur nulle ferait échouer le MERGE de toute la page (et bloquerait la marque d'id)
+            relations = []
+            for relation in page:
+                if not all(relation.get(field) is not None for field in required_fields):
+                    print(f"⚠️ Relation incomplète ignorée : {relation}")
+                    continue
+                relations.append(relation)
+
+            # Insérer les relations dans Neo4j par lots UNWIND, regroupées par (labels, type canonique) ;
+            # la relation brute est conservée dans la propriété phrase
+            # Contraintes d'unicité sur name pour les seuls labels dynamiques (types d'entité) nouveaux
+            labels = {t for rel in relations for t in (rel["type_source"], rel["type_cible"])} - labels_prets
+            if labels:
+                initialiser_schema(driver, labels)
+                labels_prets.update(labels)
+            chargeur.charger_relations_labels(relations)
+
+        # Synchronisation incrémentale (id > dernière marque), page par page
+        nouvelles = synchroniser("ar", "relations_ar", supabase, charger_page, etat_par_defaut(driver),
+                                 colonnes="id, nom_source, type_source, nom_cible, type_cible, relation")
+
+        # Scores du graphe (degré, PageRank, communautés) recalculés après chaque synchronisation
+        if nouvelles or not os.path.exists(chemins("ar")[0]):
+            analyser_graphe(driver, "ar")
         print("✅ Relations en arabe insérées avec succès dans Neo4j")
     except Exception as e:
         print(f"❌ Erreur lors de l'insertion dans Neo4j: {e}")
-    finally:
-        driver.close()
 
 if __name__ == "__main__":
     insert_relations_into_neo4j()
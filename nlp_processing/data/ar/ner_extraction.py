@@ -1,12 +1,12 @@
-from transformers import AutoModelForTokenClassification, AutoTokenizer, pipeline
+from utils.model_registry import transformers_pipeline
 
-# Charger le modèle BERT pour la NER arabe
 model_name = "hatmimoha/arabic-ner"
-model = AutoModelForTokenClassification.from_pretrained(model_name)
-tokenizer = AutoTokenizer.from_pretrained(model_name)
-nlp_ner = pipeline("ner", model=model, tokenizer=tokenizer)
+
+def get_ner():
+    """Modèle BERT de NER arabe partagé (PyTorch ou ONNX int8 selon NLP_BACKEND)."""
+    return transformers_pipeline("ner", model_name)
 
 def extract_entities_bert(text):
-    ner_results = nlp_ner(text)
+    ner_results = get_ner()(text)
     entities = [(result['word'], result['entity']) for result in ner_results]
     return entities
\ No newline at end of file
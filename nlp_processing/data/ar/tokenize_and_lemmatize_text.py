@@ -1,25 +1,21 @@
+from utils.model_registry import stanza_pipeline
 
-import stanza
+# Processeurs Stanza de l'analyse arabe : une seule passe fournit phrases, tokens et lemmes
+# (la NER est faite par BERT, le processeur "ner" de Stanza n'est pas nécessaire)
+PROCESSEURS_STANZA = 'tokenize,mwt,pos,lemma'
 
-# Charger le modèle Stanza pour l'arabe
-stanza.download('ar')
-nlp_stanza = stanza.Pipeline('ar', processors='tokenize,mwt,pos,lemma')
+def get_stanza():
+    """Pipeline Stanza arabe partagé (chargé au premier usage, téléchargé seulement s'il manque)."""
+    return stanza_pipeline('ar', PROCESSEURS_STANZA)
 
-# Fonction améliorée de tokenisation et lemmatisation
-def tokenize_and_lemmatize_text(text, debug=False):
+def extraire_tokens_lemmes(doc, debug=False):
     """
-    Tokenise et lemmatise un texte arabe avec Stanza.
-    
-    Args:
-        text (str): Texte en entrée.
-        debug (bool): Si True, affiche les résultats.
+    Extrait les tokens et leurs lemmes d'un document Stanza déjà analysé.
 
     Returns:
         tokens (list): Liste des mots tokenisés.
         lemmatized_tokens (list): Liste des mots après lemmatisation.
     """
-    doc = nlp_stanza(text)
-    
     tokens = []
     lemmatized_tokens = []
     
@@ -36,4 +32,18 @@ def tokenize_and_lemmatize_text(text, debug=False):
     
     return tokens, lemmatized_tokens
 
+# Fonction améliorée de tokenisation et lemmatisation
+def tokenize_and_lemmatize_text(text, debug=False):
+    """
+    Tokenise et lemmatise un texte arabe avec Stanza.
+    
+    Args:
+        text (str): Texte en entrée.
+        debug (bool): Si True, affiche les résultats.
+
+    Returns:
+        tokens (list): Liste des mots tokenisés.
+        lemmatized_tokens (list): Liste des mots après lemmatisation.
+    """
+    return extraire_tokens_lemmes(get_stanza()(text), debug=debug)
 
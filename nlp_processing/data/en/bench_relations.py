@@ -0,0 +1,73 @@
+"""Benchmark de débit du typage des relations (paires/seconde).
+
+Compare le chemin historique de fix.py (un appel zero-shot par paire) au
+MoteurRelations (un appel groupé par article + cache) avec chaque backend.
+
+Usage : python bench_relations.py [nb_articles] [paires_par_article]
+Le backend "classifieur" n'est mesuré que si RELATION_MODEL_PATH est défini.
+"""
+import os
+import sys
+import time
+import random
+from moteur_relations import (MoteurRelations, BackendZeroShot, BackendRegles, BackendClassifieur,
+                              LABELS_RELATIONS, RELATION_PAR_DEFAUT, SEUIL_CONFIANCE)
+
+ENTITES = ["Aziz Akhannouch", "OCP Group", "Rabat", "Casablanca", "Royal Air Maroc",
+           "Morocco", "African Union", "Nasser Bourita", "Tangier Med", "Bank Al-Maghrib"]
+CONTEXTES = [" works for ", " is headquartered in ", " is part of ", " met with ",
+             " was acquired by ", " visited ", " said in ", " is owned by "]
+
+def articles_synthetiques(nb_articles, paires_par_article, graine=0):
+    rng = random.Random(graine)
+    return [
+        [(rng.choice(ENTITES), rng.choice(ENTITES), rng.choice(CONTEXTES)) for _ in range(paires_par_article)]
+        for _ in range(nb_articles)
+    ]
+
+def chemin_historique(backend):
+    """Reproduit l'ancien detecter_relation : un appel zero-shot par paire, sans cache."""
+    def executer(articles):
+        extracteur = backend._get_pipeline()
+        for paires in articles:
+            for span1, span2, _ in paires:
+                result = extracteur(f"{span1} [SEP] {span2}", candidate_labels=LABELS_RELATIONS)
+                _ = result["labels"][0] if result["scores"][0] > SEUIL_CONFIANCE else RELATION_PAR_DEFAUT
+    return executer
+
+def chemin_moteur(backend):
+    def executer(articles):
+        moteur = MoteurRelations(backend)
+        for paires in articles:
+            moteur.typer(paires)
+    return executer
+
+def mesurer(nom, fonction, articles):
+    total = sum(len(p) for p in articles)
+    debut = time.perf_counter()
+    fonction(articles)
+    duree = time.perf_counter() - debut
+    print(f"{nom:<28} | {total:>7} paires | {duree:>8.2f} s | {total / duree:>10.1f} paires/s")
+
+def main(nb_articles=20, paires_par_article=30):
+    articles = articles_synthetiques(nb_articles, paires_par_article)
+
+    # Chargement du modèle zero-shot hors mesure, partagé par les deux chemins
+    zero_shot = BackendZeroShot()
+    zero_shot._get_pipeline()
+
+    candidats = [
+        ("historique (1 appel/paire)", chemin_historique(zero_shot)),
+        ("moteur zero-shot groupé", chemin_moteur(zero_shot)),
+        ("moteur règles", chemin_moteur(BackendRegles())),
+    ]
+    if os.getenv("RELATION_MODEL_PATH"):
+        classifieur = BackendClassifieur()
+        classifieur._get_pipeline()
+        candidats.append(("moteur classifieur", chemin_moteur(classifieur)))
+
+    for nom, fonction in candidats:
+        mesurer(nom, fonction, articles)
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:3]])
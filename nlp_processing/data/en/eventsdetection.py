@@ -1,8 +1,12 @@
-import spacy
+import os
+import sys
 from spacy import displacy
 
-# Chargement du modèle spaCy transformer
-nlp = spacy.load("en_core_web_trf")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from utils.model_registry import spacy_model
+
+# Modèle spaCy transformer, partagé avec extraction_entites et relations
+MODELE_SPACY = "en_core_web_trf"
 
 def remove_duplicate_words(text):
     """Supprime les doublons successifs dans une phrase (insensible à la casse)"""
@@ -18,7 +22,7 @@ def remove_duplicate_words(text):
 def traitement_titre(title):
     """Extrait la proposition principale (événement) d'un titre en anglais"""
 
-    doc = nlp(title)
+    doc = spacy_model(MODELE_SPACY)(title)
     
     # Stratégie 1: Extraire la clause avec un verbe principal
     for sent in doc.sents:
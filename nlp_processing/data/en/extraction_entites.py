@@ -1,14 +1,22 @@
-import spacy
-import stanza
-from transformers import pipeline
+import os
+import sys
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
-# Chargement des modèles
-nlp_spacy = spacy.load("en_core_web_trf")
-nlp_stanza = stanza.Pipeline("en", processors="tokenize,ner")
-nlp_bert = pipeline("ner", model="Jean-Baptiste/roberta-large-ner-english", aggregation_strategy="simple")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from utils.model_registry import spacy_model, stanza_pipeline, transformers_pipeline
+
+# Modèles chargés au premier usage via le registre partagé
+def get_spacy():
+    return spacy_model("en_core_web_trf")
+
+def get_stanza():
+    return stanza_pipeline("en", "tokenize,ner")
+
+def get_bert():
+    # PyTorch FP32 ou ONNX int8 selon NLP_BACKEND
+    return transformers_pipeline("ner", "Jean-Baptiste/roberta-large-ner-english", aggregation_strategy="simple")
 
 # Normalisation des labels
 LABEL_MAPPING = {
@@ -22,15 +30,15 @@ def normalize_label(label):
 
 # Détection des entités avec les 3 modèles
 def extract_entities_spacy(text):
-    doc = nlp_spacy(text)
+    doc = get_spacy()(text)
     return [(ent.text, normalize_label(ent.label_)) for ent in doc.ents]
 
 def extract_entities_stanza(text):
-    doc = nlp_stanza(text)
+    doc = get_stanza()(text)
     return [(ent.text, normalize_label(ent.type)) for ent in doc.ents]
 
 def extract_entities_bert(text):
-    entities = nlp_bert(text)
+    entities = get_bert()(text)
     return [(entity["word"], normalize_label(entity["entity_group"])) for entity in entities]
 
 # Regroupement des noms similaires (NLP-based)
@@ -2,21 +2,18 @@ import sys
 import os
 import time
 import json
-from itertools import combinations
 from bson import ObjectId
 import datetime
-from transformers import BertTokenizer, BertForSequenceClassification, pipeline
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
+from utils.candidats import decouper_phrases, indexer_mentions, generer_paires
+from utils.relation_sink import RelationSink
+from moteur_relations import MoteurRelations
 
-# Chargement du modèle BERT
-tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
-model = BertForSequenceClassification.from_pretrained("bert-base-uncased")
-
-# Utilisation de la pipeline pour la classification zero-shot
-relation_extractor = pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+# Moteur de typage des relations (backend choisi par RELATION_BACKEND, modèle chargé au premier appel)
+moteur_relations = MoteurRelations()
 
 # Connexion à MongoDB
 collection = get_mongo_atlass_collection("articles_eng")
@@ -53,16 +50,9 @@ def get_entites_from_supabase(article_id):
             entities[cat] = set()
     return entities
 
-# Fonction pour détecter la relation entre deux entités en utilisant BERT
-def detecter_relation(text, span1, span2):
-    # Créer une phrase pour BERT en combinant les entités
-    combined_text = f"{span1} [SEP] {span2}"
-    
-    # Utiliser BERT pour prédire la relation entre les entités
-    result = relation_extractor(combined_text, candidate_labels=["related to", "works for", "located at", "part of", "owned by"])
-    
-    # Obtenir la relation avec le score le plus élevé
-    relation = result["labels"][0] if result["scores"][0] > 0.5 else "related to"  # Valeur par défaut si pas assez confiant
+# Fonction pour détecter la relation entre deux entités
+def detecter_relation(text, span1, span2, contexte=""):
+    relation = moteur_relations.typer([(span1, span2, contexte)])[0]
 
     # Affichage pour débogage
     print(f"Relation entre {span1} et {span2}: {relation}")
@@ -94,23 +84,28 @@ def extraire_entites_et_relations(article_id):
     if isinstance(date, (datetime.datetime, datetime.date)):
         date = date.isoformat()
 
-    relations = []
-    for (nom1, cat1), (nom2, cat2) in combinations(entites, 2):
-        if nom1 == nom2:
-            continue
+    # Paires candidates : mentions d'une même phrase à moins de 15 tokens d'écart
+    phrases = decouper_phrases(texte)
+    mentions = indexer_mentions(texte, entites, phrases)
 
-        # Les entités sont déjà extraites via Supabase, donc on ne les extrait pas de texte avec 'nlp'
-        span1 = nom1
-        span2 = nom2
+    paires = list(generer_paires(mentions, fenetre=15))
 
-        # Si les entités sont trop éloignées, ignorer cette paire
-        if abs(texte.find(span1) - texte.find(span2)) > 15:
-            continue
+    # Typage de toutes les paires de l'article en un seul appel (texte entre les deux mentions comme contexte)
+    types_relations = moteur_relations.typer([
+        (m1["nom"], m2["nom"], texte[min(m1["fin"], m2["fin"]):max(m1["debut"], m2["debut"])])
+        for m1, m2 in paires
+    ])
+
+    relations = []
+    for (m1, m2), rel in zip(paires, types_relations):
+        nom1, cat1 = m1["nom"], m1["categorie"]
+        nom2, cat2 = m2["nom"], m2["categorie"]
+        print(f"Relation entre {nom1} et {nom2}: {rel}")
 
-        rel = detecter_relation(texte, span1, span2)
         if rel:
-            # Utilisation du contexte de la relation (phrase) pour `source_title`
-            sentence = texte if texte.find(span1) <= texte.find(span2) else texte
+            # Utilisation de la phrase commune aux deux mentions pour `source_title`
+            debut, fin = phrases[m1["phrase"]]
+            sentence = texte[debut:fin].strip()
             relations.append({
                 "source": nom1,
                 "type_source": category_mapping.get(cat1, cat1),
@@ -126,9 +121,10 @@ def extraire_entites_et_relations(article_id):
 
 # Fonction pour enregistrer les relations dans Supabase
 def enregistrer_relations_dans_supabase(relations):
-    for rel in relations:
-        try:
-            supabase.table("relations_en").insert([{
+    """Écrit les relations d'un article par upserts groupés (doublons écartés via relation_key)."""
+    with RelationSink(supabase, "relations_en") as sink:
+        for rel in relations:
+            sink.ajouter({
                 "nom_source": rel["source"],
                 "type_source": rel["type_source"],
                 "nom_cible": rel["cible"],
@@ -138,10 +134,8 @@ def enregistrer_relations_dans_supabase(relations):
                 "article_id": rel["article_id"],
                 "source": rel["media_source"],         # Champ "source" (média)
                 "date": rel["date"],     # Champ "date"
-            }]).execute()
-            print(f"✅ Relation {rel['source']} --> {rel['cible']} enregistrée.")
-        except Exception as e:
-            print(f"⚠️ Erreur lors de l'enregistrement : {e}")
+            })
+    print(f"✅ {sink.ecrites} relations enregistrées.")
 
 # Fonction pour vérifier si des relations ont déjà été enregistrées
 def relations_deja_enregistrees(article_id):
@@ -11,58 +11,38 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 
 from config.supabasedb import supabase
 from config.neo4j_en import Neo4jConnection  # Import de la connexion Neo4j
+from config.neo4j_sync import synchroniser, etat_par_defaut
+from config.neo4j_analytique import analyser_graphe, chemins
 
 def extract_and_create_graph():
     try:
-        # Connexion à Neo4j
+        # Connexion à Neo4j et chargeur par lots UNWIND
         neo4j_conn = Neo4jConnection()
-
-        # Pagination : initialisation des variables
-        limit = 10000
-        offset = 61775
-        has_more = True
-
-        while has_more:
-            # Récupérer un lot de relations depuis Supabase
-            relations_result = supabase.table("relations_en").select("*").range(offset, offset + limit - 1).execute()
-
-            # Vérifier s'il y a des données
-            if not relations_result.data:
-                print("❌ Aucune donnée trouvée dans relations_en.")
-                break
-
-            print(f"🔍 {len(relations_result.data)} relations récupérées à partir de {offset}.")
-
-            # Traiter chaque relation et ajouter des nœuds et relations dans Neo4j
-            for relation in relations_result.data:
-                required_fields = ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation', 'article_id']
-                if not all(field in relation for field in required_fields):
+        neo4j_conn.initialiser_schema()
+        chargeur = neo4j_conn.chargeur()
+
+        # Synchronisation incrémentale : seules les relations d'id supérieur à la
+        # dernière marque synchronisée sont lues (page par page) et écrites
+        required_fields = ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation', 'article_id']
+
+        def charger_page(page):
+            # Relations complètes de la page, écrites dans Neo4j par lots UNWIND
+            # (entités puis relations regroupées par type, une transaction par lot)
+            relations = []
+            for relation in page:
+                if not all(relation.get(field) is not None for field in required_fields):
                     print(f"⚠️ Relation incomplète ignorée : {relation}")
                     continue
+                relations.append(relation)
+            chargeur.charger_relations_entites(relations)
 
-                nom_source = relation['nom_source']
-                type_source = relation['type_source']
-                nom_cible = relation['nom_cible']
-                type_cible = relation['type_cible']
-                relation_type = relation['relation']
-                article_id = relation['article_id']
-
-                # Créer les entités et relations dans Neo4j
-                neo4j_conn.create_entity(nom_source, type_source)
-                neo4j_conn.create_entity(nom_cible, type_cible)
-
-                neo4j_conn.create_relation(
-                    source_name=nom_source, source_type=type_source,
-                    target_name=nom_cible, target_type=type_cible,
-                    relation_type=relation_type, article_id=article_id
-                )
+        nouvelles = synchroniser("en", "relations_en", supabase, charger_page, etat_par_defaut(neo4j_conn._driver))
 
-            # Si moins de 1000 relations récupérées, c'est qu'on est arrivé à la fin
-            if len(relations_result.data) < limit:
-                has_more = False
-            else:
-                offset += limit
+        # Scores du graphe (degré, PageRank, communautés) recalculés après chaque synchronisation
+        if nouvelles or not os.path.exists(chemins("en")[0]):
+            analyser_graphe(neo4j_conn._driver, "en")
 
+        neo4j_conn.close()
         print("🎉 Création du graphe Neo4j terminée avec succès.")
 
     except Exception as e:
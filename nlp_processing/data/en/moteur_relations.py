@@ -0,0 +1,139 @@
+import os
+import re
+import hashlib
+from collections import OrderedDict
+
+# Labels de relation proposés au modèle
+LABELS_RELATIONS = ["related to", "works for", "located at", "part of", "owned by"]
+RELATION_PAR_DEFAUT = "related to"
+SEUIL_CONFIANCE = 0.5
+
+# Backend utilisé par défaut : "regles" (sans modèle), "zero-shot" (historique) ou "classifieur"
+BACKEND_PAR_DEFAUT = os.getenv("RELATION_BACKEND", "regles")
+
+def texte_paire(span1, span2, contexte=""):
+    """Texte d'entrée d'une paire pour les backends à base de modèle."""
+    return f"{span1} [SEP] {span2}" + (f" [SEP] {contexte}" if contexte else "")
+
+class BackendZeroShot:
+    """Chemin historique : classification zero-shot (une passe NLI par label et par paire).
+
+    Le modèle doit avoir une tête NLI (DistilBERT MNLI par défaut, surchargeable via
+    RELATION_ZERO_SHOT_MODEL). Le contexte n'est pas utilisé."""
+
+    utilise_contexte = False
+
+    def __init__(self, modele=os.getenv("RELATION_ZERO_SHOT_MODEL", "typeform/distilbert-base-uncased-mnli"), batch_size=16):
+        self.modele = modele
+        self.batch_size = batch_size
+        self._pipeline = None
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            from transformers import pipeline
+            self._pipeline = pipeline("zero-shot-classification", model=self.modele, tokenizer=self.modele)
+        return self._pipeline
+
+    def predire(self, paires):
+        # Le contexte n'était pas utilisé par le chemin historique : on le conserve ainsi
+        textes = [texte_paire(span1, span2) for span1, span2, _ in paires]
+        resultats = self._get_pipeline()(textes, candidate_labels=LABELS_RELATIONS, batch_size=self.batch_size)
+        if isinstance(resultats, dict):
+            resultats = [resultats]
+        return [(r["labels"][0], r["scores"][0]) for r in resultats]
+
+class BackendRegles:
+    """Règles lexicales sur le texte situé entre les deux mentions (aucun modèle)."""
+
+    utilise_contexte = True
+
+    REGLES = [
+        ("works for", re.compile(r"\b(works? (for|at)|employed by|employee of|ceo of|head of|director of|"
+                                 r"chairman of|president of|minister of|spokes(wo)?man (for|of)|coach of)\b", re.I)),
+        ("owned by", re.compile(r"\b(owned by|owner of|subsidiary of|acquired by|property of)\b", re.I)),
+        ("part of", re.compile(r"\b(part of|member of|member states?|branch of|division of|unit of|within)\b", re.I)),
+        ("located at", re.compile(r"\b(located (in|at)|based in|headquartered in|held (in|at))\b", re.I)),
+    ]
+
+    def predire(self, paires):
+        resultats = []
+        for _, _, contexte in paires:
+            for label, motif in self.REGLES:
+                if motif.search(contexte or ""):
+                    resultats.append((label, 1.0))
+                    break
+            else:
+                resultats.append((RELATION_PAR_DEFAUT, 0.0))
+        return resultats
+
+class BackendClassifieur:
+    """Petit classifieur de séquences fine-tuné, chargé depuis le disque.
+
+    Les labels sont ceux de la configuration du modèle (id2label)."""
+
+    utilise_contexte = True
+
+    def __init__(self, chemin=os.getenv("RELATION_MODEL_PATH", ""), batch_size=64):
+        if not chemin:
+            raise ValueError("RELATION_MODEL_PATH doit indiquer le dossier du classifieur de relations.")
+        self.chemin = chemin
+        self.batch_size = batch_size
+        self._pipeline = None
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            from transformers import pipeline
+            self._pipeline = pipeline("text-classification", model=self.chemin, tokenizer=self.chemin, device=-1)
+        return self._pipeline
+
+    def predire(self, paires):
+        textes = [texte_paire(span1, span2, contexte) for span1, span2, contexte in paires]
+        sorties = self._get_pipeline()(textes, batch_size=self.batch_size, truncation=True)
+        sorties = [s[0] if isinstance(s, list) else s for s in sorties]
+        return [(s["label"], s["score"]) for s in sorties]
+
+BACKENDS = {
+    "zero-shot": BackendZeroShot,
+    "regles": BackendRegles,
+    "classifieur": BackendClassifieur,
+}
+
+class MoteurRelations:
+    """Typage des relations : toutes les paires d'un article en un seul appel au backend,
+    avec cache par (span1, span2), plus l'empreinte du contexte si le backend l'utilise."""
+
+    def __init__(self, backend=None, taille_cache=100000, seuil=SEUIL_CONFIANCE):
+        self.backend = backend or BACKENDS[BACKEND_PAR_DEFAUT]()
+        self.taille_cache = taille_cache
+        self.seuil = seuil
+        self._cache = OrderedDict()
+
+    def _cle(self, span1, span2, contexte):
+        if not getattr(self.backend, "utilise_contexte", True):
+            return (span1, span2)
+        return (span1, span2, hashlib.sha1((contexte or "").encode("utf-8")).hexdigest())
+
+    def typer(self, paires):
+        """Retourne la relation de chaque paire (span1, span2, contexte)."""
+        cles = [self._cle(*paire) for paire in paires]
+
+        # Seules les paires absentes du cache (et distinctes) sont envoyées au backend
+        a_predire = {}
+        for cle, paire in zip(cles, paires):
+            if cle not in self._cache and cle not in a_predire:
+                a_predire[cle] = paire
+        if a_predire:
+            predictions = list(self.backend.predire(list(a_predire.values())))
+            if len(predictions) < len(a_predire):
+                print(f"⚠️ {len(a_predire) - len(predictions)} paires sans prédiction : relation par défaut")
+                predictions += [(RELATION_PAR_DEFAUT, 0.0)] * (len(a_predire) - len(predictions))
+            for cle, (label, score) in zip(a_predire, predictions):
+                self._cache[cle] = label if score > self.seuil else RELATION_PAR_DEFAUT
+
+        relations = []
+        for cle in cles:
+            self._cache.move_to_end(cle)
+            relations.append(self._cache[cle])
+        while len(self._cache) > self.taille_cache:
+            self._cache.popitem(last=False)
+        return relations
@@ -4,14 +4,12 @@ import time
 from itertools import combinations
 from bson import ObjectId
 import datetime
-import spacy
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
-
-# Chargement du modèle NLP
-nlp = spacy.load("en_core_web_trf")
+from utils.model_registry import spacy_model
+from utils.relation_sink import RelationSink
 
 # Connexion à MongoDB
 collection = get_mongo_atlass_collection("articles_eng")
@@ -71,7 +69,7 @@ def extraire_entites_et_relations(article_id):
         raise ValueError("❌ Article introuvable en MongoDB")
 
     texte = f"{doc_mongo.get('titre','')} {doc_mongo.get('contenu','')}"
-    doc = nlp(texte)
+    doc = spacy_model("en_core_web_trf")(texte)
 
     entites_dict = get_entites_from_supabase(article_id)
     entites = {
@@ -121,9 +119,10 @@ def extraire_entites_et_relations(article_id):
 
 # Fonction pour enregistrer les relations dans Supabase
 def enregistrer_relations_dans_supabase(relations):
-    for rel in relations:
-        try:
-            supabase.table("relations_en").insert([{
+    """Écrit les relations d'un article par upserts groupés (doublons écartés via relation_key)."""
+    with RelationSink(supabase, "relations_en") as sink:
+        for rel in relations:
+            sink.ajouter({
                 "nom_source": rel["source"],
                 "type_source": rel["type_source"],
                 "nom_cible": rel["cible"],
@@ -133,10 +132,8 @@ def enregistrer_relations_dans_supabase(relations):
                 "article_id": rel["article_id"],
                 "source": rel["media_source"],         # ✅ Champ "source" (média)
                 "date": rel["date"],     # ✅ Champ "date"
-            }]).execute()
-            print(f"✅ Relation {rel['source']} --> {rel['cible']} enregistrée.")
-        except Exception as e:
-            print(f"⚠️ Erreur lors de l'enregistrement : {e}")
+            })
+    print(f"✅ {sink.ecrites} relations enregistrées.")
 
 # Fonction pour vérifier si des relations ont déjà été enregistrées
 def relations_deja_enregistrees(article_id):
@@ -11,6 +11,7 @@ from eventsdetection import traitement_titre
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
+from utils.tampon_supabase import TamponUpsert, ENTITES_FR_EN_UNIQUES, inserer_entites_article
 
 collection = get_mongo_atlass_collection("articles_eng")
 
@@ -32,6 +33,12 @@ def article_already_processed(article_id):
 
 
 def enregistrer_entites(entites, article_id, table_name, include_date=False):
+    """Écrit les entités d'un article en une écriture groupée.
+
+    Avec ENTITES_FR_EN_UNIQUES=1 (migration 003 appliquée) : upsert PostgREST, ou COPY si
+    ECRITURE_BACKEND=postgres, les doublons (nom, article_id) étant ignorés par la base.
+    Sinon : lecture des noms déjà présents pour l'article puis insertion des autres."""
+    lignes = []
     for entite in entites:
         if include_date:
             if isinstance(entite, tuple) and len(entite) == 2:
@@ -53,17 +60,15 @@ def enregistrer_entites(entites, article_id, table_name, include_date=False):
                 "nom": nom,
                 "article_id": article_id
             }
+        lignes.append(data)
 
-        try:
-            exists = supabase.table(table_name).select("id").match({
-                "nom": nom,
-                "article_id": article_id
-            }).execute()
+    if not ENTITES_FR_EN_UNIQUES:
+        inserer_entites_article(supabase, table_name, article_id, lignes)
+        return
 
-            if not exists.data:
-                supabase.table(table_name).insert(data).execute()
-        except Exception as e:
-            print(f"Erreur lors de l'insertion de '{nom}' dans {table_name} : {e}")
+    with TamponUpsert(supabase, on_conflict="nom,article_id") as tampon:
+        for data in lignes:
+            tampon.ajouter(table_name, data)
 
 
 def process_single_english_article(article_id_str):
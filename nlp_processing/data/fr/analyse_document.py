@@ -0,0 +1,90 @@
+import os
+import sys
+import hashlib
+from collections import OrderedDict
+from spacy.tokens import DocBin
+from pretraitement import clean_text
+from corpus_docbin import get_corpus
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from utils.model_registry import spacy_model
+
+# Modèle spaCy complet (tok2vec, morphologizer, parser, lemmatizer, ner) partagé
+# par l'extraction d'entités, la détection d'événements et l'extraction de relations
+MODELE_SPACY = "fr_core_news_lg"
+
+# Nombre d'analyses sérialisées (DocBin) gardées en mémoire
+TAILLE_CACHE = 256
+
+_cache_docbin = OrderedDict()
+
+def get_nlp():
+    """Pipeline spaCy complet, chargé une seule fois via le registre de modèles."""
+    return spacy_model(MODELE_SPACY)
+
+def construire_texte(titre, contenu):
+    """Assemble titre et contenu nettoyés pour que le titre forme sa propre phrase.
+
+    :return: (texte, fin_titre) où fin_titre est la position du dernier caractère du titre."""
+    titre = clean_text(titre or "")
+    contenu = clean_text(contenu or "")
+    if not titre:
+        return contenu, 0
+    separateur = " " if titre.endswith(('.', '!', '?')) else ". "
+    return f"{titre}{separateur}{contenu}".strip(), len(titre)
+
+def serialiser_doc(doc):
+    """Sérialise un Doc spaCy (avec user_data) au format DocBin."""
+    doc_bin = DocBin(store_user_data=True)
+    doc_bin.add(doc)
+    return doc_bin.to_bytes()
+
+def deserialiser_doc(donnees, vocab=None):
+    """Reconstruit un Doc à partir d'octets DocBin."""
+    vocab = vocab or get_nlp().vocab
+    return next(DocBin().from_bytes(donnees).get_docs(vocab))
+
+def _cle(texte):
+    return hashlib.sha1(texte.encode("utf-8")).hexdigest()
+
+def analyser_texte(texte):
+    """Analyse un texte une seule fois avec le pipeline complet.
+
+    Un texte déjà analysé est reconstruit depuis son DocBin en cache (copie
+    indépendante), ce qui évite de relancer le parser."""
+    cle = _cle(texte)
+    if cle in _cache_docbin:
+        _cache_docbin.move_to_end(cle)
+        return deserialiser_doc(_cache_docbin[cle])
+
+    doc = get_nlp()(texte)
+    _cache_docbin[cle] = serialiser_doc(doc)
+    if len(_cache_docbin) > TAILLE_CACHE:
+        _cache_docbin.popitem(last=False)
+    return doc
+
+def analyser_article(titre, contenu, article_id=None, source="", date=None):
+    """Analyse un article (titre + contenu) et mémorise la fin du titre dans doc.user_data.
+
+    Avec un article_id, l'analyse est relue depuis le corpus DocBin persistant si
+    elle existe déjà, et y est ajoutée sinon."""
+    texte, fin_titre = construire_texte(titre, contenu)
+    corpus = get_corpus() if article_id else None
+    if corpus is not None:
+        doc = corpus.charger(article_id, get_nlp().vocab, empreinte=_cle(texte))
+        if doc is not None:
+            doc.user_data["fin_titre"] = fin_titre
+            return doc
+
+    doc = analyser_texte(texte)
+    doc.user_data["fin_titre"] = fin_titre
+    if corpus is not None:
+        corpus.ajouter(article_id, doc, source=source, date=date, empreinte=_cle(texte))
+    return doc
+
+def span_titre(doc):
+    """Retourne le Span du titre dans un Doc produit par analyser_article (ou None)."""
+    fin_titre = doc.user_data.get("fin_titre", 0)
+    if not fin_titre:
+        return None
+    return doc.char_span(0, fin_titre, alignment_mode="expand")
@@ -0,0 +1,196 @@
+import os
+import re
+import json
+import mmap
+import atexit
+from contextlib import contextmanager
+from datetime import datetime
+from spacy.tokens import DocBin
+
+# Dossier racine du corpus d'analyses spaCy (surchargeable par variable d'environnement)
+DOSSIER_CORPUS = os.getenv(
+    "CORPUS_DOCBIN_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus_docbin")
+)
+
+def mois_article(date):
+    """Retourne le mois (AAAA-MM) d'une date d'article, ou 'inconnu'."""
+    if isinstance(date, datetime):
+        return date.strftime("%Y-%m")
+    if isinstance(date, str) and re.match(r"^\d{4}-\d{2}", date):
+        return date[:7]
+    return "inconnu"
+
+def _nom_source(source):
+    return re.sub(r"[^\w\-]+", "_", source or "").strip("_") or "inconnu"
+
+try:
+    import fcntl
+
+    def _verrouiller(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _deverrouiller(f):
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _verrouiller(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _deverrouiller(f):
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def verrou_fichier(chemin):
+    """Verrou exclusif inter-processus sur `chemin`."""
+    with open(chemin, "a+b") as f:
+        _verrouiller(f)
+        try:
+            yield
+        finally:
+            _deverrouiller(f)
+
+class CorpusDocBin:
+    """Stockage persistant des Doc spaCy sérialisés, un fragment par source et par mois.
+
+    Chaque fragment (`<source>/<AAAA-MM>.docbin`) est une suite de DocBin d'un seul
+    document ; index.json donne pour chaque article_id le fragment, la position et
+    la taille de son DocBin. Les fragments sont ouverts en mmap et un article n'est
+    désérialisé qu'à la demande.
+
+    Plusieurs processus peuvent écrire dans le même corpus : les ajouts aux fragments
+    et la sauvegarde de l'index se font sous un verrou de fichier (index.lock), et
+    l'index est fusionné avec la version sur disque au lieu d'être écrasé.
+    """
+
+    def __init__(self, racine=DOSSIER_CORPUS):
+        self.racine = racine
+        os.makedirs(racine, exist_ok=True)
+        self._chemin_index = os.path.join(racine, "index.json")
+        self._chemin_verrou = os.path.join(racine, "index.lock")
+        self._index = self._charger_index()
+        self._mmaps = {}
+        self._nouvelles = {}  # entrées ajoutées depuis la dernière sauvegarde
+
+    def __contains__(self, article_id):
+        return article_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def _charger_index(self):
+        if not os.path.exists(self._chemin_index):
+            return {}
+        with open(self._chemin_index, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _chemin_fragment(self, fragment):
+        return os.path.join(self.racine, f"{fragment}.docbin")
+
+    def _mmap(self, fragment):
+        """Ouvre (une seule fois) le fragment en lecture mmap."""
+        if fragment not in self._mmaps:
+            f = open(self._chemin_fragment(fragment), "rb")
+            self._mmaps[fragment] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return self._mmaps[fragment][1]
+
+    def _fermer_mmap(self, fragment):
+        f, mm = self._mmaps.pop(fragment, (None, None))
+        if mm is not None:
+            mm.close()
+            f.close()
+
+    def ajouter(self, article_id, doc, source="", date=None, empreinte=None):
+        """Ajoute l'analyse d'un article à la fin du fragment de sa source et de son mois."""
+        fragment = f"{_nom_source(source)}/{mois_article(date)}"
+        chemin = self._chemin_fragment(fragment)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+        doc_bin = DocBin(store_user_data=True)
+        doc_bin.add(doc)
+        donnees = doc_bin.to_bytes()
+
+        with verrou_fichier(self._chemin_verrou), open(chemin, "ab") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            f.write(donnees)
+
+        # Le mmap existant ne couvre plus la fin du fichier
+        self._fermer_mmap(fragment)
+        entree = {
+            "fragment": fragment,
+            "position": position,
+            "taille": len(donnees),
+            "source": source,
+            "date": date.isoformat() if isinstance(date, datetime) else date,
+            "empreinte": empreinte,
+        }
+        self._index[article_id] = entree
+        self._nouvelles[article_id] = entree
+
+    def charger(self, article_id, vocab, empreinte=None):
+        """Charge le Doc d'un article, ou None s'il est absent (ou si le texte a changé)."""
+        entree = self._index.get(article_id)
+        if entree is None:
+            return None
+        if empreinte and entree.get("empreinte") and entree["empreinte"] != empreinte:
+            return None
+        fin = entree["position"] + entree["taille"]
+        mm = self._mmap(entree["fragment"])
+        if fin > len(mm):
+            # Fragment agrandi par un autre processus depuis son ouverture : nouvelle projection
+            self._fermer_mmap(entree["fragment"])
+            mm = self._mmap(entree["fragment"])
+        donnees = mm[entree["position"]:fin]
+        return next(DocBin().from_bytes(donnees).get_docs(vocab))
+
+    def iterer(self, vocab, source=None, mois=None):
+        """Parcourt les articles stockés (filtrables par source et mois).
+
+        :return: générateur de (article_id, métadonnées, Doc)."""
+        for article_id, entree in list(self._index.items()):
+            source_fragment, mois_fragment = entree["fragment"].split("/", 1)
+            if source and source_fragment != _nom_source(source):
+                continue
+            if mois and mois_fragment != mois:
+                continue
+            yield article_id, entree, self.charger(article_id, vocab)
+
+    def sauvegarder(self):
+        """Fusionne les nouvelles entrées dans l'index sur disque (sous verrou, écriture atomique)."""
+        if not self._nouvelles:
+            return
+        with verrou_fichier(self._chemin_verrou):
+            index = self._charger_index()
+            index.update(self._nouvelles)
+            temporaire = f"{self._chemin_index}.{os.getpid()}.tmp"
+            with open(temporaire, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(temporaire, self._chemin_index)
+        self._index = index
+        self._nouvelles = {}
+
+    def fermer(self):
+        """Sauvegarde l'index et ferme les fragments ouverts."""
+        self.sauvegarder()
+        for fragment in list(self._mmaps):
+            self._fermer_mmap(fragment)
+
+_corpus = None
+
+def get_corpus():
+    """Retourne le corpus partagé du processus (index sauvegardé à la sortie)."""
+    global _corpus
+    if _corpus is None:
+        _corpus = CorpusDocBin()
+        atexit.register(_corpus.fermer)
+    return _corpus
@@ -1,7 +1,5 @@
-import spacy
-
-# Charger le modèle français
-nlp = spacy.load("fr_core_news_lg")
+from spacy.tokens import Span
+from analyse_document import get_nlp
 
 def remove_duplicate_words(text):
     """Supprime les doublons successifs dans une phrase (insensible à la casse)"""
@@ -14,21 +12,37 @@ def remove_duplicate_words(text):
             seen.add(word.lower())
     return " ".join(result)
 
-def traitement_titre(titre):
-    """Extrait la proposition principale (événement) d'un titre en français"""
-    
-    # Retirer le préfixe thématique avant les ":"
-    if ":" in titre:
-        titre = titre.split(":", 1)[-1].strip()
+def retirer_prefixe(doc):
+    """Retire le préfixe thématique avant les ":" d'un titre déjà analysé"""
+    for idx, token in enumerate(doc):
+        if token.text == ":" and idx + 1 < len(doc):
+            return doc[idx + 1:]
+    return doc
+
+def traitement_titre(titre, doc=None):
+    """Extrait la proposition principale (événement) d'un titre en français
+
+    Si `doc` (Doc ou Span du titre déjà analysé) est fourni, il est réutilisé
+    au lieu d'analyser le titre une nouvelle fois.
+    """
     
-    doc = nlp(titre)
+    if doc is None:
+        # Retirer le préfixe thématique avant les ":"
+        if ":" in titre:
+            titre = titre.split(":", 1)[-1].strip()
+        doc = get_nlp()(titre)
+    else:
+        doc = retirer_prefixe(doc)
+
+    # Bornes du titre (un Span peut appartenir à un Doc plus large)
+    debut, fin = (doc.start, doc.end) if isinstance(doc, Span) else (0, len(doc))
 
     # Stratégie 1 : Extraire la clause autour du verbe principal
     for sent in doc.sents:
-        verbs = [t for t in sent if t.pos_ == "VERB" and t.dep_ in {"ROOT", "acl", "relcl"}]
+        verbs = [t for t in sent if t.pos_ == "VERB" and t.dep_ in {"ROOT", "acl", "relcl"} and debut <= t.i < fin]
         if verbs:
             main_verb = verbs[0]
-            subtree = list(main_verb.subtree)
+            subtree = [t for t in main_verb.subtree if debut <= t.i < fin]
             sorted_clause = sorted(subtree, key=lambda x: x.i)
             phrase = " ".join([t.text for t in sorted_clause])
             return remove_duplicate_words(phrase)
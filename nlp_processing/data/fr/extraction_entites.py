@@ -1,15 +1,19 @@
+import os
 import re
+import sys
 from functools import lru_cache
 from typing import List, Tuple, Dict, Set, Any
-import spacy
-import stanza
-from transformers import pipeline
 from nltk.corpus import stopwords
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from fuzzywuzzy import fuzz
 from pretraitement import clean_text,filter_entities
 from eventsdetection import traitement_titre
+from analyse_document import get_nlp, analyser_texte
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
+from utils.model_registry import stanza_pipeline, transformers_pipeline
+
 # Normalisation des labels NER
 LABEL_MAPPING = {
     "PER": "PERSON",
@@ -25,42 +29,33 @@ LABEL_MAPPING = {
 def normalize_label(label: str) -> str:
     return LABEL_MAPPING.get(label.strip().upper(), "OTHER")
 
-# Chargement des modèles
-MODELS = {
-    "spacy": None,
-    "stanza": None,
-    "bert": None
-}
+# Modèles chargés au premier usage via le registre partagé (aucun chargement à l'import)
+def get_stanza():
+    return stanza_pipeline("fr", "tokenize,ner")
 
-def load_models():
-    if not MODELS["spacy"]:
-        MODELS["spacy"] = spacy.load("fr_core_news_lg", disable=["parser", "lemmatizer"])
-        MODELS["spacy"].add_pipe("merge_entities")
-    if not MODELS["stanza"]:
-        MODELS["stanza"] = stanza.Pipeline("fr", processors="tokenize,ner", use_gpu=False, verbose=False)
-    if not MODELS["bert"]:
-        MODELS["bert"] = pipeline(
-            "ner",
-            model="Jean-Baptiste/camembert-ner",
-            tokenizer="Jean-Baptiste/camembert-ner",
-            aggregation_strategy="max",
-            device=-1
-        )
+def get_bert():
+    # PyTorch FP32 ou ONNX int8 selon NLP_BACKEND
+    return transformers_pipeline("ner", "Jean-Baptiste/camembert-ner", aggregation_strategy="max")
 
-load_models()
+def load_models():
+    """Précharge les trois modèles (optionnel : ils se chargent sinon au premier usage)."""
+    # Pipeline spaCy complet partagé avec la détection d'événements et les relations
+    return {"spacy": get_nlp(), "stanza": get_stanza(), "bert": get_bert()}
 
 # Extraction d'entités avec chaque modèle
 @lru_cache(maxsize=512)
 def extract_entities_spacy(text: str) -> List[Tuple[str, str]]:
-    doc = MODELS["spacy"](text)
+    return extract_entities_spacy_doc(analyser_texte(text))
+
+def extract_entities_spacy_doc(doc) -> List[Tuple[str, str]]:
     return [(ent.text.strip(), normalize_label(ent.label_)) for ent in doc.ents]
 
 def extract_entities_stanza(text: str) -> List[Tuple[str, str]]:
-    doc = MODELS["stanza"](text)
+    doc = get_stanza()(text)
     return [(ent.text.strip(), normalize_label(ent.type)) for ent in doc.ents]
 
 def extract_entities_bert(text: str) -> List[Tuple[str, str]]:
-    entities = MODELS["bert"](text[:1024])
+    entities = get_bert()(text[:1024])
     return [
         (entity["word"].replace("▁", " ").strip(), normalize_label(entity["entity_group"]))
         for entity in entities
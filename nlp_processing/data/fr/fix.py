@@ -2,9 +2,7 @@ import sys
 import os
 import re
 from bson import ObjectId
-import spacy
 from itertools import combinations
-from spacy.tokens import Span
 from collections import defaultdict
 from datetime import datetime
 
@@ -12,9 +10,13 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
+from analyse_document import get_nlp, analyser_texte, analyser_article
+from corpus_docbin import get_corpus
+from utils.gazetteer import get_gazetteer, normaliser_nom
+from utils.relation_sink import RelationSink
 
-# Chargement du modèle spaCy
-nlp = spacy.load("fr_core_news_lg")
+# Modèle spaCy partagé avec les autres étapes
+nlp = get_nlp()
 
 # Connexion MongoDB
 collection = get_mongo_atlass_collection("articles_fr")
@@ -46,9 +48,6 @@ def get_entites_from_supabase(article_id):
 
 def annotate_entities(doc, entites):
     """Annotation des entités avec gestion des chevauchements"""
-    from spacy.matcher import PhraseMatcher
-    from spacy.util import filter_spans
-
     # Mapping des catégories
     category_mapping = {
         'personnes': 'PER',
@@ -57,30 +56,21 @@ def annotate_entities(doc, entites):
         'evenements': 'EVENT'
     }
 
-    # Création du matcher avec matching insensible à la casse
-    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-    spans = []
+    # Entités de l'article, comparées sans tenir compte de la casse
+    filtre = {
+        (normaliser_nom(name), category_mapping[cat])
+        for cat, names in entites.items() if cat in category_mapping
+        for name in names if name.strip()
+    }
 
-    # Ajout des motifs pour chaque catégorie
+    # Les entités de l'article sont ajoutées au gazetteer global si elles n'y sont pas encore
+    gazetteer = get_gazetteer("fr", nlp, supabase)
     for cat, names in entites.items():
-        label = category_mapping.get(cat)
-        if not label or not names:
-            continue
-        
-        # Création des patterns pour la catégorie
-        patterns = [nlp.make_doc(name.strip()) for name in names if name.strip()]
-        if patterns:
-            matcher.add(label, patterns)
-
-    # Recherche des correspondances
-    matches = matcher(doc)
-    for match_id, start, end in matches:
-        label = nlp.vocab.strings[match_id]
-        span = Span(doc, start, end, label=label)
-        spans.append(span)
-
-    # Filtrage des chevauchements et doublons
-    filtered_spans = filter_spans(spans)  # Garde les spans les plus longs
+        if cat in category_mapping:
+            gazetteer.ajouter(category_mapping[cat], names)
+
+    # Passe unique du gazetteer (filter_spans garde les spans les plus longs)
+    filtered_spans = gazetteer.annoter(doc, filtre)
     unique_spans = []
     seen = set()
     
@@ -125,9 +115,10 @@ def obtenir_relation(ent1, ent2, sent):
     # Défaut pour les relations non détectées
     return "en relation avec"
 
-def extraire_relations(texte, entites, source_media, date):
+def extraire_relations(texte, entites, source_media, date, doc=None):
     """Extraction des relations entre événements et autres entités"""
-    doc = nlp(texte)
+    # annotate_entities remplace doc.ents : on travaille sur une copie du Doc partagé
+    doc = doc.copy() if doc is not None else analyser_texte(texte)
     doc = annotate_entities(doc, entites)
     relations = []
     
@@ -169,28 +160,9 @@ def extraire_relations(texte, entites, source_media, date):
     return relations
 
 def enregistrer_relations_supabase(article_id, relations):
-    """Enregistre les relations dans Supabase avec vérification des doublons"""
-    BATCH_SIZE = 500
-    for i in range(0, len(relations), BATCH_SIZE):
-        batch = relations[i:i+BATCH_SIZE]
-        
-        # Vérification des doublons
-        existing = supabase.table("relations_fr").select("*").eq("article_id", article_id).execute()
-        existing_relations = {(r['nom_source'], r['nom_cible'], r['relation']) for r in existing.data}
-        
-        # Filtrage des nouvelles relations
-        new_relations = [
-            {**rel, 'article_id': article_id} 
-            for rel in batch 
-            if (rel['nom_source'], rel['nom_cible'], rel['relation']) not in existing_relations
-        ]
-        
-        if new_relations:
-            try:
-                supabase.table("relations_fr").insert(new_relations).execute()
-                print(f"✅ {len(new_relations)} relations insérées")
-            except Exception as e:
-                print(f"❌ Erreur d'insertion : {str(e)}")
+    """Enregistre les relations dans Supabase ; les doublons sont écartés par l'index unique relation_key"""
+    with RelationSink(supabase, "relations_fr") as sink:
+        sink.ajouter_tout({**rel, 'article_id': article_id} for rel in relations)
 
 def traiter_tous_les_articles():
     """Parcours de tous les articles et extraction/enregistrement des relations"""
@@ -219,11 +191,11 @@ def traiter_tous_les_articles():
         if not contenu:
             continue  # Ignorer les articles vides
 
-        texte = f"{titre}. {contenu}" if not titre.endswith(('.', '!', '?')) else f"{titre} {contenu}"
+        doc = analyser_article(titre, contenu, article_id=article_id, source=source_media, date=date)
         entites = get_entites_from_supabase(article_id)
 
         print(f"\n🔍 Traitement de l'article [{titre[:50]}...] (ID: {article_id})")
-        relations = extraire_relations(texte, entites, source_media, date)
+        relations = extraire_relations(doc.text, entites, source_media, date, doc=doc)
 
         if relations:
             enregistrer_relations_supabase(article_id, relations)
@@ -234,6 +206,7 @@ def traiter_tous_les_articles():
 
         total_articles += 1
 
+    get_corpus().sauvegarder()
     print(f"\n✅ Traitement terminé : {total_articles} articles parcourus, {total_relations} relations enregistrées.")
 
 
@@ -1,9 +1,7 @@
 import os
 import sys
-import time
 import datetime
 from bson import ObjectId
-import spacy
 from itertools import combinations
 from collections import defaultdict
 
@@ -11,13 +9,22 @@ from collections import defaultdict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")))
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
-
-# Chargement du modèle français
-nlp = spacy.load("fr_core_news_lg")
+from analyse_document import analyser_article, get_nlp
+from corpus_docbin import get_corpus
+from utils.gazetteer import get_gazetteer, normaliser_nom
+from utils.relation_sink import RelationSink
 
 # Connexion à MongoDB
 collection = get_mongo_atlass_collection("articles_fr")
 
+# Labels des catégories d'entités Supabase
+LABELS_CATEGORIES = {
+    "personnes": "PER",
+    "lieux": "LOC",
+    "organisations": "ORG",
+    "evenements": "EVENT"
+}
+
 def get_entites_from_supabase(article_id):
     """Récupère les entités depuis Supabase"""
     entites = defaultdict(list)
@@ -37,20 +44,32 @@ def get_entites_from_supabase(article_id):
 
     return entites
 
-def extraire_relations(titre, contenu, entites, source_media, date):
-    """Extrait les relations entre les entités et ajoute source et date"""
-    doc = nlp(f"{titre} {contenu}")
+def extraire_relations(titre, contenu, entites, source_media, date, doc=None):
+    """Extrait les relations entre les entités et ajoute source et date
+
+    `doc` permet de réutiliser l'analyse spaCy déjà faite lors de l'extraction des entités.
+    """
+    if doc is None:
+        doc = analyser_article(titre, contenu)
     relations = []
     seen_relations = set()  # Set pour vérifier les doublons
 
-    # On normalise les entités récupérées depuis Supabase pour comparer avec les entités extraites du texte
-    entites_normalisees = {ent.lower() for categorie in entites.values() for ent in categorie}
+    # Mentions des entités de l'article, trouvées en une passe par le gazetteer global
+    gazetteer = get_gazetteer("fr", get_nlp(), supabase)
+    filtre = set()
+    for categorie, noms in entites.items():
+        label = LABELS_CATEGORIES.get(categorie)
+        if label:
+            gazetteer.ajouter(label, noms)
+            filtre.update((normaliser_nom(nom), label) for nom in noms)
 
-    # On ne garde que les entités présentes dans Supabase et excluons 'MISC' et autres catégories non pertinentes
-    entites_doc = {ent.text.lower(): ent for ent in doc.ents if ent.text.lower() in entites_normalisees and ent.label_ in ["ORG", "PER", "LOC", "EVENT"]}
+    # Regroupement des mentions par phrase (une seule mention par nom et par phrase)
+    mentions_par_phrase = defaultdict(dict)
+    for span in gazetteer.annoter(doc, filtre):
+        mentions_par_phrase[span.sent.start].setdefault(span.text.lower(), span)
 
     for sent in doc.sents:
-        entites_phrase = [entites_doc[ent.text.lower()] for ent in sent.ents if ent.text.lower() in entites_doc]
+        entites_phrase = list(mentions_par_phrase[sent.start].values())
         
         for ent1, ent2 in combinations(entites_phrase, 2):
             relation = obtenir_relation_par_verbe(ent1, ent2, sent)
@@ -88,34 +107,15 @@ def obtenir_relation_par_verbe(ent1, ent2, sent):
                 return phrase.lower()
     return None
 
-def enregistrer_relations_supabase(article_id, relations, batch_size=300, delay=0.5):
-    """Enregistre les relations dans la table Supabase relations_fr par batchs sans doublons"""
-    total = len(relations)
-    print(f"Enregistrement de {total} relations pour l'article {article_id}...")
-
-    for i in range(0, total, batch_size):
-        batch = relations[i:i + batch_size]
-
-        # Vérification des doublons avant d'ajouter chaque relation
-        for rel in batch:
-            rel["article_id"] = article_id
-
-            # Vérification si la relation existe déjà
-            existing_relation = supabase.table("relations_fr").select("id").eq("nom_source", rel["nom_source"]).eq("nom_cible", rel["nom_cible"]).eq("relation", rel["relation"]).eq("article_id", article_id).execute()
-            if existing_relation.data:
-                print(f"⚠️ Relation déjà existante pour {rel['nom_source']} → {rel['relation']} → {rel['nom_cible']}, sautée.")
-                continue  # Ignorer cette relation si elle existe déjà
-
-        try:
-            response = supabase.table("relations_fr").insert(batch).execute()
-            if response.error:
-                print(f"⚠️ Erreur lors de l'insertion du batch {i // batch_size + 1}: {response.error.message}")
-            else:
-                print(f"✅ Batch {i // batch_size + 1} inséré. Pause de {delay} seconde(s)...")
-        except Exception as e:
-            print(f"Erreur inattendue lors de l'insertion du batch {i // batch_size + 1}: {e}")
-
-        time.sleep(delay)
+def enregistrer_relations_supabase(article_id, relations, batch_size=300):
+    """Enregistre les relations dans la table Supabase relations_fr par batchs sans doublons.
+
+    Les doublons sont écartés en mémoire puis par l'index unique sur relation_key
+    (un upsert par batch, aucune requête de vérification par relation)."""
+    print(f"Enregistrement de {len(relations)} relations pour l'article {article_id}...")
+    with RelationSink(supabase, "relations_fr", taille_lot=batch_size) as sink:
+        sink.ajouter_tout({**rel, "article_id": article_id} for rel in relations)
+
 def traiter_tous_les_articles(start_id=None):
     """Point d'entrée principal pour traiter tous les articles"""
     # Vérifie si start_id est fourni, sinon récupère tous les articles
@@ -150,7 +150,8 @@ def traiter_tous_les_articles(start_id=None):
             print(f"⚠️ Aucune entité trouvée pour l'article {article_id}, skipping...")
             continue
         
-        relations = extraire_relations(titre, contenu, entites, source_media, date)
+        doc = analyser_article(titre, contenu, article_id=article_id, source=source_media, date=date)
+        relations = extraire_relations(titre, contenu, entites, source_media, date, doc=doc)
         if not relations:
             print(f"⚠️ Aucune relation trouvée pour l'article {article_id}, skipping...")
             continue
@@ -167,8 +168,26 @@ def traiter_tous_les_articles(start_id=None):
         
         count += 1
 
+    get_corpus().sauvegarder()
     print(f"\n✅ Traitement terminé : {count} article(s) traité(s).")
 
+def reextraire_relations_corpus(source=None, mois=None, enregistrer=False):
+    """Relance l'extraction des relations sur les analyses du corpus DocBin, sans re-parser.
+
+    Permet d'itérer sur les règles (obtenir_relation_par_verbe...) sur tout le corpus.
+    :return: dictionnaire article_id -> relations extraites."""
+    resultats = {}
+    for article_id, meta, doc in get_corpus().iterer(get_nlp().vocab, source=source, mois=mois):
+        entites = get_entites_from_supabase(article_id)
+        if not any(entites.values()):
+            continue
+        relations = extraire_relations("", "", entites, meta.get("source", ""), meta.get("date"), doc=doc)
+        resultats[article_id] = relations
+        if enregistrer and relations:
+            enregistrer_relations_supabase(article_id, relations)
+    print(f"✅ {len(resultats)} article(s) ré-analysé(s) depuis le corpus.")
+    return resultats
+
 if __name__ == "__main__":
     # Utiliser un start_id spécifique, ou None pour traiter tous les articles
     traiter_tous_les_articles()  # Remplacer par votre start_id ou None
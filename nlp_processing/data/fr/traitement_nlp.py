@@ -2,9 +2,11 @@ import os
 import sys
 from datetime import datetime
 import locale  # Pour gérer les formats de date en français
-from pretraitement import clean_text, filter_entities
-from extraction_entites import extract_entities_spacy, extract_entities_stanza, extract_entities_bert, merge_entities
+from pretraitement import filter_entities
+from extraction_entites import extract_entities_spacy_doc, extract_entities_stanza, extract_entities_bert, merge_entities
 from eventsdetection import traitement_titre
+from analyse_document import analyser_article, span_titre
+from relations import extraire_relations, enregistrer_relations_supabase
 import time
 
 # Ajouter le chemin d'importation du projet
@@ -12,6 +14,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.
 
 from config.mongo_atlass import get_mongo_atlass_collection
 from config.supabasedb import supabase
+from utils.tampon_supabase import TamponUpsert, ENTITES_FR_EN_UNIQUES, inserer_entites_article
 from bson import ObjectId
 
 # Définir la locale française pour parser les dates
@@ -21,6 +24,12 @@ locale.setlocale(locale.LC_TIME, "fr_FR")
 collection = get_mongo_atlass_collection("articles_fr")
 
 def enregistrer_entites(entites, article_id, table_name, include_date=False):
+    """Écrit les entités d'un article en une écriture groupée.
+
+    Avec ENTITES_FR_EN_UNIQUES=1 (migration 003 appliquée) : upsert PostgREST, ou COPY si
+    ECRITURE_BACKEND=postgres, les doublons (nom, article_id) étant ignorés par la base.
+    Sinon : lecture des noms déjà présents pour l'article puis insertion des autres."""
+    lignes = []
     for entite in entites:
         if include_date:
             if isinstance(entite, tuple) and len(entite) == 2:
@@ -42,19 +51,20 @@ def enregistrer_entites(entites, article_id, table_name, include_date=False):
                 "nom": nom,
                 "article_id": article_id
             }
+        lignes.append(data)
 
-        try:
-            exists = supabase.table(table_name).select("id").match({
-                "nom": nom,
-                "article_id": article_id
-            }).execute()
+    if not ENTITES_FR_EN_UNIQUES:
+        inserer_entites_article(supabase, table_name, article_id, lignes)
+        return
 
-            if not exists.data:
-                supabase.table(table_name).insert(data).execute()
-        except Exception as e:
-            print(f"Erreur lors de l'insertion de '{nom}' dans {table_name} : {e}")
+    with TamponUpsert(supabase, on_conflict="nom,article_id") as tampon:
+        for data in lignes:
+            tampon.ajouter(table_name, data)
 
-def process_single_french_article(article_id_str):
+def process_single_french_article(article_id_str, avec_relations=False):
+    """Traite un article : une seule analyse spaCy partagée par la NER, la détection
+    d'événements du titre et, sur demande (avec_relations=True), l'extraction des
+    relations, qui reste sinon le rôle de relations.py."""
     article_id = ObjectId(article_id_str)
     doc = collection.find_one({"_id": article_id})
     
@@ -64,10 +74,13 @@ def process_single_french_article(article_id_str):
     title = doc.get("titre", "")
     content = doc.get("contenu", "")
     
-    cleaned_text = clean_text(f"{title} {content}")
+    # Analyse spaCy unique (parser compris) de l'article
+    doc_spacy = analyser_article(title, content, article_id=article_id_str,
+                                 source=doc.get("source", ""), date=doc.get("date"))
+    cleaned_text = doc_spacy.text
     
     ents = [
-        extract_entities_spacy(cleaned_text),
+        extract_entities_spacy_doc(doc_spacy),
         extract_entities_stanza(cleaned_text),
         extract_entities_bert(cleaned_text),
     ]
@@ -93,7 +106,7 @@ def process_single_french_article(article_id_str):
             categories["events"].append(entity)
 
     try:
-        titre_events = traitement_titre(title)
+        titre_events = traitement_titre(title, doc=span_titre(doc_spacy))
         if isinstance(titre_events, list):
             categories["events"] = titre_events
         elif isinstance(titre_events, str):
@@ -119,6 +132,20 @@ def process_single_french_article(article_id_str):
     events_with_date = [(e, raw_date) for e in result["events"] if isinstance(e, str) and e.strip()]
     enregistrer_entites(events_with_date, article_id_str, "entite_fr_event", include_date=True)
 
+    if avec_relations:
+        # Extraction des relations sur le même Doc, sans nouvelle analyse
+        entites = {
+            "personnes": result["persons"],
+            "lieux": result["locations"],
+            "organisations": result["organizations"],
+            "evenements": result["events"],
+        }
+        if isinstance(raw_date, datetime):
+            raw_date = raw_date.isoformat()
+        relations = extraire_relations(title, content, entites, doc.get("source", ""), raw_date, doc=doc_spacy)
+        if relations:
+            enregistrer_relations_supabase(article_id_str, relations)
+
     return result
 
 def article_already_processed(article_id):
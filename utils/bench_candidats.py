@@ -0,0 +1,99 @@
+"""Benchmark de la génération de paires candidates pour l'extraction de relations.
+
+Compare, sur des articles synthétiques riches en entités :
+- l'ancienne approche EN (combinations sur toutes les entités + filtre texte.find),
+- l'ancien process_ner_output AR (toutes les paires de mentions NER, balisées),
+- le générateur par phrase et fenêtre de tokens (utils/candidats.py), côté EN
+  (noms d'entités) et côté AR (positions NER, paires_marquees).
+
+Les mentions NER AR sont simulées par toutes les occurrences des entités.
+
+Usage : python utils/bench_candidats.py [nb_entites ...]
+"""
+import os
+import sys
+import time
+import random
+from itertools import combinations
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.candidats import decouper_phrases, indexer_mentions, generer_paires, inserer_marqueurs, paires_marquees
+
+MOTS = ["le", "ministre", "a", "annoncé", "lors", "de", "la", "réunion", "avec", "les",
+        "représentants", "du", "secteur", "dans", "ville", "pour", "projet", "national"]
+CATEGORIES = ["personnes", "lieux", "organisations", "gpe"]
+
+def article_synthetique(nb_entites, nb_phrases=40, graine=0):
+    """Construit un article et ses entités (nom, catégorie), chaque entité citée plusieurs fois."""
+    rng = random.Random(graine)
+    entites = [(f"Entite{i} Nom{i}", CATEGORIES[i % len(CATEGORIES)]) for i in range(nb_entites)]
+    phrases = []
+    for _ in range(nb_phrases):
+        mots = [rng.choice(MOTS) for _ in range(25)]
+        for _ in range(3):
+            mots.insert(rng.randrange(len(mots)), rng.choice(entites)[0])
+        phrases.append(" ".join(mots) + ".")
+    return " ".join(phrases), entites
+
+def ancienne_approche_en(texte, entites):
+    paires = 0
+    retenues = 0
+    for (nom1, _), (nom2, _) in combinations(entites, 2):
+        paires += 1
+        if nom1 == nom2:
+            continue
+        if abs(texte.find(nom1) - texte.find(nom2)) > 15:
+            continue
+        retenues += 1
+    return paires, retenues
+
+def sortie_ner(texte, entites):
+    """Mentions façon pipeline NER groupé (start, end, word, entity_group)."""
+    return [{"start": m["debut"], "end": m["fin"], "word": m["nom"], "entity_group": m["categorie"]}
+            for m in indexer_mentions(texte, entites)]
+
+def ancienne_approche_ar(texte, ner):
+    paires = 0
+    for i in range(len(ner) - 1):
+        for j in range(i + 1, len(ner)):
+            e1, e2 = ner[i], ner[j]
+            inserer_marqueurs(texte, [(e1["start"], f"<{e1['entity_group']}>"), (e1["end"], f"</{e1['entity_group']}>"),
+                                      (e2["start"], f"<{e2['entity_group']}>"), (e2["end"], f"</{e2['entity_group']}>")])
+            paires += 1
+    return paires, paires
+
+def nouvelle_approche_en(texte, entites):
+    mentions = indexer_mentions(texte, entites, decouper_phrases(texte))
+    paires = sum(1 for _ in generer_paires(mentions))
+    return paires, paires
+
+def nouvelle_approche_ar(texte, ner):
+    positions = [(e["start"], e["end"], e["word"], e["entity_group"], e) for e in ner]
+    paires = len(paires_marquees(texte, positions))
+    return paires, paires
+
+def mesurer(fonction, *args, repetitions=5, **kwargs):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        resultat = fonction(*args, **kwargs)
+    return resultat, (time.perf_counter() - debut) / repetitions * 1000
+
+def main(tailles):
+    print(f"{'entités':>8} | {'approche':<24} | {'paires examinées':>16} | {'paires gardées':>14} | {'ms/article':>10}")
+    print("-" * 86)
+    for nb in tailles:
+        texte, entites = article_synthetique(nb)
+        ner = sortie_ner(texte, entites)
+        for nom, fonction, donnees in [
+            ("EN combinations", ancienne_approche_en, entites),
+            ("fenêtre (EN)", nouvelle_approche_en, entites),
+            ("AR toutes paires NER", ancienne_approche_ar, ner),
+            ("AR fenêtre NER", nouvelle_approche_ar, ner),
+        ]:
+            (examinees, gardees), ms = mesurer(fonction, texte, donnees)
+            print(f"{nb:>8} | {nom:<24} | {examinees:>16} | {gardees:>14} | {ms:>10.2f}")
+        print("-" * 86)
+
+if __name__ == "__main__":
+    tailles = [int(t) for t in sys.argv[1:]] or [20, 50, 100, 200]
+    main(tailles)
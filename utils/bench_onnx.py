@@ -0,0 +1,99 @@
+"""Rapport d'écart de précision et benchmark de latence PyTorch FP32 vs ONNX int8.
+
+Pour chaque modèle NER du projet, compare sur CPU :
+- les entités produites (F1 du backend ONNX en prenant PyTorch pour référence),
+- la latence par texte (moyenne, p95) et l'accélération obtenue.
+
+Usage : python utils/bench_onnx.py [fichier_textes]
+Le fichier optionnel contient un texte par ligne, préfixé par sa langue
+("fr\t...", "ar\t...", "en\t...") ; sinon des phrases d'exemple sont utilisées.
+"""
+import os
+import sys
+import time
+import statistics
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from utils.inference_onnx import pipeline
+
+MODELES = [
+    ("fr", "Jean-Baptiste/camembert-ner"),
+    ("ar", "hatmimoha/arabic-ner"),
+    ("ar", "ychenNLP/arabic-ner-ace"),
+    ("en", "Jean-Baptiste/roberta-large-ner-english"),
+]
+
+TEXTES_EXEMPLE = {
+    "fr": [
+        "Le roi Mohammed VI a reçu à Rabat le président français Emmanuel Macron.",
+        "L'Office chérifien des phosphates a annoncé un investissement à Jorf Lasfar.",
+        "Aziz Akhannouch a présidé à Casablanca une réunion avec la CGEM.",
+    ],
+    "ar": [
+        "استقبل الملك محمد السادس بالرباط الرئيس الفرنسي إيمانويل ماكرون.",
+        "أعلن المكتب الشريف للفوسفاط عن استثمار جديد في الجرف الأصفر.",
+        "ترأس عزيز أخنوش بالدار البيضاء اجتماعا مع الاتحاد العام لمقاولات المغرب.",
+    ],
+    "en": [
+        "King Mohammed VI received French President Emmanuel Macron in Rabat.",
+        "OCP Group announced a new investment in Jorf Lasfar.",
+        "Aziz Akhannouch chaired a meeting with the CGEM in Casablanca.",
+    ],
+}
+
+def charger_textes(chemin=None):
+    if not chemin:
+        return TEXTES_EXEMPLE
+    textes = {}
+    with open(chemin, encoding="utf-8") as f:
+        for ligne in f:
+            langue, _, texte = ligne.rstrip("\n").partition("\t")
+            if texte.strip():
+                textes.setdefault(langue, []).append(texte.strip())
+    return textes
+
+def entites(sortie):
+    return {(e["word"].replace("▁", " ").strip(), e["entity_group"]) for e in sortie}
+
+def f1(reference, prediction):
+    if not reference and not prediction:
+        return 1.0
+    communes = len(reference & prediction)
+    if not communes:
+        return 0.0
+    precision, rappel = communes / len(prediction), communes / len(reference)
+    return 2 * precision * rappel / (precision + rappel)
+
+def mesurer(ner, textes, repetitions=3):
+    ner(textes[0])  # échauffement
+    durees, sorties = [], []
+    for _ in range(repetitions):
+        sorties = []
+        for texte in textes:
+            debut = time.perf_counter()
+            sorties.append(ner(texte))
+            durees.append((time.perf_counter() - debut) * 1000)
+    durees.sort()
+    return sorties, statistics.mean(durees), durees[int(0.95 * (len(durees) - 1))]
+
+def main(chemin=None):
+    textes = charger_textes(chemin)
+    print(f"{'modèle':<42} | {'backend':<9} | {'ms moy':>8} | {'ms p95':>8} | {'accél.':>6} | {'F1 vs FP32':>10}")
+    print("-" * 98)
+    for langue, modele in MODELES:
+        if not textes.get(langue):
+            continue
+        reference, moy_ref = None, None
+        for backend in ("pytorch", "onnx"):
+            ner = pipeline("ner", modele, backend=backend, aggregation_strategy="simple")
+            sorties, moyenne, p95 = mesurer(ner, textes[langue])
+            predits = [entites(s) for s in sorties]
+            if reference is None:
+                reference, moy_ref = predits, moyenne
+            score = statistics.mean(f1(r, p) for r, p in zip(reference, predits))
+            print(f"{modele:<42} | {backend:<9} | {moyenne:>8.1f} | {p95:>8.1f} | "
+                  f"{moy_ref / moyenne:>5.2f}x | {score:>10.3f}")
+        print("-" * 98)
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,131 @@
+import re
+from bisect import bisect_right
+
+# Fin de phrase : ponctuation latine ou arabe suivie d'un espace
+FIN_PHRASE = re.compile(r"[.!?؟]+(?=\s)")
+TOKEN = re.compile(r"\S+")
+
+# Fenêtre par défaut (en tokens) entre deux mentions d'une paire candidate
+FENETRE_TOKENS = 15
+
+# Proclitiques arabes attachés au nom (و ف ب ك ل, éventuellement suivis de l'article ال) :
+# "والمغرب", "بالرباط" sont des mentions de "المغرب" / "الرباط" ou "مغرب" / "رباط"
+PROCLITIQUES = r"(?:[وفبكل]{1,2}(?:ال)?|ال)?"
+
+def decouper_phrases(texte):
+    """Retourne les bornes (début, fin) des phrases d'un texte."""
+    phrases, debut = [], 0
+    for m in FIN_PHRASE.finditer(texte):
+        phrases.append((debut, m.end()))
+        debut = m.end()
+    if debut < len(texte):
+        phrases.append((debut, len(texte)))
+    return phrases
+
+def indexer_mentions(texte, entites, phrases=None):
+    """Repère en une passe toutes les mentions des entités dans le texte.
+
+    :param entites: itérable de (nom, catégorie).
+    :return: liste de mentions {nom, categorie, debut, fin, phrase, token} triée par position."""
+    categories = {}
+    for nom, categorie in entites:
+        if nom and nom.strip():
+            categories.setdefault(nom.strip(), []).append(categorie)
+    if not categories:
+        return []
+
+    # Alternative unique, noms les plus longs d'abord pour préférer la mention la plus longue ;
+    # la mention (groupe 1) peut suivre un proclitique arabe collé au mot
+    motif = re.compile(
+        r"(?<!\w)" + PROCLITIQUES +
+        r"(" + "|".join(re.escape(n) for n in sorted(categories, key=len, reverse=True)) + r")(?!\w)"
+    )
+    phrases = phrases if phrases is not None else decouper_phrases(texte)
+    debuts_phrases = [d for d, _ in phrases]
+    debuts_tokens = [m.start() for m in TOKEN.finditer(texte)]
+
+    mentions = []
+    for m in motif.finditer(texte):
+        phrase = max(0, bisect_right(debuts_phrases, m.start(1)) - 1)
+        token = max(0, bisect_right(debuts_tokens, m.start(1)) - 1)
+        for categorie in categories[m.group(1)]:
+            mentions.append({
+                "nom": m.group(1),
+                "categorie": categorie,
+                "debut": m.start(1),
+                "fin": m.end(1),
+                "phrase": phrase,
+                "token": token,
+            })
+    return mentions
+
+def mentions_depuis_positions(texte, positions, phrases=None):
+    """Mentions (même format qu'indexer_mentions) à partir de positions déjà connues,
+    par exemple la sortie d'un NER.
+
+    :param positions: itérable de (debut, fin, nom, categorie, donnees) ; `donnees`
+        (ex. l'entité NER d'origine) est gardé dans la mention."""
+    phrases = phrases if phrases is not None else decouper_phrases(texte)
+    debuts_phrases = [d for d, _ in phrases]
+    debuts_tokens = [m.start() for m in TOKEN.finditer(texte)]
+    mentions = []
+    for debut, fin, nom, categorie, donnees in positions:
+        mentions.append({
+            "nom": nom,
+            "categorie": categorie,
+            "debut": debut,
+            "fin": fin,
+            "phrase": max(0, bisect_right(debuts_phrases, debut) - 1),
+            "token": max(0, bisect_right(debuts_tokens, debut) - 1),
+            "donnees": donnees,
+        })
+    return mentions
+
+def generer_paires(mentions, fenetre=FENETRE_TOKENS, meme_phrase=True):
+    """Génère les paires de mentions proches (même phrase, au plus `fenetre` tokens d'écart).
+
+    Chaque paire d'entités (nom, catégorie) n'est produite qu'une fois, pour ses
+    mentions les plus proches du début du texte."""
+    mentions = sorted(mentions, key=lambda m: (m["phrase"], m["token"], m["debut"]))
+    vues = set()
+    for i, m1 in enumerate(mentions):
+        for m2 in mentions[i + 1:]:
+            if meme_phrase and m2["phrase"] != m1["phrase"]:
+                break
+            if m2["token"] - m1["token"] > fenetre:
+                break
+            if m1["nom"] == m2["nom"]:
+                continue
+            cle = frozenset([(m1["nom"], m1["categorie"]), (m2["nom"], m2["categorie"])])
+            if cle in vues:
+                continue
+            vues.add(cle)
+            yield m1, m2
+
+def inserer_marqueurs(texte, marqueurs):
+    """Insère des balises dans un texte par découpage aux positions données.
+
+    :param marqueurs: liste de (position, balise)."""
+    morceaux, precedent = [], 0
+    for position, balise in sorted(marqueurs, key=lambda m: m[0]):
+        morceaux.append(texte[precedent:position])
+        morceaux.append(balise)
+        precedent = position
+    morceaux.append(texte[precedent:])
+    return "".join(morceaux)
+
+def paires_marquees(texte, positions, fenetre=FENETRE_TOKENS):
+    """Paires candidates d'entités repérées (même phrase, fenêtre de tokens), chacune
+    avec le texte où ses deux mentions sont balisées par leur catégorie.
+
+    :param positions: voir mentions_depuis_positions.
+    :return: liste de (donnees_1, donnees_2, texte_balise)."""
+    mentions = mentions_depuis_positions(texte, positions)
+    paires = []
+    for m1, m2 in generer_paires(mentions, fenetre=fenetre):
+        texte_balise = inserer_marqueurs(texte, [
+            (m1["debut"], f"<{m1['categorie']}>"), (m1["fin"], f"</{m1['categorie']}>"),
+            (m2["debut"], f"<{m2['categorie']}>"), (m2["fin"], f"</{m2['categorie']}>"),
+        ])
+        paires.append((m1["donnees"], m2["donnees"], texte_balise))
+    return paires
@@ -0,0 +1,106 @@
+import re
+import time
+import threading
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Span
+from spacy.util import filter_spans
+
+# Tables Supabase des entités connues, par langue et par label
+TABLES_ENTITES = {
+    "fr": {"PER": "entite_fr_pers", "LOC": "entite_fr_loc", "ORG": "entite_fr_org", "EVENT": "entite_fr_event"},
+    "en": {"PER": "entite_en_pers", "LOC": "entite_en_loc", "ORG": "entite_en_org", "EVENT": "entite_en_event"},
+    "ar": {"PER": "entite_ar_pers", "LOC": "entite_ar_loc", "ORG": "entite_ar_org", "EVENT": "entite_ar_event"},
+}
+
+# Intervalle minimal (secondes) entre deux rafraîchissements automatiques
+INTERVALLE_RAFRAICHISSEMENT = 600
+
+def normaliser_nom(nom):
+    """Clé de comparaison d'un nom d'entité (minuscules, espaces normalisés)."""
+    return re.sub(r"\s+", " ", (nom or "").strip().lower())
+
+class Gazetteer:
+    """Index PhraseMatcher global de toutes les entités connues d'une langue.
+
+    Construit une seule fois à partir des tables Supabase, puis complété de façon
+    incrémentale (lignes dont l'id dépasse le dernier id chargé)."""
+
+    def __init__(self, nlp, tables, client, taille_page=1000):
+        self.nlp = nlp
+        self.tables = tables
+        self.client = client
+        self.taille_page = taille_page
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+        self._connus = set()
+        self._dernier_id = {table: 0 for table in tables.values()}
+        self._dernier_rafraichissement = 0
+        self._verrou = threading.Lock()
+        self.rafraichir()
+
+    def __len__(self):
+        return len(self._connus)
+
+    def ajouter(self, label, noms):
+        """Ajoute au matcher les noms pas encore connus pour ce label."""
+        nouveaux = {}
+        for nom in noms:
+            cle = (normaliser_nom(nom), label)
+            if cle[0] and cle not in self._connus and cle not in nouveaux:
+                nouveaux[cle] = nom.strip()
+        if nouveaux:
+            self.matcher.add(label, list(self.nlp.tokenizer.pipe(nouveaux.values())))
+            self._connus.update(nouveaux)
+        return len(nouveaux)
+
+    def rafraichir(self):
+        """Charge les entités insérées depuis le dernier chargement."""
+        with self._verrou:
+            total = 0
+            for label, table in self.tables.items():
+                while True:
+                    try:
+                        reponse = (self.client.table(table)
+                                   .select("id, nom")
+                                   .gt("id", self._dernier_id[table])
+                                   .order("id")
+                                   .limit(self.taille_page)
+                                   .execute())
+                    except Exception as e:
+                        print(f"⚠️ Erreur Supabase ({table}): {e}")
+                        break
+                    if not reponse.data:
+                        break
+                    total += self.ajouter(label, [r["nom"] for r in reponse.data if r.get("nom")])
+                    self._dernier_id[table] = reponse.data[-1]["id"]
+                    if len(reponse.data) < self.taille_page:
+                        break
+            self._dernier_rafraichissement = time.time()
+            return total
+
+    def rafraichir_si_necessaire(self, intervalle=INTERVALLE_RAFRAICHISSEMENT):
+        """Rafraîchit l'index si le dernier chargement date de plus de `intervalle` secondes."""
+        if time.time() - self._dernier_rafraichissement >= intervalle:
+            self.rafraichir()
+
+    def annoter(self, doc, filtre=None):
+        """Trouve en une seule passe les mentions d'entités connues dans un Doc.
+
+        :param filtre: ensemble optionnel de (nom normalisé, label) autorisés.
+        :return: liste de Span sans chevauchement (les plus longs sont gardés)."""
+        spans = []
+        for match_id, start, end in self.matcher(doc):
+            label = self.nlp.vocab.strings[match_id]
+            span = Span(doc, start, end, label=label)
+            if filtre is None or (normaliser_nom(span.text), label) in filtre:
+                spans.append(span)
+        return filter_spans(spans)
+
+_gazetteers = {}
+
+def get_gazetteer(lang, nlp, client):
+    """Retourne le gazetteer partagé d'une langue (construit au premier appel)."""
+    if lang not in _gazetteers:
+        _gazetteers[lang] = Gazetteer(nlp, TABLES_ENTITES[lang], client)
+    else:
+        _gazetteers[lang].rafraichir_si_necessaire()
+    return _gazetteers[lang]
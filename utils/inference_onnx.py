@@ -0,0 +1,123 @@
+"""Backend d'inférence ONNX Runtime (quantifié int8) pour les pipelines transformers.
+
+`pipeline(tache, modele, **options)` remplace `transformers.pipeline(...)` :
+- NLP_BACKEND=pytorch (défaut) : pipeline PyTorch FP32 habituel sur CPU ;
+- NLP_BACKEND=onnx : le modèle est exporté en ONNX puis quantifié en int8
+  (quantification dynamique) une seule fois dans ONNX_MODELS_DIR, et servi
+  par ONNX Runtime derrière la même interface de pipeline.
+
+Dépendance optionnelle : pip install "optimum[onnxruntime]"
+"""
+import os
+import re
+import shutil
+import threading
+
+BACKEND_INFERENCE = os.getenv("NLP_BACKEND", "pytorch")
+DOSSIER_ONNX = os.getenv("ONNX_MODELS_DIR", os.path.join(os.path.dirname(__file__), "..", "onnx_models"))
+# Jeu d'instructions ciblé par la quantification : "avx512_vnni", "avx512", "avx2" ou "arm64"
+CIBLE_QUANTIFICATION = os.getenv("ONNX_QUANT_TARGET", "avx2")
+FICHIER_QUANTIFIE = "model_quantized.onnx"
+
+# Classe ORTModel à utiliser selon la tâche du pipeline
+CLASSES_ORT = {
+    "ner": "ORTModelForTokenClassification",
+    "token-classification": "ORTModelForTokenClassification",
+    "text-classification": "ORTModelForSequenceClassification",
+    "zero-shot-classification": "ORTModelForSequenceClassification",
+}
+
+# Verrou entre threads du processus ; entre processus (workers du pool), chaque
+# export est écrit dans un dossier temporaire puis renommé atomiquement
+_verrou = threading.Lock()
+
+def dossier_modele(modele, quantifie=True):
+    """Dossier local de l'export ONNX d'un modèle du Hub."""
+    nom = re.sub(r"[^\w.-]+", "__", modele)
+    return os.path.join(DOSSIER_ONNX, nom, "int8" if quantifie else "fp32")
+
+def _classe_ort(tache):
+    import optimum.onnxruntime as ort
+    if tache not in CLASSES_ORT:
+        raise ValueError(f"Tâche non prise en charge par le backend ONNX : {tache}")
+    return getattr(ort, CLASSES_ORT[tache])
+
+def _publier(temporaire, dossier, fichier):
+    """Renomme atomiquement l'export `temporaire` en `dossier` ; si un autre processus
+    a publié le même modèle entre-temps, son export est conservé."""
+    os.makedirs(os.path.dirname(dossier), exist_ok=True)
+    try:
+        if os.path.isdir(dossier) and not os.path.exists(os.path.join(dossier, fichier)):
+            shutil.rmtree(dossier, ignore_errors=True)  # export interrompu d'une version précédente
+        os.replace(temporaire, dossier)
+    except OSError:
+        if not os.path.exists(os.path.join(dossier, fichier)):
+            raise
+    finally:
+        shutil.rmtree(temporaire, ignore_errors=True)
+
+def exporter_fp32(modele, tache="ner"):
+    """Exporte un modèle en ONNX FP32 (une seule fois).
+
+    :return: dossier contenant le modèle exporté et son tokenizer."""
+    from transformers import AutoTokenizer
+
+    dossier_fp32 = dossier_modele(modele, quantifie=False)
+    if not os.path.exists(os.path.join(dossier_fp32, "model.onnx")):
+        print(f"📦 Export ONNX de {modele}...")
+        temporaire = f"{dossier_fp32}.{os.getpid()}.tmp"
+        modele_ort = _classe_ort(tache).from_pretrained(modele, export=True)
+        modele_ort.save_pretrained(temporaire)
+        AutoTokenizer.from_pretrained(modele).save_pretrained(temporaire)
+        _publier(temporaire, dossier_fp32, "model.onnx")
+    return dossier_fp32
+
+def exporter_et_quantifier(modele, tache="ner", cible=CIBLE_QUANTIFICATION):
+    """Exporte un modèle en ONNX puis le quantifie en int8 (une seule fois).
+
+    :return: dossier contenant le modèle quantifié et son tokenizer."""
+    from transformers import AutoTokenizer
+    from optimum.onnxruntime import ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+    dossier_int8 = dossier_modele(modele)
+    with _verrou:
+        if os.path.exists(os.path.join(dossier_int8, FICHIER_QUANTIFIE)):
+            return dossier_int8
+
+        dossier_fp32 = exporter_fp32(modele, tache)
+
+        print(f"⚙️ Quantification int8 ({cible}) de {modele}...")
+        temporaire = f"{dossier_int8}.{os.getpid()}.tmp"
+        configuration = getattr(AutoQuantizationConfig, cible)(is_static=False, per_channel=False)
+        quantifieur = ORTQuantizer.from_pretrained(dossier_fp32)
+        quantifieur.quantize(save_dir=temporaire, quantization_config=configuration)
+        AutoTokenizer.from_pretrained(dossier_fp32).save_pretrained(temporaire)
+        _publier(temporaire, dossier_int8, FICHIER_QUANTIFIE)
+        return dossier_int8
+
+def pipeline_onnx(tache, modele, quantifie=True, **options):
+    """Pipeline transformers servi par ONNX Runtime."""
+    from transformers import AutoTokenizer, pipeline as pipeline_hf
+
+    if quantifie:
+        dossier, fichier = exporter_et_quantifier(modele, tache), FICHIER_QUANTIFIE
+    else:
+        with _verrou:
+            dossier, fichier = exporter_fp32(modele, tache), "model.onnx"
+
+    modele_ort = _classe_ort(tache).from_pretrained(dossier, file_name=fichier)
+    tokenizer = AutoTokenizer.from_pretrained(dossier)
+    return pipeline_hf(tache, model=modele_ort, tokenizer=tokenizer, **options)
+
+def pipeline(tache, modele, backend=None, **options):
+    """Remplaçant de transformers.pipeline : PyTorch ou ONNX int8 selon NLP_BACKEND."""
+    backend = backend or BACKEND_INFERENCE
+    if backend == "onnx":
+        return pipeline_onnx(tache, modele, **options)
+    if backend == "onnx-fp32":
+        return pipeline_onnx(tache, modele, quantifie=False, **options)
+
+    from transformers import pipeline as pipeline_hf
+    options.setdefault("device", -1)
+    return pipeline_hf(tache, model=modele, tokenizer=options.pop("tokenizer", modele), **options)
@@ -0,0 +1,71 @@
+"""Registre partagé des modèles NLP, chargés paresseusement et une seule fois par processus.
+
+Chaque modèle est indexé par (type, modèle, processeurs/options) :
+- spacy_model("fr_core_news_lg")
+- stanza_pipeline("ar", "tokenize,mwt,pos,lemma") : un pipeline déjà chargé
+  dont les processeurs couvrent ceux demandés est réutilisé ; les ressources
+  ne sont téléchargées que si elles manquent sur le disque ;
+- transformers_pipeline("ner", "hatmimoha/arabic-ner", ...) : via
+  utils.inference_onnx (PyTorch ou ONNX int8 selon NLP_BACKEND).
+"""
+import threading
+
+_modeles = {}
+_verrous = {}
+_verrou_global = threading.Lock()
+
+def _options(options):
+    return tuple(sorted(options.items()))
+
+def obtenir(cle, fabrique):
+    """Retourne le modèle associé à `cle`, construit par `fabrique()` au premier appel."""
+    if cle in _modeles:
+        return _modeles[cle]
+    with _verrou_global:
+        verrou = _verrous.setdefault(cle, threading.Lock())
+    # Verrou par modèle : deux threads ne chargent pas le même modèle, mais
+    # deux modèles différents peuvent se charger en parallèle
+    with verrou:
+        if cle not in _modeles:
+            _modeles[cle] = fabrique()
+        return _modeles[cle]
+
+def modeles_charges():
+    """Clés des modèles actuellement en mémoire."""
+    return list(_modeles)
+
+def spacy_model(nom, **options):
+    def fabrique():
+        import spacy
+        print(f"⏳ Chargement spaCy {nom}...")
+        return spacy.load(nom, **options)
+    return obtenir(("spacy", nom, _options(options)), fabrique)
+
+def stanza_pipeline(lang, processors, **options):
+    processeurs = frozenset(p.strip() for p in processors.split(","))
+    options.setdefault("use_gpu", False)
+    options.setdefault("verbose", False)
+
+    # Un pipeline plus complet de la même langue fait aussi l'affaire
+    for cle, modele in list(_modeles.items()):
+        if (cle[0] == "stanza" and cle[1] == lang and cle[3] == _options(options)
+                and processeurs <= cle[2]):
+            return modele
+
+    def fabrique():
+        import stanza
+        from stanza.pipeline.core import DownloadMethod
+        print(f"⏳ Chargement Stanza {lang} ({processors})...")
+        # REUSE_RESOURCES : aucun téléchargement si les modèles sont déjà sur le disque
+        return stanza.Pipeline(lang, processors=processors,
+                               download_method=DownloadMethod.REUSE_RESOURCES, **options)
+    return obtenir(("stanza", lang, processeurs, _options(options)), fabrique)
+
+def transformers_pipeline(tache, modele, **options):
+    from utils.inference_onnx import pipeline, BACKEND_INFERENCE
+    backend = options.pop("backend", None) or BACKEND_INFERENCE
+
+    def fabrique():
+        print(f"⏳ Chargement {tache} {modele} ({backend})...")
+        return pipeline(tache, modele, backend=backend, **options)
+    return obtenir(("transformers", tache, modele, backend, _options(options)), fabrique)
@@ -0,0 +1,83 @@
+"""Modèle en mémoire compact des relations du tableau de bord.
+
+Les noms d'entités sont remplacés par des identifiants int32 (dictionnaire
+d'entités partagé entre source et cible) et les types de relation par des
+codes catégoriels : les relations tiennent dans trois tableaux NumPy
+(source, cible, relation) au lieu d'une liste de tuples de chaînes. Comptages,
+filtres par ensemble d'entités et regroupements se font sur ces codes.
+"""
+import numpy as np
+import pandas as pd
+
+class ModeleRelations:
+    """Dictionnaire d'entités et relations codées (source, cible, relation)."""
+
+    def __init__(self, noms, source, cible, types_relation, relation):
+        self.noms = noms                      # pd.Index : id → nom
+        self.source = source                  # np.int32, -1 si nom manquant
+        self.cible = cible                    # np.int32, -1 si nom manquant
+        self.types_relation = types_relation  # pd.Index : code → type de relation
+        self.relation = relation              # np.int32, -1 si relation manquante
+
+    @classmethod
+    def depuis_relations(cls, relations):
+        """Construit le modèle à partir des colonnes nom_source, nom_cible, relation."""
+        n = len(relations)
+        codes, noms = pd.factorize(pd.concat([relations['nom_source'], relations['nom_cible']], ignore_index=True))
+        codes = codes.astype(np.int32)
+        codes_relation, types_relation = pd.factorize(relations['relation'])
+        return cls(pd.Index(noms), codes[:n], codes[n:], pd.Index(types_relation),
+                   codes_relation.astype(np.int32))
+
+    @classmethod
+    def vide(cls):
+        vide = np.empty(0, dtype=np.int32)
+        return cls(pd.Index([]), vide, vide, pd.Index([]), vide)
+
+    def __len__(self):
+        return len(self.source)
+
+    def ids(self, noms):
+        """Identifiants des noms (-1 pour un nom inconnu)."""
+        return self.noms.get_indexer(list(noms)).astype(np.int32)
+
+    def occurrences(self):
+        """Nombre de relations (source ou cible) par identifiant d'entité."""
+        taille = len(self.noms)
+        return (np.bincount(self.source[self.source >= 0], minlength=taille) +
+                np.bincount(self.cible[self.cible >= 0], minlength=taille))
+
+    def comptes_types(self):
+        """Nombre de relations par type (Series triée par fréquence décroissante)."""
+        comptes = np.bincount(self.relation[self.relation >= 0], minlength=len(self.types_relation))
+        return pd.Series(comptes, index=self.types_relation).sort_values(ascending=False)
+
+    def masque_entites(self, noms):
+        """Masque des relations dont la source et la cible appartiennent à `noms` (O(R))."""
+        # Dernière case (id -1 = nom manquant) toujours False
+        autorises = np.zeros(len(self.noms) + 1, dtype=bool)
+        ids = self.ids(noms)
+        autorises[ids[ids >= 0]] = True
+        return autorises[self.source] & autorises[self.cible]
+
+    def aretes(self, noms):
+        """Relations entre entités de `noms`, comptées par (Source, Target, Type)."""
+        masque = self.masque_entites(noms) & (self.relation >= 0)
+        triplets = np.stack([self.source[masque], self.cible[masque], self.relation[masque]], axis=1)
+        uniques, comptes = np.unique(triplets, axis=0, return_counts=True)
+        return pd.DataFrame({
+            'Source': self.noms[uniques[:, 0]] if len(uniques) else [],
+            'Target': self.noms[uniques[:, 1]] if len(uniques) else [],
+            'Type': self.types_relation[uniques[:, 2]] if len(uniques) else [],
+            'count': comptes,
+        })
+
+    def tableau(self, colonnes=("Source", "Cible", "Type")):
+        """Relations décodées en DataFrame (export)."""
+        def decoder(index, codes):
+            return pd.Categorical.from_codes(codes, categories=index) if len(index) else codes
+        return pd.DataFrame(dict(zip(colonnes, (
+            decoder(self.noms, self.source),
+            decoder(self.noms, self.cible),
+            decoder(self.types_relation, self.relation),
+        ))))
@@ -0,0 +1,127 @@
+"""Exécution parallèle par processus pour l'inférence NLP (Stanza, transformers).
+
+Les threads se partagent le GIL et les mêmes objets modèles : pour un travail
+lié au CPU, chaque worker est ici un processus qui possède ses propres modèles.
+- les éléments à traiter passent par une file bornée (pas de chargement
+  anticipé de tout le corpus en mémoire) ;
+- chaque worker limite les threads intra-op de torch pour éviter la
+  sur-souscription des cœurs ;
+- les résultats reviennent au processus parent, seul à écrire en base.
+"""
+import os
+import queue
+import threading
+import traceback
+import multiprocessing
+
+FIN = "__fin__"
+
+def threads_par_defaut(nb_workers):
+    return max(1, (os.cpu_count() or 1) // nb_workers)
+
+def limiter_threads(nb_threads):
+    """Fixe le nombre de threads de calcul du processus courant (torch, OpenMP, MKL)."""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(nb_threads)
+    try:
+        import torch
+        torch.set_num_threads(nb_threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+
+def _worker(fonction, initialiser, nb_threads, entree, sortie):
+    limiter_threads(nb_threads)
+    if initialiser:
+        initialiser()
+    while True:
+        element = entree.get()
+        if element == FIN:
+            break
+        try:
+            sortie.put(("ok", fonction(element)))
+        except Exception:
+            sortie.put(("erreur", traceback.format_exc()))
+    sortie.put((FIN, None))
+
+def executer_en_processus(fonction, elements, ecrire, nb_workers=4, taille_file=None,
+                          threads_par_worker=None, initialiser=None):
+    """Applique `fonction` à chaque élément dans `nb_workers` processus et passe
+    chaque résultat à `ecrire` dans le processus courant (écrivain unique).
+
+    `fonction` et `initialiser` doivent être des fonctions de niveau module
+    (sérialisables) ; `initialiser` précharge les modèles dans chaque worker.
+
+    :return: (nombre de résultats écrits, nombre d'erreurs)"""
+    contexte = multiprocessing.get_context("spawn")
+    entree = contexte.Queue(maxsize=taille_file or 2 * nb_workers)
+    sortie = contexte.Queue()
+    nb_threads = threads_par_worker or threads_par_defaut(nb_workers)
+
+    workers = [
+        contexte.Process(target=_worker, args=(fonction, initialiser, nb_threads, entree, sortie), daemon=True)
+        for _ in range(nb_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    arret = threading.Event()
+    echec_alimentation = []  # exception levée par l'itérateur `elements`, relancée dans le parent
+
+    def deposer(element):
+        # Bloque tant que la file est pleine ; abandonne si les workers sont arrêtés
+        while not arret.is_set():
+            try:
+                entree.put(element, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def alimenter():
+        try:
+            for element in elements:
+                if not deposer(element):
+                    return
+        except BaseException as e:
+            echec_alimentation.append(e)
+        finally:
+            # Toujours un FIN par worker, sinon le parent attend indéfiniment
+            for _ in workers:
+                if not deposer(FIN):
+                    break
+
+    alimentation = threading.Thread(target=alimenter, daemon=True)
+    alimentation.start()
+
+    ecrits, erreurs, termines = 0, 0, 0
+    try:
+        while termines < nb_workers:
+            try:
+                statut, resultat = sortie.get(timeout=5)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    print("❌ Tous les workers se sont arrêtés de façon inattendue.")
+                    break
+                continue
+            if statut == FIN:
+                termines += 1
+            elif statut == "erreur":
+                erreurs += 1
+                print(f"❌ Erreur dans un worker : {resultat}")
+            else:
+                try:
+                    ecrire(resultat)
+                    ecrits += 1
+                except Exception as e:
+                    erreurs += 1
+                    print(f"❌ Erreur d'écriture : {e}")
+    finally:
+        arret.set()
+        for worker in workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
+    if echec_alimentation:
+        raise echec_alimentation[0]
+    return ecrits, erreurs
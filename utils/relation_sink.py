@@ -0,0 +1,57 @@
+import os
+import re
+import hashlib
+from utils.tampon_supabase import TamponUpsert, TAILLE_LOT
+
+# Colonne relation_key et son index unique créés (migration 002)
+RELATIONS_CLE_UNIQUE = os.getenv("RELATIONS_CLE_UNIQUE", "0") == "1"
+
+# Classe d'espaces explicite, identique à celle de normaliser_cle (migration 002) :
+# \s n'a pas la même étendue Unicode en Python et dans les regex PostgreSQL
+ESPACES = re.compile(r"[ \t\n\r\f\v\u00a0]+")
+
+def _normaliser(valeur):
+    return ESPACES.sub(" ", str(valeur if valeur is not None else "")).strip(" ")
+
+def cle_relation(article_id, source, cible, relation):
+    """Clé déterministe d'une relation : sha1 de « article_id|source|cible|relation ».
+
+    Même calcul que la colonne relation_key remplie par
+    config/migrations/002_relations_relation_key.sql."""
+    texte = "|".join(_normaliser(v) for v in (article_id, source, cible, relation))
+    return hashlib.sha1(texte.encode("utf-8")).hexdigest()
+
+class RelationSink(TamponUpsert):
+    """Écriture groupée des relations dans relations_fr / relations_en / relations_ar.
+
+    Chaque ligne reçoit sa relation_key ; les doublons sont écartés en mémoire,
+    puis par l'index unique de la base (upsert on_conflict="relation_key").
+    Sans la migration 002 (RELATIONS_CLE_UNIQUE=0), la clé ne sert qu'au
+    dédoublonnage en mémoire et n'est pas envoyée : les lots sont insérés tels quels."""
+
+    def __init__(self, client, table, taille_lot=TAILLE_LOT, copieur=None, contrainte_unique=None):
+        if contrainte_unique is None:
+            contrainte_unique = RELATIONS_CLE_UNIQUE
+        super().__init__(client, on_conflict="relation_key", taille_lot=taille_lot, copieur=copieur,
+                         contrainte_unique=contrainte_unique)
+        self.table = table
+
+    def ajouter(self, table, ligne=None):
+        """Ajoute une relation : ajouter(ligne), ou ajouter(table, ligne) comme TamponUpsert."""
+        if ligne is None:
+            table, ligne = self.table, table
+        ligne = dict(ligne)
+        if self.contrainte_unique:
+            ligne["relation_key"] = self._cle(ligne)[0]
+        super().ajouter(table, ligne)
+
+    def _cle(self, ligne):
+        if "relation_key" in ligne:
+            return (ligne["relation_key"],)
+        return (cle_relation(
+            ligne.get("article_id"), ligne.get("nom_source"), ligne.get("nom_cible"), ligne.get("relation")
+        ),)
+
+    def ajouter_tout(self, lignes):
+        for ligne in lignes:
+            self.ajouter(ligne)
@@ -0,0 +1,240 @@
+"""Couche de requêtes DuckDB pour les agrégats du tableau de bord.
+
+Les pages du tableau de bord n'appliquent plus leurs filtres et regroupements
+en pandas sur tout le DataFrame des relations : chaque graphique correspond à
+une requête SQL d'agrégation, et seules les lignes agrégées reviennent en
+Python. Les relations (pyarrow.Table de l'instantané Parquet de
+utils/snapshot_parquet.py, en mémoire mappée, ou table construite depuis
+Supabase) sont enregistrées telles quelles dans DuckDB, sans copie : DuckDB
+lit directement les colonnes Arrow. La table est réenregistrée sur chaque
+curseur (les objets enregistrés sont propres à une connexion).
+
+Vue `relations` : nom_source, type_source, nom_cible, type_cible, relation,
+source, date, article_id (si présent) et les autres colonnes de la table (sans
+les colonnes de partition part_* ajoutées par l'instantané).
+"""
+import threading
+
+from utils.snapshot_parquet import table_snapshot, COLONNES_AJOUTEES
+
+GRANULARITES = {"D": "day", "W": "week", "ME": "month", "M": "month"}
+
+class MoteurRequetes:
+    """Connexion DuckDB en mémoire exposant la vue `relations` d'une langue."""
+
+    def __init__(self, relations=None, table=None):
+        """:param relations: pyarrow.Table (ou DataFrame) des relations, enregistrée sans copie.
+        :param table: à défaut, nom de la table Supabase (ex. relations_fr) dont l'instantané Parquet est lu.
+            Les fichiers restent mappés : un nouvel export (renommage de dossier) ne change pas
+            les données du moteur."""
+        import duckdb
+
+        if relations is None and table:
+            relations = table_snapshot(table)
+        if relations is None:
+            raise ValueError("Aucun instantané Parquet ni table de relations à interroger.")
+
+        self._relations = relations
+        self._con = duckdb.connect(database=":memory:")
+        self._con.register("relations_brutes", relations)
+        self._verrou = threading.Lock()
+
+        self.colonnes = [ligne[0] for ligne in self._con.execute("DESCRIBE relations_brutes").fetchall()
+                         if ligne[0] not in COLONNES_AJOUTEES]
+        # Colonnes de type renommées pour le français dans load_data (type_entite_*)
+        renommage = {"type_entite_source": "type_source", "type_entite_cible": "type_cible"}
+        selection = ", ".join(
+            f'"{c}" AS "{renommage[c]}"' if c in renommage and renommage[c] not in self.colonnes else f'"{c}"'
+            for c in self.colonnes
+        )
+        self._con.execute(f"CREATE VIEW relations AS SELECT {selection} FROM relations_brutes")
+        self.colonnes = [renommage.get(c, c) for c in self.colonnes]
+
+    def _curseur(self):
+        """Curseur dédié (sûr entre sessions), avec la table Arrow enregistrée (sans copie)."""
+        with self._verrou:
+            curseur = self._con.cursor()
+        curseur.register("relations_brutes", self._relations)
+        return curseur
+
+    def requete(self, sql, parametres=None):
+        """Exécute une requête et renvoie un DataFrame (curseur dédié : sûr entre sessions)."""
+        curseur = self._curseur()
+        try:
+            return curseur.execute(sql, parametres or {}).df()
+        finally:
+            curseur.close()
+
+    def scalaire(self, sql, parametres=None):
+        """Première valeur du résultat (None si vide ou NULL)."""
+        curseur = self._curseur()
+        try:
+            ligne = curseur.execute(sql, parametres or {}).fetchone()
+            return ligne[0] if ligne else None
+        finally:
+            curseur.close()
+
+    # ----- Filtres communs -----
+
+    @staticmethod
+    def _filtre(debut=None, fin=None, sources=None, types_entites=None):
+        conditions, parametres = ["TRUE"], {}
+        if debut is not None and fin is not None:
+            conditions.append("date BETWEEN $debut AND $fin")
+            parametres.update(debut=debut, fin=fin)
+        if sources is not None:
+            conditions.append("list_contains($sources, source)")
+            parametres["sources"] = list(sources)
+        if types_entites is not None:
+            conditions.append(
+                "nom_source IN (SELECT nom FROM entites WHERE list_contains($types, type)) "
+                "AND nom_cible IN (SELECT nom FROM entites WHERE list_contains($types, type))"
+            )
+            parametres["types"] = list(types_entites)
+        return " AND ".join(conditions), parametres
+
+    _ENTITES = ("WITH entites AS (SELECT nom_source AS nom, type_source AS type FROM relations "
+                "UNION SELECT nom_cible, type_cible FROM relations) ")
+
+    # ----- Tableau de bord -----
+
+    def bornes_dates(self):
+        return self.requete("SELECT min(date) AS debut, max(date) AS fin FROM relations").iloc[0]
+
+    def sources(self):
+        return self.requete("SELECT DISTINCT source FROM relations WHERE source IS NOT NULL ORDER BY source")["source"].tolist()
+
+    def nb_articles(self):
+        colonne = "article_id" if "article_id" in self.colonnes else "url" if "url" in self.colonnes else None
+        if colonne is None:
+            return 0
+        return self.scalaire(f'SELECT count(DISTINCT "{colonne}") FROM relations')
+
+    def chronologie(self, debut, fin, sources, freq="ME"):
+        """Nombre de relations par période et par source (colonnes date, source, count)."""
+        where, parametres = self._filtre(debut, fin, sources)
+        return self.requete(
+            f"SELECT date_trunc('{GRANULARITES[freq]}', date) AS date, source, count(*) AS count "
+            f"FROM relations WHERE {where} GROUP BY ALL ORDER BY 1",
+            parametres,
+        )
+
+    def cooccurrences(self, types_entites, seuil=1):
+        """Paires (Source, Target, count) dont les deux entités ont un type sélectionné."""
+        where, parametres = self._filtre(types_entites=types_entites)
+        parametres["seuil"] = seuil
+        return self.requete(
+            self._ENTITES +
+            f"SELECT nom_source AS Source, nom_cible AS Target, count(*) AS count FROM relations "
+            f"WHERE {where} GROUP BY ALL HAVING count(*) >= $seuil",
+            parametres,
+        )
+
+    def cooccurrence_max(self, types_entites):
+        where, parametres = self._filtre(types_entites=types_entites)
+        return self.scalaire(
+            self._ENTITES +
+            f"SELECT coalesce(max(n), 0) FROM (SELECT count(*) AS n FROM relations WHERE {where} "
+            f"GROUP BY nom_source, nom_cible)",
+            parametres,
+        )
+
+    def types_relations(self, types_entites=None, limite=20):
+        """Types de relation les plus fréquents (colonnes Relation, Fréquence)."""
+        where, parametres = self._filtre(types_entites=types_entites)
+        parametres["limite"] = limite
+        return self.requete(
+            (self._ENTITES if types_entites is not None else "") +
+            f'SELECT relation AS "Relation", count(*) AS "Fréquence" FROM relations '
+            f'WHERE {where} AND relation IS NOT NULL '
+            f'GROUP BY relation ORDER BY 2 DESC LIMIT $limite',
+            parametres,
+        )
+
+    def relations_entite(self, nom, sortantes=True):
+        """Relations dont l'entité est la source (sortantes) ou la cible (entrantes)."""
+        colonne = "nom_source" if sortantes else "nom_cible"
+        return self.requete(f"SELECT * FROM relations WHERE {colonne} = $nom", {"nom": nom})
+
+    # ----- Articles -----
+
+    def statistiques_sources(self):
+        """Par source : articles distincts, relations et ratio relations/article."""
+        articles = "count(DISTINCT article_id)" if "article_id" in self.colonnes else "count(*)"
+        return self.requete(
+            f'SELECT source AS "Source", {articles} AS "Nombre d\'articles", '
+            f'count(*) AS "Nombre de relations", '
+            f'count(*) / {articles} AS "Relations/article" '
+            f"FROM relations WHERE source IS NOT NULL GROUP BY source"
+        )
+
+    def publications_mensuelles(self, source):
+        return self.requete(
+            "SELECT date_trunc('month', date) AS date, count(*) AS count FROM relations "
+            "WHERE source = $source AND date IS NOT NULL GROUP BY 1 ORDER BY 1",
+            {"source": source},
+        )
+
+    def entites_source(self, source, limite=20):
+        """Entités les plus citées (source ou cible) dans une source (colonnes Entité, Nombre)."""
+        return self.requete(
+            'SELECT nom AS "Entité", count(*) AS "Nombre" FROM ('
+            "SELECT nom_source AS nom FROM relations WHERE source = $source "
+            "UNION ALL SELECT nom_cible FROM relations WHERE source = $source) "
+            "GROUP BY nom ORDER BY 2 DESC LIMIT $limite",
+            {"source": source, "limite": limite},
+        )
+
+    def relations_source(self, source):
+        return self.requete(
+            "SELECT relation, count(*) AS count FROM relations WHERE source = $source AND relation IS NOT NULL "
+            "GROUP BY relation ORDER BY 2 DESC",
+            {"source": source},
+        )
+
+    def articles_source(self, source):
+        """Une ligne par article de la source (sa relation d'id le plus petit), triées par id."""
+        ordre = "id" if "id" in self.colonnes else "article_id" if "article_id" in self.colonnes else None
+        sql = "SELECT * FROM relations WHERE source = $source"
+        if "article_id" in self.colonnes:
+            sql = (f"SELECT DISTINCT ON (article_id) * FROM relations WHERE source = $source "
+                   f"ORDER BY article_id{', id' if ordre == 'id' else ''}")
+        if ordre:
+            sql = f"SELECT * FROM ({sql}) ORDER BY {ordre}"
+        return self.requete(sql, {"source": source})
+
+    # ----- Statistiques -----
+
+    def paires_types(self):
+        """Relations par couple (type source, type cible) pour le sunburst."""
+        return self.requete(
+            'SELECT type_source AS "SourceType", type_cible AS "TargetType", count(*) AS count '
+            "FROM relations GROUP BY ALL"
+        )
+
+    def liste_relations(self):
+        return self.requete(
+            "SELECT DISTINCT relation FROM relations WHERE relation IS NOT NULL ORDER BY relation"
+        )["relation"].tolist()
+
+    def mots_relations(self, limite=40):
+        """Mots les plus fréquents dans les relations, découpées sur les blancs (colonnes Mot, Fréquence)."""
+        return self.requete(
+            'SELECT mot AS "Mot", count(*) AS "Fréquence" FROM ('
+            "SELECT unnest(regexp_split_to_array(trim(relation), '\\s+')) AS mot FROM relations "
+            "WHERE relation IS NOT NULL) WHERE mot <> '' "
+            "GROUP BY mot ORDER BY 2 DESC, 1 LIMIT $limite",
+            {"limite": limite},
+        )
+
+    def export(self):
+        """Toutes les relations décodées (export complet, construit seulement à la demande)."""
+        return self.requete("SELECT * FROM relations")
+
+    def relations_mensuelles(self, relations):
+        """Volume mensuel par type de relation (colonnes mois, relation, count)."""
+        return self.requete(
+            "SELECT strftime(date, '%Y-%m') AS mois, relation, count(*) AS count FROM relations "
+            "WHERE date IS NOT NULL AND list_contains($relations, relation) GROUP BY ALL ORDER BY 1",
+            {"relations": list(relations)},
+        )
@@ -0,0 +1,217 @@
+"""Service de données du tableau de bord partagé entre toutes les sessions.
+
+Une seule instance par processus Streamlit (st.cache_resource) garde, pour
+chaque langue, une version immuable des données : entités, modèle de relations
+(tableaux codés) et une seule copie des relations complètes, la pyarrow.Table
+de l'instantané (ou construite depuis Supabase), que le moteur DuckDB lit sans
+copie. Aucun DataFrame des relations n'est gardé : les lignes complètes (détail
+d'une entité, exports) sont relues dans DuckDB à la demande.
+Les sessions reçoivent la même version par référence, sans copie ni
+sérialisation : la mémoire ne croît pas avec le nombre d'utilisateurs. Un thread de fond reconstruit périodiquement les
+données et remplace la version courante d'un bloc ; les sessions en cours
+gardent la version qu'elles lisent jusqu'à leur prochain rerun. La table Arrow
+d'une version est lue une fois à la construction : un nouvel export Parquet ne
+modifie pas une version déjà servie.
+
+Une langue sans données (DonneesIndisponibles) n'est pas relue à chaque rerun :
+l'échec est gardé jusqu'au rafraîchissement suivant.
+
+Les données partagées sont en lecture seule : les tableaux NumPy du modèle
+sont verrouillés en écriture, et les pages copient un DataFrame avant de le
+modifier.
+"""
+import os
+import time
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.snapshot_parquet import table_snapshot, age_snapshot
+from utils.modele_relations import ModeleRelations
+from utils.requetes_duckdb import MoteurRequetes
+
+INTERVALLE_RAFRAICHISSEMENT = int(os.getenv("DASHBOARD_REFRESH_SECONDS", "3600"))
+# Âge maximal d'un instantané Parquet avant retour à Supabase (0 : pas de limite)
+AGE_MAX_SNAPSHOT = int(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+COLONNES_REQUISES = ['nom_source', 'type_source', 'nom_cible', 'type_cible', 'relation']
+
+class DonneesIndisponibles(RuntimeError):
+    """Table vide ou incomplète : rien à afficher pour cette langue."""
+
+class DonneesLangue:
+    """Version des données d'une langue (partagée entre sessions, ne pas modifier)."""
+    __slots__ = ("lang", "version", "entities", "relations", "table", "engine", "avertissements", "charge_le")
+
+    def __init__(self, lang, version, entities, relations, table, engine, avertissements):
+        self.lang = lang
+        self.version = version
+        self.entities = entities
+        self.relations = relations  # ModeleRelations (codes)
+        self.table = table          # pyarrow.Table des relations complètes, enregistrée dans engine
+        self.engine = engine
+        self.avertissements = tuple(avertissements)
+        self.charge_le = datetime.now()
+
+def convertir_dates(relations, avertissements):
+    """Conversion ISO8601 de la colonne date (format mixte, puis texte en dernier recours).
+
+    Instantané et Supabase donnent la même colonne : dates UTC, sans fuseau."""
+    if 'date' not in relations.columns:
+        return relations
+    if pd.api.types.is_datetime64_any_dtype(relations['date']):
+        if getattr(relations['date'].dt, 'tz', None) is not None:
+            relations['date'] = relations['date'].dt.tz_convert('UTC').dt.tz_localize(None)
+        return relations
+    try:
+        relations['date'] = pd.to_datetime(relations['date'], format='ISO8601', errors='raise', utc=True).dt.tz_localize(None)
+    except ValueError as e:
+        avertissements.append(f"Conversion des dates partiellement échouée : {str(e)}")
+        try:
+            relations['date'] = pd.to_datetime(relations['date'], format='mixed', errors='coerce', utc=True).dt.tz_localize(None)
+            non_converties = int(relations['date'].isna().sum())
+            if non_converties:
+                avertissements.append(f"{non_converties} dates n'ont pu être converties.")
+        except Exception:
+            relations['date'] = relations['date'].astype(str)
+            avertissements.append("Certaines dates n'ont pu être converties et ont été conservées en texte")
+    return relations
+
+def _figer(modele):
+    for tableau in (modele.source, modele.cible, modele.relation):
+        tableau.flags.writeable = False
+    return modele
+
+def _dates_arrow(table, avertissements):
+    """Remplace la colonne date de la table Arrow par sa conversion (convertir_dates) ;
+    seule cette colonne est recopiée."""
+    import pyarrow as pa
+
+    if 'date' not in table.column_names:
+        return table
+    dates = convertir_dates(pd.DataFrame({'date': table.column('date').to_pandas()}), avertissements)['date']
+    return table.set_column(table.column_names.index('date'), 'date', pa.array(dates))
+
+def construire_donnees(manager, lang, version):
+    """Charge les relations d'une langue et construit toutes les structures des pages."""
+    import pyarrow as pa
+
+    table_name = f'relations_{lang}'
+    avertissements = []
+    # Instantané Parquet local s'il est assez récent, sinon pagination Supabase complète (pages
+    # parallèles) : chaque rafraîchissement voit aussi les lignes modifiées ou supprimées
+    table = None
+    age = age_snapshot(table_name)
+    if age is not None and 0 < AGE_MAX_SNAPSHOT < age:
+        message = f"Instantané Parquet de {table_name} trop ancien ({age / 3600:.0f} h) : données lues depuis Supabase."
+        print(f"⚠️ {message}")
+        avertissements.append(message)
+    elif age is not None:
+        table = table_snapshot(table_name)
+    if table is None:
+        # Le DataFrame Supabase n'est qu'intermédiaire : seule la table Arrow est gardée
+        table = pa.Table.from_pandas(manager.get_table(table_name), preserve_index=False)
+
+    if table.num_rows == 0:
+        raise DonneesIndisponibles(f"Aucune donnée dans la table {table_name}")
+    missing_cols = [col for col in COLONNES_REQUISES if col not in table.column_names]
+    if missing_cols:
+        raise DonneesIndisponibles(f"Colonnes manquantes dans {table_name}: {missing_cols}")
+
+    table = _dates_arrow(table, avertissements)
+
+    # Colonnes de noms et de types décodées le temps de construire le modèle et les entités
+    colonnes = table.select(COLONNES_REQUISES).to_pandas()
+    sources = colonnes[['nom_source', 'type_source']].rename(columns={'nom_source': 'Nom', 'type_source': 'Type'})
+    targets = colonnes[['nom_cible', 'type_cible']].rename(columns={'nom_cible': 'Nom', 'type_cible': 'Type'})
+    entities = pd.concat([sources, targets]).drop_duplicates()
+
+    # Modèle compact : dictionnaire d'entités (id int32) et relations en trois tableaux NumPy
+    relation_model = _figer(ModeleRelations.depuis_relations(colonnes))
+    del colonnes, sources, targets
+    entity_ids = relation_model.ids(entities['Nom'])
+    entities['Id'] = entity_ids
+    entities['Occurrences'] = np.where(entity_ids >= 0, relation_model.occurrences()[entity_ids], 0)
+
+    engine = MoteurRequetes(relations=table)
+    return DonneesLangue(lang, version, entities, relation_model, table, engine, avertissements)
+
+class ServiceDonnees:
+    """Données courantes par langue, rafraîchies en arrière-plan et remplacées atomiquement."""
+
+    def __init__(self, manager, intervalle=INTERVALLE_RAFRAICHISSEMENT):
+        self.manager = manager
+        self.intervalle = intervalle
+        self._donnees = {}          # lang → DonneesLangue courante
+        self._echecs = {}           # lang → (DonneesIndisponibles, instant de l'échec)
+        self._versions = {}
+        self._verrous = {}
+        self._verrou_global = threading.Lock()
+        self._rafraichisseurs = {}
+        self._arret = threading.Event()
+
+    def _verrou(self, lang):
+        with self._verrou_global:
+            return self._verrous.setdefault(lang, threading.Lock())
+
+    def obtenir(self, lang):
+        """Version courante des données de `lang` (chargée au premier appel).
+
+        :raises DonneesIndisponibles: (échec mémorisé jusqu'au rafraîchissement suivant)"""
+        donnees = self._donnees.get(lang)
+        if donnees is None:
+            try:
+                with self._verrou(lang):
+                    donnees = self._donnees.get(lang)
+                    if donnees is None:
+                        self._lever_echec(lang)
+                        donnees = self._recharger(lang)
+            finally:
+                self._demarrer_rafraichissement(lang)
+        return donnees
+
+    def _lever_echec(self, lang):
+        echec = self._echecs.get(lang)
+        if echec is not None and self.intervalle > 0 and time.monotonic() - echec[1] < self.intervalle:
+            raise echec[0]
+
+    def rafraichir(self, lang):
+        """Reconstruit les données de `lang` puis remplace la version courante."""
+        with self._verrou(lang):
+            return self._recharger(lang)
+
+    def _recharger(self, lang):
+        version = self._versions.get(lang, 0) + 1
+        try:
+            donnees = construire_donnees(self.manager, lang, version)
+        except DonneesIndisponibles as e:
+            self._echecs[lang] = (e, time.monotonic())
+            raise
+        self._echecs.pop(lang, None)
+        self._versions[lang] = version
+        self._donnees[lang] = donnees  # remplacement d'une seule référence : atomique pour les lecteurs
+        return donnees
+
+    def _demarrer_rafraichissement(self, lang):
+        if self.intervalle <= 0:
+            return
+        with self._verrou_global:
+            if lang in self._rafraichisseurs:
+                return
+            thread = threading.Thread(target=self._boucle, args=(lang,), daemon=True,
+                                      name=f"rafraichissement-{lang}")
+            self._rafraichisseurs[lang] = thread
+        thread.start()
+
+    def _boucle(self, lang):
+        while not self._arret.wait(self.intervalle):
+            try:
+                donnees = self.rafraichir(lang)
+                print(f"✅ Données {lang} rafraîchies (version {donnees.version}).")
+            except Exception as e:
+                # La version précédente reste servie
+                print(f"❌ Rafraîchissement des données {lang} échoué : {e}")
+
+    def arreter(self):
+        self._arret.set()
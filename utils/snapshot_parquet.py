@@ -0,0 +1,155 @@
+"""Instantané local des tables Supabase au format Parquet pour le tableau de bord.
+
+Chaque table (relations et entités) est exportée dans un jeu de données
+Parquet partitionné (style Hive) par langue, source et mois :
+    <SNAPSHOT_DIR>/<table>/part_lang=fr/part_source=le360_fr/part_mois=2025-02/<table>-0.parquet
+
+Les partitions portent sur des colonnes dérivées (part_*) : les colonnes
+d'origine (source, date) sont écrites telles quelles, valeurs nulles et dates
+non reconnues comprises, et charger_snapshot retire les colonnes dérivées.
+
+Le tableau de bord lit ces fichiers en mémoire mappée (pyarrow) au lieu de
+paginer toute la table sur HTTP à chaque démarrage. L'export remplace le
+dossier d'une table d'un seul coup (écriture dans un dossier temporaire puis
+renommage) et y date l'instantané (_export.json, ignoré par pyarrow) : au-delà
+de SNAPSHOT_MAX_AGE_SECONDS, le tableau de bord revient à Supabase.
+
+Usage :
+    python utils/snapshot_parquet.py            # toutes les langues
+    python utils/snapshot_parquet.py fr ar
+"""
+import os
+import sys
+import json
+import time
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+DOSSIER_SNAPSHOT = os.getenv("SNAPSHOT_DIR", os.path.join(os.path.dirname(__file__), "..", "snapshots"))
+# Colonnes de partition dérivées ajoutées par l'export (absentes des tables Supabase) ;
+# pas de préfixe "_" : pyarrow ignore les dossiers qui en commencent un
+PARTITIONS = ["part_lang", "part_source", "part_mois"]
+COLONNES_AJOUTEES = PARTITIONS
+INCONNU = "inconnu"
+FICHIER_EXPORT = "_export.json"
+
+def dossier_table(table, dossier=None):
+    return os.path.join(dossier or DOSSIER_SNAPSHOT, table)
+
+def preparer(df, lang):
+    """Ajoute les colonnes de partition dérivées (part_lang, part_source, part_mois).
+
+    source et date ne sont pas modifiées ; une source vide ou une date illisible
+    range seulement la ligne dans la partition "inconnu"."""
+    df = df.copy()
+    df["part_lang"] = lang
+    if "source" in df.columns:
+        df["part_source"] = df["source"].fillna(INCONNU).astype(str).replace("", INCONNU)
+    else:
+        df["part_source"] = INCONNU
+    if "date" in df.columns:
+        dates = pd.to_datetime(df["date"], format="ISO8601", errors="coerce", utc=True)
+        illisibles = int((dates.isna() & df["date"].notna()).sum())
+        if illisibles:
+            print(f"⚠️ {illisibles} dates illisibles : lignes rangées dans la partition {INCONNU} (date conservée).")
+        df["part_mois"] = dates.dt.strftime("%Y-%m").fillna(INCONNU)
+    else:
+        df["part_mois"] = INCONNU
+    return df
+
+def ecrire_snapshot(df, table, lang, dossier=None):
+    """Écrit `df` en Parquet partitionné et remplace l'instantané précédent de la table."""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    cible = dossier_table(table, dossier)
+    temporaire = cible + ".tmp"
+    shutil.rmtree(temporaire, ignore_errors=True)
+
+    tableau = pa.Table.from_pandas(preparer(df, lang), preserve_index=False)
+    ds.write_dataset(
+        tableau, temporaire, format="parquet",
+        partitioning=PARTITIONS, partitioning_flavor="hive",
+        basename_template=f"{table}-{{i}}.parquet",
+    )
+    with open(os.path.join(temporaire, FICHIER_EXPORT), "w", encoding="utf-8") as f:
+        json.dump({"exporte_le": datetime.now(timezone.utc).isoformat(), "lignes": tableau.num_rows}, f)
+
+    ancien = cible + ".old"
+    shutil.rmtree(ancien, ignore_errors=True)
+    if os.path.exists(cible):
+        os.replace(cible, ancien)
+    os.replace(temporaire, cible)
+    shutil.rmtree(ancien, ignore_errors=True)
+    return tableau.num_rows
+
+def supprimer_snapshot(table, dossier=None):
+    """Supprime l'instantané d'une table (le tableau de bord relit alors Supabase)."""
+    shutil.rmtree(dossier_table(table, dossier), ignore_errors=True)
+
+def age_snapshot(table, dossier=None):
+    """Âge en secondes de l'instantané d'une table, None s'il n'existe pas."""
+    chemin = dossier_table(table, dossier)
+    if not os.path.isdir(chemin):
+        return None
+    try:
+        with open(os.path.join(chemin, FICHIER_EXPORT), encoding="utf-8") as f:
+            exporte_le = datetime.fromisoformat(json.load(f)["exporte_le"])
+        return (datetime.now(timezone.utc) - exporte_le).total_seconds()
+    except (OSError, ValueError, KeyError):
+        # Instantané non daté (export antérieur) : date du dossier
+        return time.time() - os.path.getmtime(chemin)
+
+def table_snapshot(table, filtre=None, colonnes=None, dossier=None):
+    """Instantané d'une table (pyarrow.Table) lu en mémoire mappée ; None s'il n'existe pas.
+
+    Les colonnes de partition dérivées ne sont pas renvoyées.
+
+    :param filtre: expression pyarrow.dataset (ex. ds.field("part_source") == "le360_fr"),
+        appliquée à l'élagage des partitions."""
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    chemin = dossier_table(table, dossier)
+    if not os.path.isdir(chemin):
+        return None
+    jeu = ds.dataset(os.path.abspath(chemin), format="parquet", partitioning="hive",
+                     filesystem=fs.LocalFileSystem(use_mmap=True))
+    if colonnes is None:
+        colonnes = [c for c in jeu.schema.names if c not in COLONNES_AJOUTEES]
+    return jeu.to_table(columns=colonnes, filter=filtre)
+
+def charger_snapshot(table, filtre=None, colonnes=None, dossier=None):
+    """Instantané d'une table en DataFrame (voir table_snapshot) ; None s'il n'existe pas."""
+    tableau = table_snapshot(table, filtre, colonnes, dossier)
+    return tableau.to_pandas() if tableau is not None else None
+
+def exporter_langue(manager, lang, dossier=None):
+    """Exporte les tables de relations et d'entités d'une langue.
+
+    Une table vide supprime son instantané (qui serait sinon servi indéfiniment) ;
+    une table illisible le laisse en place."""
+    structure = manager._table_structure[lang]
+    for table in structure["relations"] + structure["entities"]:
+        df = manager.get_table(table)
+        if df.empty:
+            if manager.compter(table) == 0:
+                supprimer_snapshot(table, dossier)
+                print(f"⚠️ Table {table} vide, instantané supprimé.")
+            else:
+                print(f"❌ Table {table} illisible, instantané non modifié.")
+            continue
+        lignes = ecrire_snapshot(df, table, lang, dossier)
+        print(f"✅ {table} : {lignes} lignes exportées.")
+
+if __name__ == "__main__":
+    from utils.supabase_config import get_supabase_manager
+
+    manager = get_supabase_manager()
+    for lang in sys.argv[1:] or ["fr", "en", "ar"]:
+        exporter_langue(manager, lang)
+    print("🎉 Instantanés Parquet à jour.")
@@ -1,16 +1,21 @@
 import os
 from dotenv import load_dotenv
-from supabase import create_client
+from config.connections import get_supabase_client
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
 
+# Pagination PostgREST : taille de page (limite Supabase) et pages téléchargées en parallèle
+TAILLE_PAGE = 1000
+PAGES_CONCURRENTES = int(os.getenv("SUPABASE_PAGES_CONCURRENTES", "8"))
+
 class SupabaseManager:
     def __init__(self):
         self.url = os.getenv("SUPABASE_URL", "").strip()
         self.key = os.getenv("SUPABASE_KEY", "").strip()
-        self.client = create_client(self.url, self.key)
+        self.client = get_supabase_client(self.url, self.key)
         self._table_structure = self._detect_table_structure()
 
     def _detect_table_structure(self) -> Dict[str, Dict[str, List[str]]]:
@@ -22,7 +27,7 @@ class SupabaseManager:
             # Fallback si l'API schema n'est pas disponible
             all_tables = [
                 'entite_fr_pers', 'entite_fr_loc', 'entite_fr_org', 'entite_fr_event',
-                'entites_ar_pers', 'entites_ar_loc', 'entites_ar_org', 'entites_ar_event',
+                'entite_ar_pers', 'entite_ar_loc', 'entite_ar_org', 'entite_ar_event',
                 'entite_en_pers', 'entite_en_loc', 'entite_en_org', 'entite_en_event',
                 'relations_fr', 'relations_ar', 'relations_en'
             ]
@@ -85,35 +90,47 @@ class SupabaseManager:
             'locations': entities[entities['type'].str.lower() == 'loc'] if 'type' in entities.columns else pd.DataFrame()
         }
     
-    def get_table(self, table_name: str) -> pd.DataFrame:
-        """Version optimisée avec gestion de la pagination"""
+    def get_table(self, table_name: str, max_workers: int = PAGES_CONCURRENTES,
+                  page_size: int = TAILLE_PAGE) -> pd.DataFrame:
+        """Charge une table entière : comptage exact, puis pages téléchargées en parallèle."""
         try:
-            all_data = []
-            page_size = 1000  # Taille de page recommandée par Supabase
-            page = 0
-            
-            while True:
-                response = (self.client.table(table_name)
-                            .select("*")
-                            .range(page * page_size, (page + 1) * page_size - 1)
-                            .execute())
-                
-                if not response.data:
-                    break
-                    
-                all_data.extend(response.data)
-                page += 1
-                
-                # Optionnel : affichage plus propre de la progression
-                print(f"\rChargement : page {page} ({len(response.data)} enregistrements)", end="", flush=True)
-                
-            print()  # Nouvelle ligne après la progression
-            return pd.DataFrame(all_data) if all_data else pd.DataFrame()
-        
+            lignes = self._fetch_pages(table_name, max_workers, page_size)
+            return pd.DataFrame(lignes) if lignes else pd.DataFrame()
+
         except Exception as e:
             print(f"\nErreur lors du chargement: {str(e)}")
             return pd.DataFrame()
 
+    def compter(self, table_name: str) -> Optional[int]:
+        """Nombre exact de lignes d'une table (None si la requête échoue)."""
+        try:
+            return self.client.table(table_name).select("*", count="exact").limit(1).execute().count or 0
+        except Exception as e:
+            print(f"\nErreur lors du comptage de {table_name}: {str(e)}")
+            return None
+
+    def _query(self, table_name: str, count=None):
+        # Tri par id : pages disjointes et stables entre requêtes parallèles
+        return self.client.table(table_name).select("*", count=count).order("id")
+
+    def _fetch_pages(self, table_name: str, max_workers: int, page_size: int) -> List[Dict]:
+        """Première page avec comptage exact, pages suivantes en parallèle (pool borné)."""
+        premiere = self._query(table_name, count="exact").range(0, page_size - 1).execute()
+        total = premiere.count or 0
+        nb_pages = -(-total // page_size)
+        print(f"Chargement de {table_name} : {total} enregistrements, {nb_pages} pages")
+        if nb_pages <= 1:
+            return premiere.data or []
+
+        def page(numero):
+            return (self._query(table_name)
+                    .range(numero * page_size, (numero + 1) * page_size - 1)
+                    .execute()).data or []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            suivantes = list(pool.map(page, range(1, nb_pages)))
+        return [ligne for lignes in [premiere.data or []] + suivantes for ligne in lignes]
+
 def get_supabase_manager():
     """Factory pour une instance unique"""
     global _manager
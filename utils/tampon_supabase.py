@@ -0,0 +1,123 @@
+import os
+import threading
+from collections import defaultdict
+from config.connections import executer
+from utils.postgres_copy import copieur_par_defaut
+
+# Nombre de lignes envoyées par requête d'upsert
+TAILLE_LOT = 500
+# Contraintes d'unicité créées par les migrations de config/migrations : sans elles,
+# PostgREST et COPY rejettent tout on_conflict sur ces colonnes (42P10).
+# Entités AR (nom, article_id) : migration 001
+ENTITES_AR_UNIQUES = os.getenv("ENTITES_AR_UNIQUES", "0") == "1"
+# Entités FR/EN (nom, article_id) : migration 003
+ENTITES_FR_EN_UNIQUES = os.getenv("ENTITES_FR_EN_UNIQUES", "0") == "1"
+
+class TamponUpsert:
+    """Accumule des lignes par table Supabase et les écrit par upserts groupés.
+
+    Une requête HTTP par lot de `taille_lot` lignes au lieu d'une par ligne ; les
+    doublons (selon `on_conflict`) sont écartés en mémoire puis ignorés par la base
+    grâce à la contrainte d'unicité correspondante.
+
+    Avec ECRITURE_BACKEND=postgres (ou un `copieur` fourni), les lots passent par
+    COPY + INSERT ... ON CONFLICT DO NOTHING directement dans Postgres.
+
+    `contrainte_unique=False` (migration pas encore appliquée) : les doublons sont
+    toujours écartés en mémoire, mais les lots sont de simples insertions."""
+
+    def __init__(self, client, on_conflict, taille_lot=TAILLE_LOT, ignore_duplicates=True, copieur=None,
+                 contrainte_unique=True):
+        self.client = client
+        self.copieur = copieur or copieur_par_defaut()
+        self.on_conflict = on_conflict
+        self.colonnes_cle = [c.strip() for c in on_conflict.split(",")]
+        self.contrainte_unique = contrainte_unique
+        self.taille_lot = taille_lot
+        self.ignore_duplicates = ignore_duplicates
+        self._lignes = defaultdict(dict)
+        self._verrou = threading.Lock()
+        self.ecrites = 0   # totaux depuis la création du tampon
+        self.erreurs = 0
+        self._bilan = [0, 0]  # lignes écrites / en erreur depuis le dernier vider()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.vider()
+
+    def __len__(self):
+        return sum(len(lignes) for lignes in self._lignes.values())
+
+    def ajouter(self, table, ligne):
+        """Ajoute une ligne ; la table est écrite dès que son tampon atteint `taille_lot`."""
+        cle = self._cle(ligne)
+        with self._verrou:
+            self._lignes[table].setdefault(cle, ligne)
+            if len(self._lignes[table]) < self.taille_lot:
+                return
+            lot = list(self._lignes.pop(table).values())
+        self._ecrire(table, lot)
+
+    def vider(self, table=None):
+        """Écrit tout ce qui reste en tampon (pour une table ou pour toutes).
+
+        :return: (lignes écrites, lignes en erreur) depuis le vider() précédent,
+            écritures déclenchées par ajouter() comprises."""
+        with self._verrou:
+            tables = [table] if table else list(self._lignes)
+            lots = [(t, list(self._lignes.pop(t, {}).values())) for t in tables]
+        for t, lot in lots:
+            if lot:
+                self._ecrire(t, lot)
+        with self._verrou:
+            bilan, self._bilan = tuple(self._bilan), [0, 0]
+        return bilan
+
+    def _cle(self, ligne):
+        return tuple(ligne.get(c) for c in self.colonnes_cle)
+
+    def _compter(self, ecrites=0, erreurs=0):
+        with self._verrou:
+            self.ecrites += ecrites
+            self.erreurs += erreurs
+            self._bilan[0] += ecrites
+            self._bilan[1] += erreurs
+
+    def _ecrire(self, table, lot):
+        for i in range(0, len(lot), self.taille_lot):
+            morceau = lot[i:i + self.taille_lot]
+            try:
+                if self.copieur is not None:
+                    self.copieur.charger(table, morceau,
+                                         on_conflict=self.colonnes_cle if self.contrainte_unique else None)
+                elif not self.contrainte_unique:
+                    executer(self.client.table(table).insert(morceau))
+                else:
+                    # Réessais avec attente exponentielle (config.connections)
+                    executer(self.client.table(table)
+                             .upsert(morceau, on_conflict=self.on_conflict, ignore_duplicates=self.ignore_duplicates))
+                self._compter(ecrites=len(morceau))
+                print(f"✅ {len(morceau)} lignes écrites dans {table}")
+            except Exception as e:
+                self._compter(erreurs=len(morceau))
+                print(f"❌ Erreur d'upsert dans {table} : {e}")
+
+def inserer_entites_article(client, table, article_id, lignes):
+    """Insère les entités d'un article sans contrainte d'unicité en base : les noms déjà
+    présents pour l'article sont lus en une requête, puis les autres insérés en un lot."""
+    try:
+        existants = executer(client.table(table).select("nom").eq("article_id", article_id))
+        vus = {ligne["nom"] for ligne in existants.data}
+        nouvelles = []
+        for ligne in lignes:
+            if ligne["nom"] not in vus:
+                vus.add(ligne["nom"])
+                nouvelles.append(ligne)
+        if nouvelles:
+            executer(client.table(table).insert(nouvelles))
+        return len(nouvelles)
+    except Exception as e:
+        print(f"❌ Erreur d'insertion dans {table} : {e}")
+        return 0